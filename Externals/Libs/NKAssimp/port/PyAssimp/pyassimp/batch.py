@@ -0,0 +1,249 @@
+#-*- coding: UTF-8 -*-
+
+"""
+Parallel import of many models.
+
+pyassimp.batch.load_many() imports a list of model files on a pool of
+worker processes and yields the results as soon as each file is done.
+The mesh arrays are handed back to the calling process through shared
+memory instead of being pickled, and the scenes are the same scene-like
+objects as the ones of pyassimp.cache.
+
+Requires Python 3.9 or newer (multiprocessing.shared_memory) and numpy.
+"""
+
+import os
+import time
+import logging
+import traceback
+import collections
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory, resource_tracker
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import core
+from . import cache
+from . import postprocess
+from .errors import AssimpError
+
+logger = logging.getLogger("pyassimp")
+
+class BatchResult(object):
+    """
+    Outcome of the import of one file by load_many().
+
+    filename: the imported file.
+    scene:    scene-like object (see pyassimp.cache), or None on failure.
+    error:    None on success, otherwise a description of the failure.
+    elapsed:  import time in the worker, in seconds.
+    size:     size of the shared memory holding the mesh arrays, in bytes.
+
+    The mesh arrays of the scene live in shared memory owned by the
+    result. close() releases it, and results can be used as context
+    managers to close them automatically. Arrays of the scene which are
+    still referenced then stay valid: the memory is only unmapped once
+    they are all gone.
+    """
+    def __init__(self, filename, scene = None, error = None, elapsed = 0., shm = None):
+        self.filename = filename
+        self.scene = scene
+        self.error = error
+        self.elapsed = elapsed
+        self._shm = shm
+        self.size = shm.size if shm else 0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def close(self):
+        """ Releases the shared memory of the mesh arrays. """
+        self.scene = None
+        if self._shm is not None:
+            shm, self._shm = self._shm, None
+            shm.unlink()
+            _close_shared_memory(shm)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "BatchResult(%r, %s)" % (self.filename, "ok" if self.ok else self.error)
+
+# shared memory blocks of closed results whose arrays were still
+# referenced: they are unmapped by a later _close_shared_memory() call
+_unmapped_later = []
+
+def _close_shared_memory(shm):
+    """
+    Unmaps a shared memory block, unless numpy arrays still use it: then
+    it is kept aside and unmapped when a later block is closed.
+    """
+    blocks = _unmapped_later[:] + [shm]
+    del _unmapped_later[:]
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            _unmapped_later.append(block)
+
+def _import_to_shared_memory(filename, processing):
+    """
+    Runs in the worker processes: imports a file and copies its mesh
+    arrays into a new shared memory block.
+
+    Returns (description of the scene, name of the shared memory block,
+    layout of the arrays in the block, import time).
+    """
+    start = time.time()
+    arrays = []
+    with core.load(filename, processing=processing) as scene:
+        desc = cache.describe_scene(scene, lambda index, name, data: arrays.append((index, name, data)))
+    elapsed = time.time() - start
+
+    # 16 bytes alignment for each array
+    layout = []
+    size = 0
+    for index, name, data in arrays:
+        layout.append((index, name, size, data.dtype.str, data.shape))
+        size += (data.nbytes + 15) & ~15
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for (index, name, data), (_, _, offset, _, _) in zip(arrays, layout):
+            shm.buf[offset:offset + data.nbytes] = numpy.ascontiguousarray(data).view(numpy.uint8).ravel()
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    return desc, shm.name, layout, elapsed
+
+def _job(filename, processing):
+    try:
+        return _import_to_shared_memory(filename, processing), None
+    except Exception as e:
+        return None, "%s: %s\n%s" % (type(e).__name__, e, traceback.format_exc())
+
+def _make_result(filename, outcome):
+    (res, error) = outcome
+    if error is not None:
+        return BatchResult(filename, error=error)
+
+    desc, shm_name, layout, elapsed = res
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # the arrays hold an export of the buffer of the block: closing the
+    # block fails instead of unmapping memory they still point to.
+    data = numpy.frombuffer(shm.buf, dtype=numpy.uint8)
+    arrays = {}
+    for index, name, offset, dtype, shape in layout:
+        arrays[(index, name)] = numpy.ndarray(shape, dtype=dtype, buffer=data, offset=offset)
+    scene = cache.build_scene(desc, lambda index, name: arrays[(index, name)])
+    return BatchResult(filename, scene, elapsed=elapsed, shm=shm)
+
+def load_many(paths,
+              processing = postprocess.aiProcess_Triangulate,
+              workers    = None,
+              max_memory = None):
+    '''
+    Import several models in parallel. Generator yielding a BatchResult
+    for each file, in completion order.
+
+    Arguments
+    ---------
+    paths:      model files to import.
+    processing: assimp postprocessing parameters, see pyassimp.load().
+    workers:    number of worker processes, defaults to the number of CPUs.
+    max_memory: if set, no new import is started while the results already
+                yielded and not closed yet, plus the imports still running,
+                hold more than max_memory bytes of shared memory. The size
+                of a running import is not known before it ends: it is
+                counted as the size of the biggest result so far, so this
+                is a soft limit. One import is always allowed to run, so
+                that the batch never stalls.
+
+    Failures, including crashes of the assimp library, do not stop the
+    batch: they are reported in the 'error' of the result of the file.
+    When a worker crashes, the files which were being imported at that
+    time are retried one by one, to find out which one is responsible.
+    '''
+    if numpy is None:
+        raise AssimpError('pyassimp.batch requires numpy')
+
+    workers = workers or os.cpu_count() or 1
+
+    # the worker processes must share the resource tracker of this process,
+    # otherwise they unlink the shared memory blocks when they exit.
+    resource_tracker.ensure_running()
+
+    # (path, isolated): isolated jobs run alone in the pool
+    pending = collections.deque((path, False) for path in paths)
+    running = {}
+    live = []  # results handed out and not closed yet
+    biggest = 0  # size of the biggest result so far
+    executor = ProcessPoolExecutor(max_workers=workers)
+
+    def memory_in_use():
+        live[:] = [r for r in live if r._shm is not None]
+        return sum(r.size for r in live) + len(running) * biggest
+
+    try:
+        while pending or running:
+
+            # schedule as many jobs as allowed
+            while pending and len(running) < workers:
+                path, isolated = pending[0]
+                if isolated and running:
+                    break
+                if running and max_memory is not None and memory_in_use() >= max_memory:
+                    break
+                pending.popleft()
+                running[executor.submit(_job, path, processing)] = (path, isolated)
+                if isolated:
+                    break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            broken = False
+            for future in done:
+                path, isolated = running.pop(future)
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    if isolated:
+                        yield BatchResult(path, error="the worker process crashed")
+                    else:
+                        pending.appendleft((path, True))
+                    continue
+
+                result = _make_result(path, outcome)
+                biggest = max(biggest, result.size)
+                live.append(result)
+                yield result
+
+            if broken:
+                # every job still running on the broken pool failed too
+                for future, (path, isolated) in running.items():
+                    pending.appendleft((path, True))
+                running.clear()
+                executor.shutdown(wait=False)
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        # release the shared memory of the results nobody will read
+        for future in running:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                res, error = future.result()
+                if res is not None:
+                    shm = shared_memory.SharedMemory(name=res[1])
+                    shm.close()
+                    shm.unlink()
@@ -0,0 +1,332 @@
+#-*- coding: UTF-8 -*-
+
+"""
+Persistent on-disk cache of imported scenes.
+
+pyassimp.cache.load() is used like pyassimp.load(), but keeps a compact
+copy of each imported scene on disk, keyed by the content of the model
+file, the post-processing flags and the assimp library in use. Loading
+the same file again reads the scene back from the cache without calling
+into assimp at all: the mesh arrays are stored as .npy files which are
+memory-mapped, the node graph, the materials, the cameras and the lights
+are stored in a small JSON file.
+
+Animations, embedded textures and metadata are not cached: use
+pyassimp.load() when they are needed.
+"""
+
+import os
+import json
+import base64
+import ctypes
+import shutil
+import hashlib
+import tempfile
+import logging
+from contextlib import contextmanager
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import core
+from . import helper
+from . import postprocess
+from .errors import AssimpError
+
+logger = logging.getLogger("pyassimp")
+
+# Bump this when the layout of the cache entries changes:
+# it is part of the cache keys.
+CACHE_VERSION = 3
+
+_mesh_arrays = ('vertices', 'normals', 'tangents', 'bitangents', 'colors', 'texturecoords')
+
+class CachedObject(object):
+    """
+    Plain attribute container standing for an assimp structure (scene,
+    node, mesh...) read back from the cache.
+    """
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+    def __repr__(self):
+        return str(self.__class__) + "(" + getattr(self, 'name', '') + ")"
+
+    def __str__(self):
+        return getattr(self, 'name', '')
+
+def default_cache_dir():
+    return os.path.join(helper.user_cache_dir(), 'scenes')
+
+# identity of the assimp library in use, see library_identity()
+_library_identity = None
+
+def library_identity():
+    """
+    Returns a string identifying the assimp library pyassimp uses: its
+    path, size and modification time, and the version it reports. Another
+    build of assimp may import the same file differently, so it is part
+    of the cache keys.
+    """
+    global _library_identity
+    if _library_identity is None:
+        dll = core._assimp_lib.dll
+        path = os.path.abspath(getattr(dll, '_name', None) or '')
+        try:
+            stat = os.stat(path)
+            stamp = '%d:%d' % (stat.st_size, int(stat.st_mtime))
+        except OSError:
+            stamp = '-'
+        try:
+            functions = (dll.aiGetVersionMajor, dll.aiGetVersionMinor, dll.aiGetVersionRevision)
+        except AttributeError:
+            version = '-'
+        else:
+            for function in functions:
+                function.restype = ctypes.c_uint
+            version = '.'.join(str(function()) for function in functions)
+        _library_identity = '%s:%s:%s' % (path, stamp, version)
+    return _library_identity
+
+def cache_key(filename, processing, library = None):
+    """
+    Returns the cache key of a model file loaded with the given
+    post-processing flags: a hash of the content of the file, so that
+    renamed or moved files still hit the cache and modified files miss it.
+
+    :param library: identity of the assimp library importing the file,
+    library_identity() by default: entries stored by another library are
+    not reused.
+    """
+    if library is None:
+        library = library_identity()
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(('%d:%d:' % (CACHE_VERSION, processing)).encode('ascii'))
+    digest.update(library.encode('utf-8'))
+    return digest.hexdigest()
+
+def _to_json(value):
+    """ Converts an attribute value to JSON, or returns None if it can not be. """
+    if isinstance(value, numpy.ndarray):
+        return {'ndarray': value.tolist()}
+    if isinstance(value, bytes):
+        return {'bytes': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        values = [_to_json(v) for v in value]
+        if None not in values:
+            return values
+    return None
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if 'ndarray' in value:
+            return numpy.array(value['ndarray'], dtype=numpy.float32)
+        return base64.b64decode(value['bytes'])
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    return value
+
+def _attributes_to_json(obj):
+    """ Converts the simple attributes of a camera or a light to a dict. """
+    res = {}
+    for name, value in obj.__dict__.items():
+        if name.startswith('_') or name == 'parent':
+            continue
+        value = _to_json(value)
+        if value is not None:
+            res[name] = value
+    return res
+
+def _node_to_json(node, mesh_indices):
+    return {'name': node.name,
+            'transformation': numpy.asarray(node.transformation).ravel().tolist(),
+            'meshes': [mesh_indices[id(mesh)] for mesh in node.meshes],
+            'children': [_node_to_json(child, mesh_indices) for child in node.children]}
+
+def describe_scene(scene, store_array):
+    """
+    Returns a JSON-serializable description of a scene loaded by
+    pyassimp.load(). The mesh arrays are not part of it: they are handed
+    to store_array(mesh index, array name, numpy array) instead.
+    """
+    meshes = []
+    for index, mesh in enumerate(scene.meshes):
+        desc = {'name': mesh.name,
+                'materialindex': int(mesh.materialindex),
+                'primitivetypes': int(mesh.primitivetypes),
+                'numuvcomponents': [int(n) for n in mesh.numuvcomponents],
+                'arrays': []}
+
+        for name in _mesh_arrays:
+            data = numpy.asarray(getattr(mesh, name), dtype=numpy.float32)
+            if data.size:
+                store_array(index, name, data)
+                desc['arrays'].append(name)
+
+        faces = mesh.faces
+        if isinstance(faces, tuple): # (offsets, indices) of mixed polygons
+            store_array(index, 'offsets', numpy.asarray(faces[0]))
+            faces = faces[1]
+            desc['offsets'] = True
+        store_array(index, 'faces', numpy.asarray(faces, dtype=numpy.int32))
+
+        meshes.append(desc)
+
+    # identical materials share their properties, stored once
+    materials = []
+    material_properties = []
+    unique = {}
+    for material in scene.materials:
+        if material.properties not in unique:
+            unique[material.properties] = len(material_properties)
+            properties = []
+            for (key, semantic), value in dict.items(material.properties):
+                value = _to_json(value)
+                if value is not None:
+                    properties.append([key, semantic, value])
+            material_properties.append(properties)
+        materials.append(unique[material.properties])
+
+    mesh_indices = dict((id(mesh), index) for index, mesh in enumerate(scene.meshes))
+    return {'version': CACHE_VERSION,
+            'rootnode': _node_to_json(scene.rootnode, mesh_indices),
+            'meshes': meshes,
+            'materials': materials,
+            'material_properties': material_properties,
+            'cameras': [_attributes_to_json(camera) for camera in scene.cameras],
+            'lights': [_attributes_to_json(light) for light in scene.lights]}
+
+def _write_entry(scene, path):
+    """ Writes the cache entry of a scene loaded by pyassimp.load() in 'path'. """
+    def store_array(index, name, data):
+        numpy.save(os.path.join(path, 'mesh%d_%s.npy' % (index, name)), data)
+
+    desc = describe_scene(scene, store_array)
+    with open(os.path.join(path, 'scene.json'), 'w') as f:
+        json.dump(desc, f)
+
+def _node_from_json(desc, meshes, parent):
+    node = CachedObject(name=desc['name'],
+                        transformation=numpy.array(desc['transformation'], dtype=numpy.float32).reshape((4, 4)),
+                        meshes=[meshes[i] for i in desc['meshes']],
+                        parent=parent)
+    node.children = [_node_from_json(child, meshes, node) for child in desc['children']]
+    return node
+
+def build_scene(desc, array):
+    """
+    Builds a scene-like object from a description returned by
+    describe_scene(). array(mesh index, array name) returns the mesh arrays.
+    """
+    material_properties = [core.PropertyGetter(((key, semantic), core._frozen(_from_json(value)))
+                                               for key, semantic, value in properties)
+                           for properties in desc['material_properties']]
+    materials = [CachedObject(properties=material_properties[i]) for i in desc['materials']]
+
+    meshes = []
+    for index, mesh_desc in enumerate(desc['meshes']):
+        mesh = CachedObject(name=mesh_desc['name'],
+                            materialindex=mesh_desc['materialindex'],
+                            material=materials[mesh_desc['materialindex']],
+                            primitivetypes=mesh_desc['primitivetypes'],
+                            numuvcomponents=mesh_desc['numuvcomponents'])
+        for name in _mesh_arrays:
+            if name in mesh_desc['arrays']:
+                setattr(mesh, name, array(index, name))
+            else:
+                setattr(mesh, name, numpy.array([], dtype=numpy.float32))
+        mesh.faces = array(index, 'faces')
+        if mesh_desc.get('offsets'):
+            mesh.faces = (array(index, 'offsets'), mesh.faces)
+        meshes.append(mesh)
+
+    rootnode = _node_from_json(desc['rootnode'], meshes, None)
+    return CachedObject(rootnode=rootnode,
+                        node_index=core.NodeIndex(rootnode),
+                        meshes=meshes,
+                        materials=materials,
+                        cameras=[CachedObject(**dict((k, _from_json(v)) for k, v in camera.items()))
+                                 for camera in desc['cameras']],
+                        lights=[CachedObject(**dict((k, _from_json(v)) for k, v in light.items()))
+                                for light in desc['lights']])
+
+def _read_entry(path):
+    """ Builds a scene-like object from the cache entry stored in 'path'. """
+    with open(os.path.join(path, 'scene.json')) as f:
+        desc = json.load(f)
+
+    def array(index, name):
+        return numpy.load(os.path.join(path, 'mesh%d_%s.npy' % (index, name)), mmap_mode='r')
+
+    return build_scene(desc, array)
+
+def _store(filename, processing, path):
+    """ Imports a model with assimp and stores it as the cache entry 'path'. """
+    cache_dir = os.path.dirname(path)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+
+    # the entry is written aside and renamed when complete, so that
+    # interrupted or concurrent imports never leave a partial entry.
+    tmp = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        with core.load(filename, processing=processing) as scene:
+            _write_entry(scene, tmp)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+            # another process stored the same entry meanwhile
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+
+@contextmanager
+def load(filename,
+         processing = postprocess.aiProcess_Triangulate,
+         cache_dir  = None):
+    '''
+    Load a model into a scene-like object, through the on-disk cache.
+    On failure throws AssimpError.
+
+    Arguments
+    ---------
+    filename:   name of the model file.
+    processing: assimp postprocessing parameters, see pyassimp.load().
+    cache_dir:  directory of the cache entries. Defaults to a 'scenes'
+                folder in the pyassimp user cache directory.
+
+    Returns
+    ---------
+    Scene-like object with the rootnode, meshes, materials, cameras and
+    lights of the model. The mesh arrays are read-only memory-mapped
+    numpy arrays.
+    '''
+    if numpy is None:
+        raise AssimpError('pyassimp.cache requires numpy')
+
+    if not os.path.isfile(filename):
+        raise AssimpError('Could not import file: ' + filename + ' does not exist!')
+
+    path = os.path.join(cache_dir or default_cache_dir(), cache_key(filename, processing))
+    if not os.path.isdir(path):
+        logger.debug("No cache entry for " + filename + ", importing it")
+        _store(filename, processing, path)
+
+    yield _read_entry(path)
+
+def clear(cache_dir = None):
+    '''
+    Remove all the entries of the scene cache.
+    '''
+    cache_dir = cache_dir or default_cache_dir()
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
@@ -20,6 +20,9 @@ except ImportError:
     numpy = None
 import logging
 import ctypes
+import array
+import struct
+import weakref
 from contextlib import contextmanager
 logger = logging.getLogger("pyassimp")
 # attach default null handler to logger so it doesn't complain
@@ -66,6 +69,31 @@ def make_tuple(ai_obj, type = None):
 
     return res
 
+def make_array(ai_array, length, copy = True):
+    """
+    Converts a C array of 'tuple-like' structures (vectors, colors,
+    matrices...) into a numpy array, without visiting each element in Python.
+
+    :param ai_array: ctypes pointer to the first element of the array.
+    :param length: number of elements in the array.
+    :param copy: if False, the returned array is a view over the memory
+    owned by assimp: it stays valid only until the scene is released.
+    """
+    struct = ai_array._type_
+    shape = (length, len(struct._fields_))
+    if struct is structs.Matrix4x4:
+        shape = (length, 4, 4)
+    elif struct is structs.Matrix3x3:
+        shape = (length, 3, 3)
+
+    # all the fields of the structures in assimp_structs_as_tuple share
+    # the same C type, so the array can be seen as a flat array of it.
+    flat = ctypes.cast(ai_array, ctypes.POINTER(struct._fields_[0][1]))
+    res = numpy.ctypeslib.as_array(flat, shape = shape)
+    if copy:
+        res = res.copy()
+    return res
+
 # Returns unicode object for Python 2, and str object for Python 3.
 def _convert_assimp_string(assimp_string):
     if sys.version_info >= (3, 0):
@@ -78,11 +106,11 @@ def _init_face(aiFace):
     aiFace.indices = [aiFace.mIndices[i] for i in range(aiFace.mNumIndices)]
 assimp_struct_inits =  { structs.Face : _init_face }
 
-def call_init(obj, caller = None):
+def call_init(obj, caller = None, copy = True, lazy = False):
     if helper.hasattr_silent(obj,'contents'): #pointer
-        _init(obj.contents, obj, caller)
+        _init(obj.contents, obj, caller, copy, lazy)
     else:
-        _init(obj,parent=caller)
+        _init(obj, parent=caller, copy=copy, lazy=lazy)
 
 def _is_init_type(obj):
 
@@ -99,136 +127,325 @@ def _is_init_type(obj):
     return not (tname[:2] == 'c_' or tname == 'Structure' \
             or tname == 'POINTER') and not isinstance(obj, (int, str, bytes))
 
-def _init(self, target = None, parent = None):
+def _init(self, target = None, parent = None, copy = True, lazy = False):
     """
     Custom initialize() for C structs, adds safely accessible member functionality.
 
     :param target: set the object which receive the added methods. Useful when manipulating
     pointers, to skip the intermediate 'contents' deferencing.
+    :param copy: if False, numpy arrays of vectors and colors are views over the
+    memory owned by assimp instead of detached copies.
+    :param lazy: a LazyScene to convert the members only the first time they
+    are accessed: a LazyStruct standing for 'self' is returned then.
     """
+    if lazy:
+        return LazyStruct(self, parent, copy, lazy)
+
     if not target:
         target = self
 
-    dirself = dir(self)
-    for m in dirself:
+    for member in _get_plan(type(self))[0]:
+        _init_member(self, target, parent, member, copy)
+
+    _finalize(self, target, copy)
+
+    return self
+
+# kinds of members, see _get_plan()
+(MEMBER_COUNT, MEMBER_NAME, MEMBER_TUPLE, MEMBER_PARENT,
+ MEMBER_PROPERTIES, MEMBER_ARRAY, MEMBER_VALUE) = range(7)
+
+# class -> conversion plan, filled by _get_plan()
+_plans = {}
+
+def _get_plan(cls):
+    """
+    Returns the conversion plan of a ctypes Structure subclass: a list of
+    (member, attribute name, kind, length member) tuples in the order _init
+    processes them, and the same tuples indexed by attribute name.
+
+    The classification only depends on the fields declared by the class,
+    so it is computed once per class instead of once per instance.
+    """
+    try:
+        return _plans[cls]
+    except KeyError:
+        pass
+
+    fields = dict(getattr(cls, '_fields_', []))
+    plan = []
+    for m in sorted(fields):
 
         if m.startswith("_"):
             continue
 
         if m.startswith('mNum'):
-            if 'm' + m[4:] in dirself:
-                continue # will be processed later on
-            else:
-                name = m[1:].lower()
-
-                obj = getattr(self, m)
-                setattr(target, name, obj)
-                continue
+            if 'm' + m[4:] not in fields:
+                plan.append((m, m[1:].lower(), MEMBER_COUNT, None))
+            continue # otherwise, processed with the array
 
         if m == 'mName':
-            target.name = str(_convert_assimp_string(self.mName))
-            target.__class__.__repr__ = lambda x: str(x.__class__) + "(" + getattr(x, 'name','') + ")"
-            target.__class__.__str__ = lambda x: getattr(x, 'name', '')
+            plan.append((m, 'name', MEMBER_NAME, None))
             continue
 
         name = m[1:].lower()
 
-        obj = getattr(self, m)
+        # with numpy, the faces of a mesh are gathered in bulk by _finalize_mesh
+        if m == 'mFaces' and numpy and issubclass(cls, structs.Mesh):
+            continue
 
-        # Create tuples
-        if isinstance(obj, structs.assimp_structs_as_tuple):
-            setattr(target, name, make_tuple(obj))
-            logger.debug(str(self) + ": Added array " + str(getattr(target, name)) +  " as self." + name.lower())
+        if isinstance(fields[m], type) and issubclass(fields[m], structs.assimp_structs_as_tuple):
+            plan.append((m, name, MEMBER_TUPLE, None))
             continue
 
         if m.startswith('m') and len(m) > 1 and m[1].upper() == m[1]:
 
             if name == "parent":
-                setattr(target, name, parent)
-                logger.debug("Added a parent as self." + name)
-                continue
+                plan.append((m, name, MEMBER_PARENT, None))
+            elif 'mNum' + m[1:] in fields:
+                if m == 'mProperties':
+                    plan.append((m, name, MEMBER_PROPERTIES, 'mNum' + m[1:]))
+                else:
+                    plan.append((m, name, MEMBER_ARRAY, 'mNum' + m[1:]))
+            else:
+                plan.append((m, name, MEMBER_VALUE, None))
 
-            if helper.hasattr_silent(self, 'mNum' + m[1:]):
+    res = _plans[cls] = (plan, dict((member[1], member) for member in plan))
+    return res
 
-                length =  getattr(self, 'mNum' + m[1:])
+def _init_member(self, target, parent, member, copy, lazy = False):
+    """
+    Converts a member of the C struct 'self', described by an entry of
+    its conversion plan, and stores the result as an attribute of 'target'.
+    Used by _init for each member in turn, or on demand by LazyStruct.__getattr__.
+    """
+    m, name, kind, length_member = member
 
-                # -> special case: properties are
-                # stored as a dict.
-                if m == 'mProperties':
-                    setattr(target, name, _get_properties(obj, length))
-                    continue
+    if kind == MEMBER_NAME:
+        target.name = str(_convert_assimp_string(self.mName))
+        if isinstance(target, LazyStruct):
+            return
+        target.__class__.__repr__ = lambda x: str(x.__class__) + "(" + getattr(x, 'name','') + ")"
+        target.__class__.__str__ = lambda x: getattr(x, 'name', '')
+        return
 
+    if kind == MEMBER_PARENT:
+        setattr(target, name, parent)
+        logger.debug("Added a parent as self." + name)
+        return
 
-                if not length: # empty!
-                    setattr(target, name, [])
-                    logger.debug(str(self) + ": " + name + " is an empty list.")
-                    continue
+    obj = getattr(self, m)
 
+    if kind == MEMBER_COUNT:
+        setattr(target, name, obj)
+        return
 
-                try:
-                    if obj._type_ in structs.assimp_structs_as_tuple:
-                        if numpy:
-                            setattr(target, name, numpy.array([make_tuple(obj[i]) for i in range(length)], dtype=numpy.float32))
+    # Create tuples
+    if kind == MEMBER_TUPLE:
+        setattr(target, name, make_tuple(obj))
+        logger.debug(str(self) + ": Added array " + str(getattr(target, name)) +  " as self." + name.lower())
+        return
 
-                            logger.debug(str(self) + ": Added an array of numpy arrays (type "+ str(type(obj)) + ") as self." + name)
-                        else:
-                            setattr(target, name, [make_tuple(obj[i]) for i in range(length)])
+    if kind == MEMBER_VALUE: # starts with 'm' but not iterable
+        if lazy and _is_init_type(obj):
+            setattr(target, name, _lazy_struct(obj, target, copy, lazy))
+            return
 
-                            logger.debug(str(self) + ": Added a list of lists (type "+ str(type(obj)) + ") as self." + name)
+        setattr(target, name, obj)
+        logger.debug("Added " + name + " as self." + name + " (type: " + str(type(obj)) + ")")
 
-                    else:
-                        setattr(target, name, [obj[i] for i in range(length)]) #TODO: maybe not necessary to recreate an array?
+        if _is_init_type(obj):
+            call_init(obj, target, copy, lazy)
+        return
+
+    length = getattr(self, length_member)
 
-                        logger.debug(str(self) + ": Added list of " + str(obj) + " " + name + " as self." + name + " (type: " + str(type(obj)) + ")")
+    # -> special case: properties are
+    # stored as a dict.
+    if kind == MEMBER_PROPERTIES:
+        setattr(target, name, _get_properties(obj, length))
+        return
 
-                        # initialize array elements
-                        try:
-                            init = assimp_struct_inits[type(obj[0])]
-                        except KeyError:
-                            if _is_init_type(obj[0]):
-                                for e in getattr(target, name):
-                                    call_init(e, target)
-                        else:
-                            for e in getattr(target, name):
-                                init(e)
 
+    if not length: # empty!
+        setattr(target, name, [])
+        logger.debug(str(self) + ": " + name + " is an empty list.")
+        return
 
-                except IndexError:
-                    logger.error("in " + str(self) +" : mismatch between mNum" + name + " and the actual amount of data in m" + name + ". This may be due to version mismatch between libassimp and pyassimp. Quitting now.")
-                    sys.exit(1)
 
-                except ValueError as e:
+    try:
+        if obj._type_ in structs.assimp_structs_as_tuple:
+            if numpy:
+                setattr(target, name, make_array(obj, length, copy))
+
+                logger.debug(str(self) + ": Added an array of numpy arrays (type "+ str(type(obj)) + ") as self." + name)
+            else:
+                setattr(target, name, [make_tuple(obj[i]) for i in range(length)])
+
+                logger.debug(str(self) + ": Added a list of lists (type "+ str(type(obj)) + ") as self." + name)
+
+        else:
+            setattr(target, name, [obj[i] for i in range(length)]) #TODO: maybe not necessary to recreate an array?
+
+            logger.debug(str(self) + ": Added list of " + str(obj) + " " + name + " as self." + name + " (type: " + str(type(obj)) + ")")
+
+            # initialize array elements
+            try:
+                init = assimp_struct_inits[type(obj[0])]
+            except KeyError:
+                if _is_init_type(obj[0]):
+                    if lazy:
+                        setattr(target, name, [_lazy_struct(e, target, copy, lazy)
+                                               for e in getattr(target, name)])
+                    else:
+                        for e in getattr(target, name):
+                            call_init(e, target, copy, lazy)
+            else:
+                for e in getattr(target, name):
+                    init(e)
 
-                    logger.error("In " + str(self) +  "->" + name + ": " + str(e) + ". Quitting now.")
-                    if "setting an array element with a sequence" in str(e):
-                        logger.error("Note that pyassimp does not currently "
-                                     "support meshes with mixed triangles "
-                                     "and quads. Try to load your mesh with"
-                                     " a post-processing to triangulate your"
-                                     " faces.")
-                    raise e
 
+    except IndexError:
+        logger.error("in " + str(self) +" : mismatch between mNum" + name + " and the actual amount of data in m" + name + ". This may be due to version mismatch between libassimp and pyassimp. Quitting now.")
+        sys.exit(1)
 
+    except ValueError as e:
 
-            else: # starts with 'm' but not iterable
-                setattr(target, m, obj)
-                logger.debug("Added " + name + " as self." + name + " (type: " + str(type(obj)) + ")")
+        logger.error("In " + str(self) +  "->" + name + ": " + str(e) + ". Quitting now.")
+        raise e
 
-                if _is_init_type(obj):
-                    call_init(obj, target)
+# attributes which are built by the _finalize_* functions
+# rather than by _init_member.
+_finalized_names = {
+    structs.Mesh: ('normals', 'tangents', 'bitangents', 'colors', 'texturecoords', 'faces'),
+    structs.Texture: ('achformathint', 'data'),
+    structs.Metadata: ('keys', 'values'),
+    }
 
+def _finalize(self, target, copy = True):
     if isinstance(self, structs.Mesh):
-        _finalize_mesh(self, target)
+        _finalize_mesh(self, target, copy)
 
     if isinstance(self, structs.Texture):
-        _finalize_texture(self, target)
+        _finalize_texture(self, target, copy)
 
     if isinstance(self, structs.Metadata):
         _finalize_metadata(self, target)
 
+class LazyScene(object):
+    """
+    State shared by the LazyStructs of a scene loaded with lazy=True: the
+    scene itself, for the references between its parts, and whether it
+    was released.
+    """
+    def __init__(self):
+        self.scene = None
+        self.released = False
 
-    return self
+class LazyStruct(object):
+    """
+    Stands for an assimp structure of a scene loaded with lazy=True: the
+    members of the structure are converted the first time they are
+    accessed, and cached as regular attributes, so that later accesses
+    do not go through __getattr__ anymore.
 
+    Once the scene is released, accessing a member which was not
+    converted yet raises an AssimpError.
+    """
+    def __init__(self, struct, parent, copy, lazy):
+        self._lazy = (struct, parent, copy, lazy)
+
+    def __getattr__(self, name):
+        lazy = self.__dict__.get('_lazy')
+        if lazy is None or name.startswith('_'):
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
+        struct, parent, copy, state = lazy
+        if state.released:
+            raise AssimpError("Can not read '%s' of %s: the scene was released "
+                              "at the end of the 'with' block of pyassimp.load()"
+                              % (name, type(struct).__name__))
+
+        members = _get_plan(type(struct))[1]
+        finalized = _finalized_names.get(type(struct), ())
+
+        if name in finalized and '_finalized' not in self.__dict__:
+            # same order as _init: the regular members first, then
+            # _finalize_* overrides some of them.
+            self._finalized = True
+            for name_ in finalized:
+                if name_ in members:
+                    _init_member(struct, self, parent, members[name_], copy, lazy=state)
+            _finalize(struct, self, copy)
+        elif name in members:
+            _init_member(struct, self, parent, members[name], copy, lazy=state)
+
+        # what pythonize_scene does for the whole scene when not lazy
+        if name == 'meshes' and isinstance(struct, structs.Node):
+            self.meshes = pythonize_assimp("MESH", self.meshes, state.scene)
+        elif name == 'material' and isinstance(struct, structs.Mesh):
+            self.material = state.scene.materials[self.materialindex]
+        elif name == 'node_index' and isinstance(struct, structs.Scene):
+            self.node_index = NodeIndex(self.rootnode)
+        elif name == 'transformation' and isinstance(struct, (structs.Camera, structs.Light)):
+            pythonize_assimp("ADDTRANSFORMATION", self, state.scene)
+
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(struct).__name__, name))
+
+    def __repr__(self):
+        return str(type(self._lazy[0])) + "(" + str(self) + ")"
+
+    def __str__(self):
+        try:
+            return self.name
+        except (AttributeError, AssimpError):
+            return ''
+
+def _lazy_struct(obj, parent, copy, lazy):
+    """ LazyStruct standing for a structure, or a pointer to a structure. """
+    if helper.hasattr_silent(obj, 'contents'):
+        obj = obj.contents
+    return LazyStruct(obj, parent, copy, lazy)
+
+def _struct(scene):
+    """ The assimp structure of a scene, loaded lazily or not. """
+    if isinstance(scene, LazyStruct):
+        return scene._lazy[0]
+    return scene
+
+class NodeIndex(dict):
+    """
+    Index of the nodes of a scene, built in a single walk of the node tree
+    and available as scene.node_index.
+
+    It maps each node name to its node (the first one in depth-first order
+    when several nodes share a name), and knows the parent and the depth
+    of each node. The nodes themselves are listed in depth-first order in
+    'nodes'.
+    """
+    def __init__(self, rootnode):
+        dict.__init__(self)
+        self.nodes = []
+        self._info = {} # id(node) -> (parent, depth)
+
+        stack = [(rootnode, None, 0)]
+        while stack:
+            node, parent, depth = stack.pop()
+            self.nodes.append(node)
+            self._info[id(node)] = (parent, depth)
+            self.setdefault(node.name, node)
+            stack.extend((child, node, depth + 1) for child in reversed(node.children))
+
+    def parent(self, node):
+        """ Returns the parent of a node of the scene, None for the root node. """
+        return self._info[id(node)][0]
+
+    def depth(self, node):
+        """ Returns the depth of a node of the scene, 0 for the root node. """
+        return self._info[id(node)][1]
 
 def pythonize_assimp(type, obj, scene):
     """ This method modify the Assimp data structures
@@ -250,13 +467,11 @@ def pythonize_assimp(type, obj, scene):
         return meshes
 
     if type == "ADDTRANSFORMATION":
-        def getnode(node, name):
-            if node.name == name: return node
-            for child in node.children:
-                n = getnode(child, name)
-                if n: return n
+        node_index = getattr(scene, 'node_index', None)
+        if node_index is None:
+            node_index = scene.node_index = NodeIndex(scene.rootnode)
 
-        node = getnode(scene.rootnode, obj.name)
+        node = node_index.get(obj.name)
         if not node:
             raise AssimpError("Object " + str(obj) + " has no associated node!")
         setattr(obj, "transformation", node.transformation)
@@ -270,21 +485,33 @@ def recur_pythonize(node, scene):
     node.meshes = pythonize_assimp("MESH", node.meshes, scene)
     for mesh in node.meshes:
         mesh.material = scene.materials[mesh.materialindex]
-    for cam in scene.cameras:
-        pythonize_assimp("ADDTRANSFORMATION", cam, scene)
     for c in node.children:
         recur_pythonize(c, scene)
 
+def pythonize_scene(scene):
+    '''
+    Apply the post-processing of recur_pythonize to the whole scene, index
+    its nodes and bind the cameras and the lights to their nodes.
+    '''
+    recur_pythonize(scene.rootnode, scene)
+    scene.node_index = NodeIndex(scene.rootnode)
+    for obj in scene.cameras + scene.lights:
+        pythonize_assimp("ADDTRANSFORMATION", obj, scene)
+
 def release(scene):
     '''
     Release resources of a loaded scene.
     '''
-    _assimp_lib.release(ctypes.pointer(scene))
+    if isinstance(scene, LazyStruct):
+        scene._lazy[3].released = True
+    _assimp_lib.release(ctypes.pointer(_struct(scene)))
 
 @contextmanager
 def load(filename,
          file_type  = None,
-         processing = postprocess.aiProcess_Triangulate):
+         processing = postprocess.aiProcess_Triangulate,
+         copy       = True,
+         lazy       = False):
     '''
     Load a model into a scene. On failure throws AssimpError.
 
@@ -301,6 +528,20 @@ def load(filename,
                 processing = (pyassimp.postprocess.aiProcess_Triangulate |
                               pyassimp.postprocess.aiProcess_OptimizeMeshes)
     file_type:  string of file extension, such as 'stl'
+    copy:       if False (and numpy is available), the mesh vertices, normals,
+                tangents, bitangents, colors and texture coordinates are
+                numpy views over the memory owned by assimp instead of copies.
+                These views are only valid inside the 'with' block: copy them
+                if they must outlive the scene. Colors and texture coordinates
+                are (channels, vertices, n) arrays when copied, and lists of
+                per-channel views otherwise.
+    lazy:       if True, the members of the assimp structures are converted
+                the first time they are accessed instead of all at once, which
+                makes loading nearly free for code that only inspects parts
+                of the scene. The parts of the scene are then LazyStruct
+                objects: the members which were not accessed inside the
+                'with' block can not be accessed anymore after it, they
+                raise an AssimpError.
 
     Returns
     ---------
@@ -327,8 +568,12 @@ def load(filename,
 
     if not model:
         raise AssimpError('Could not import file!')
-    scene = _init(model.contents)
-    recur_pythonize(scene.rootnode, scene)
+    if lazy:
+        lazy = LazyScene()
+        scene = lazy.scene = _init(model.contents, copy=copy, lazy=lazy)
+    else:
+        scene = _init(model.contents, copy=copy)
+        pythonize_scene(scene)
     try:
         yield scene
     finally:
@@ -355,7 +600,7 @@ def export(scene,
 
     '''
 
-    exportStatus = _assimp_lib.export(ctypes.pointer(scene), file_type.encode("ascii"), filename.encode(sys.getfilesystemencoding()), processing)
+    exportStatus = _assimp_lib.export(ctypes.pointer(_struct(scene)), file_type.encode("ascii"), filename.encode(sys.getfilesystemencoding()), processing)
 
     if exportStatus != 0:
         raise AssimpError('Could not export scene!')
@@ -380,21 +625,88 @@ def export_blob(scene,
     ---------
     Pointer to structs.ExportDataBlob
     '''
-    exportBlobPtr = _assimp_lib.export_blob(ctypes.pointer(scene), file_type.encode("ascii"), processing)
+    exportBlobPtr = _assimp_lib.export_blob(ctypes.pointer(_struct(scene)), file_type.encode("ascii"), processing)
 
     if exportBlobPtr == 0:
         raise AssimpError('Could not export scene to blob!')
     return exportBlobPtr
 
-def _finalize_texture(tex, target):
+def _finalize_texture(tex, target, copy = True):
+    """ Exposes the pixels of an embedded texture as target.data.
+
+    Uncompressed textures (mHeight > 0) become a (height, width, 4) uint8
+    numpy array, in the BGRA order of aiTexel, read without visiting each
+    texel in Python.
+
+    Compressed textures (mHeight == 0: png, jpg... as found in GLB files)
+    are mWidth bytes of an image file, whose format is given by
+    achformathint: they become a bytes object.
+
+    :param copy: if False, data is a view over the memory owned by assimp
+    (a numpy array or a memoryview), valid only until the scene is released.
+    """
     setattr(target, "achformathint", tex.achFormatHint)
-    if numpy:
-        data = numpy.array([make_tuple(getattr(tex, "pcData")[i]) for i in range(tex.mWidth * tex.mHeight)])
+
+    if tex.mWidth and not tex.pcData:
+        raise AssimpError("Embedded texture '%s' has a size (%dx%d) but no data"
+                          % (_convert_assimp_string(tex.mFilename), tex.mWidth, tex.mHeight))
+
+    if tex.mHeight == 0:
+        data = (ctypes.c_ubyte * tex.mWidth).from_address(ctypes.addressof(tex.pcData.contents)) if tex.mWidth else b''
+        data = memoryview(data) if not copy else bytes(data)
+    elif numpy:
+        data = make_array(tex.pcData, tex.mWidth * tex.mHeight, copy).reshape((tex.mHeight, tex.mWidth, 4))
     else:
         data = [make_tuple(getattr(tex, "pcData")[i]) for i in range(tex.mWidth * tex.mHeight)]
     setattr(target, "data", data)
 
-def _finalize_mesh(mesh, target):
+def _get_faces(mesh):
+    """ Gathers the indices of all the faces of a mesh in a numpy array.
+
+    The aiFace array is read in bulk, without building a Python list per
+    face. When the index buffers of the faces follow each other in memory,
+    they are all copied with a single memmove; otherwise each one is copied
+    with its own memmove, which is still one C call per face.
+
+    Returns a (nb_faces, n) int32 array if all the faces have the same number
+    n of indices (n = 3 for meshes loaded with aiProcess_Triangulate), or a
+    CSR-like (offsets, indices) pair of arrays for meshes mixing several
+    kinds of polygons: face i is then indices[offsets[i]:offsets[i+1]].
+    """
+    nb_faces = mesh.mNumFaces
+    if not nb_faces:
+        return numpy.zeros((0, 3), dtype=numpy.int32)
+
+    face_dtype = numpy.dtype({'names': ['count', 'indices'],
+                              'formats': [numpy.uint32, numpy.uintp],
+                              'offsets': [structs.Face.mNumIndices.offset,
+                                          structs.Face.mIndices.offset],
+                              'itemsize': ctypes.sizeof(structs.Face)})
+    raw = numpy.ctypeslib.as_array(ctypes.cast(mesh.mFaces, ctypes.POINTER(ctypes.c_ubyte)),
+                                   shape=(nb_faces * face_dtype.itemsize,))
+    faces = raw.view(face_dtype)
+
+    counts = faces['count'].astype(numpy.intp)
+    offsets = numpy.zeros(nb_faces + 1, dtype=numpy.intp)
+    numpy.cumsum(counts, out=offsets[1:])
+
+    indices = numpy.empty(offsets[-1], dtype=numpy.int32)
+    address = indices.ctypes.data
+    itemsize = indices.itemsize
+    pointers = faces['indices']
+    if (numpy.diff(pointers.astype(numpy.intp)) == counts[:-1] * itemsize).all():
+        # contiguous index buffers, as one allocation split into faces
+        ctypes.memmove(address, int(pointers[0]), int(offsets[-1]) * itemsize)
+    else:
+        memmove = ctypes.memmove
+        for pointer, offset, count in zip(pointers.tolist(), offsets.tolist(), counts.tolist()):
+            memmove(address + offset * itemsize, pointer, count * itemsize)
+
+    if (counts == counts[0]).all():
+        return indices.reshape((nb_faces, int(counts[0])))
+    return offsets, indices
+
+def _finalize_mesh(mesh, target, copy = True):
     """ Building of meshes is a bit specific.
 
     We override here the various datasets that can
@@ -409,7 +721,7 @@ def _finalize_mesh(mesh, target):
         mAttr = getattr(mesh, name)
         if numpy:
             if mAttr:
-                data = numpy.array([make_tuple(getattr(mesh, name)[i]) for i in range(nb_vertices)], dtype=numpy.float32)
+                data = make_array(mAttr, nb_vertices, copy)
                 setattr(target, name[1:].lower(), data)
             else:
                 setattr(target, name[1:].lower(), numpy.array([], dtype="float32"))
@@ -426,12 +738,16 @@ def _finalize_mesh(mesh, target):
         data = []
         for index, mSubAttr in enumerate(mAttr):
             if mSubAttr:
-                data.append([make_tuple(getattr(mesh, name)[index][i]) for i in range(nb_vertices)])
+                if numpy:
+                    data.append(make_array(mSubAttr, nb_vertices, copy=False))
+                else:
+                    data.append([make_tuple(getattr(mesh, name)[index][i]) for i in range(nb_vertices)])
 
-        if numpy:
-            setattr(target, name[1:].lower(), numpy.array(data, dtype=numpy.float32))
-        else:
-            setattr(target, name[1:].lower(), data)
+        # copies are stacked in a single (channels, vertices, n) array, views
+        # can not be: they stay a list with one view per channel.
+        if numpy and copy:
+            data = numpy.array(data, dtype=numpy.float32)
+        setattr(target, name[1:].lower(), data)
 
     fill("mNormals")
     fill("mTangents")
@@ -442,7 +758,7 @@ def _finalize_mesh(mesh, target):
 
     # prepare faces
     if numpy:
-        faces = numpy.array([f.indices for f in target.faces], dtype=numpy.int32)
+        faces = _get_faces(mesh)
     else:
         faces = [f.indices for f in target.faces]
     setattr(target, 'faces', faces)
@@ -484,6 +800,25 @@ def _finalize_metadata(metadata, target):
     setattr(target, 'values', [_init_metadata_entry(metadata.mValues[i]) for i in range(length)])
 
 class PropertyGetter(dict):
+    """
+    Properties of a material, by (key, semantic).
+
+    Identical materials share the same PropertyGetter, even across scenes
+    (see _get_properties), so it is read-only: modifying it raises a
+    TypeError, and the values of array properties (colors...) are tuples.
+    It is hashable, by content, so that materials can be compared and
+    deduplicated cheaply.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("material properties are shared between identical "
+                        "materials and can not be modified: copy them with dict()")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self):
+        return (PropertyGetter, (list(dict.items(self)),))
+
     def __getitem__(self, key):
         semantic = 0
         if isinstance(key, tuple):
@@ -502,43 +837,93 @@ class PropertyGetter(dict):
         for k, v in dict.items(self):
             yield k[0], v
 
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return dict.__eq__(self, other)
 
-def _get_properties(properties, length):
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(sorted(dict.items(self))))
+            return self._hash
+
+def _frozen(value):
+    """ Immutable equivalent of a material property value. """
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return tuple(value.ravel().tolist())
+    if isinstance(value, list):
+        return tuple(_frozen(v) for v in value)
+    return value
+
+# Offset of the characters of mKey in an aiMaterialProperty
+_KEY_DATA_OFFSET = structs.MaterialProperty.mKey.offset + structs.String.data.offset
+
+_intern = getattr(sys, 'intern', None) or intern
+
+# Raw mKey -> interned property name ("$clr.diffuse" -> "diffuse")
+_property_names = {}
+
+# Decoded properties of the materials of all the loaded scenes, keyed by
+# their raw content: identical materials are decoded once and share their
+# read-only PropertyGetter.
+_material_table = weakref.WeakValueDictionary()
+
+def _decode_property(type, data):
     """
-    Convenience Function to get the material properties as a dict
-    and values in a python format.
+    Converts the raw data of a material property to a python value: a
+    number, a string, bytes, or a tuple for the arrays.
     """
-    result = {}
-    #read all properties
-    for p in [properties[i] for i in range(length)]:
-        #the name
-        p = p.contents
-        key = str(_convert_assimp_string(p.mKey))
-        key = (key.split('.')[1], p.mSemantic)
-
-        #the data
-        if p.mType == 1:
-            arr = ctypes.cast(p.mData,
-                              ctypes.POINTER(ctypes.c_float * int(p.mDataLength/ctypes.sizeof(ctypes.c_float)))
-                              ).contents
-            value = [x for x in arr]
-        elif p.mType == 3: #string can't be an array
-            value = _convert_assimp_string(ctypes.cast(p.mData, ctypes.POINTER(structs.MaterialPropertyString)).contents)
-
-        elif p.mType == 4:
-            arr = ctypes.cast(p.mData,
-                              ctypes.POINTER(ctypes.c_int * int(p.mDataLength/ctypes.sizeof(ctypes.c_int)))
-                              ).contents
-            value = [x for x in arr]
-        else:
-            value = p.mData[:p.mDataLength]
+    if type == 1:
+        value = tuple(numpy.frombuffer(data, numpy.float32).tolist() if numpy else array.array('f', data))
+    elif type == 2:
+        value = tuple(numpy.frombuffer(data, numpy.float64).tolist() if numpy else array.array('d', data))
+    elif type == 3: #string can't be an array (see MaterialPropertyString)
+        length = struct.unpack_from('I', data)[0]
+        value = data[4:4 + length].split(b'\0', 1)[0].decode('utf-8', 'ignore')
+    elif type == 4:
+        value = tuple(numpy.frombuffer(data, numpy.int32).tolist() if numpy else array.array('i', data))
+    else:
+        value = data
 
-        if len(value) == 1:
-            [value] = value
+    if len(value) == 1:
+        [value] = value
 
-        result[key] = value
+    return value
 
-    return PropertyGetter(result)
+def _get_properties(properties, length):
+    """
+    Convenience Function to get the material properties as a dict
+    and values in a python format.
+
+    The raw bytes of the properties are read first: a material identical
+    to one already seen gets the PropertyGetter of that one, without
+    decoding anything.
+    """
+    raw = []
+    for i in range(length):
+        p = properties[i].contents
+        key = ctypes.string_at(ctypes.addressof(p) + _KEY_DATA_OFFSET, p.mKey.length)
+        raw.append((key, p.mSemantic, p.mType, ctypes.string_at(p.mData, p.mDataLength)))
+    raw = tuple(raw)
+
+    result = _material_table.get(raw)
+    if result is not None:
+        return result
+
+    result = PropertyGetter()
+    for key, semantic, type, data in raw:
+        name = _property_names.get(key)
+        if name is None:
+            name = _property_names[key] = _intern(key.decode('utf-8', 'ignore').split('.')[1])
+        dict.__setitem__(result, (name, semantic), _decode_property(type, data))
+
+    _material_table[raw] = result
+    return result
 
 def decompose_matrix(matrix):
     if not isinstance(matrix, structs.Matrix4x4):
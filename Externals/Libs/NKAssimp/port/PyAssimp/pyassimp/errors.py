@@ -4,7 +4,7 @@
 All possible errors.
 """
 
-class AssimpError(BaseException):
+class AssimpError(Exception):
     """
     If an internal error occurs.
     """
@@ -5,6 +5,7 @@ Some fancy helper functions.
 """
 
 import os
+import json
 import ctypes
 import operator
 
@@ -108,57 +109,205 @@ def _inv(matrix4x4):
             ( m0[2]*m1[1]*m3[0] - m0[1]*m1[2]*m3[0] - m0[2]*m1[0]*m3[1] + m0[0]*m1[2]*m3[1] + m0[1]*m1[0]*m3[2] - m0[0]*m1[1]*m3[2]) /det,
             ( m0[1]*m1[2]*m2[0] - m0[2]*m1[1]*m2[0] + m0[2]*m1[0]*m2[1] - m0[0]*m1[2]*m2[1] - m0[1]*m1[0]*m2[2] + m0[0]*m1[1]*m2[2]) /det]]
 
+def _mul(a, b):
+    """ Product of two 4x4 matrices given as nested lists. """
+    return [[sum(row[k] * b[k][j] for k in range(4)) for j in range(4)] for row in a]
+
+def _node_index(scene):
+    node_index = getattr(scene, 'node_index', None)
+    if node_index is None:
+        from .core import NodeIndex
+        node_index = NodeIndex(scene.rootnode)
+    return node_index
+
+def _world_transformations(node_index, transformation):
+    """
+    World matrices of the nodes of node_index.nodes, the parent of the
+    root node having the given transformation.
+
+    With numpy, the nodes of the same depth are multiplied by the matrix
+    of their parent in one batched product.
+    """
+    nodes = node_index.nodes
+
+    if not numpy:
+        position = {}
+        world = []
+        for i, node in enumerate(nodes):
+            position[id(node)] = i
+            parent = node_index.parent(node) if i else None
+            world.append(_mul(world[position[id(parent)]] if parent is not None else transformation,
+                              node.transformation))
+        return world
+
+    position = dict((id(node), i) for i, node in enumerate(nodes))
+    local = numpy.array([numpy.asarray(node.transformation, dtype=numpy.float64).reshape((4, 4))
+                         for node in nodes])
+    world = numpy.empty_like(local)
+    world[0] = numpy.dot(transformation, local[0])
+
+    levels = {}
+    parents = numpy.zeros(len(nodes), dtype=numpy.intp)
+    for i, node in enumerate(nodes[1:], 1):
+        parents[i] = position[id(node_index.parent(node))]
+        levels.setdefault(node_index.depth(node), []).append(i)
+
+    for depth in sorted(levels):
+        level = numpy.array(levels[depth], dtype=numpy.intp)
+        world[level] = numpy.matmul(world[parents[level]], local[level])
+    return world
+
+def get_world_transformations(scene, transformation = None):
+    """ Computes the world matrix of every node of a scene, in one walk
+    of the node tree.
+
+    :param scene: a scene loaded by pyassimp.load() (or pyassimp.cache.load())
+    :param transformation: matrix of the parent of the root node, identity by default
+    :return: the world matrices in the order of scene.node_index.nodes, as
+    a (nodes, 4, 4) numpy array (list of 4x4 lists without numpy)
+    """
+    if transformation is None:
+        transformation = numpy.identity(4) if numpy else [[float(i == j) for j in range(4)] for i in range(4)]
+    return _world_transformations(_node_index(scene), transformation)
+
+def _bounding_box(node_index, bb_min, bb_max, transformation):
+    world = _world_transformations(node_index, transformation)
+    for node, matrix in zip(node_index.nodes, world):
+        for mesh in node.meshes:
+            if numpy:
+                vertices = numpy.asarray(mesh.vertices, dtype=numpy.float64).reshape((-1, 3))
+                if not len(vertices):
+                    continue
+                vertices = numpy.dot(vertices, matrix[:3, :3].T) + matrix[:3, 3]
+                lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+            else:
+                vertices = [transform(v, matrix) for v in mesh.vertices]
+                if not vertices:
+                    continue
+                lo = [min(v[i] for v in vertices) for i in range(3)]
+                hi = [max(v[i] for v in vertices) for i in range(3)]
+            for i in range(3):
+                bb_min[i] = min(bb_min[i], float(lo[i]))
+                bb_max[i] = max(bb_max[i], float(hi[i]))
+    return bb_min, bb_max
+
 def get_bounding_box(scene):
     bb_min = [1e10, 1e10, 1e10] # x,y,z
     bb_max = [-1e10, -1e10, -1e10] # x,y,z
     inv = numpy.linalg.inv if numpy else _inv
-    return get_bounding_box_for_node(scene.rootnode, bb_min, bb_max, inv(scene.rootnode.transformation))
+    return _bounding_box(_node_index(scene), bb_min, bb_max, inv(scene.rootnode.transformation))
 
 def get_bounding_box_for_node(node, bb_min, bb_max, transformation):
+    from .core import NodeIndex
+    return _bounding_box(NodeIndex(node), bb_min, bb_max, transformation)
 
-    if numpy:
-        transformation = numpy.dot(transformation, node.transformation)
-    else:
-        t0,t1,t2,t3 = transformation
-        T0,T1,T2,T3 = node.transformation
-        transformation = [ [
-                t0[0]*T0[0] + t0[1]*T1[0] + t0[2]*T2[0] + t0[3]*T3[0],
-                t0[0]*T0[1] + t0[1]*T1[1] + t0[2]*T2[1] + t0[3]*T3[1],
-                t0[0]*T0[2] + t0[1]*T1[2] + t0[2]*T2[2] + t0[3]*T3[2],
-                t0[0]*T0[3] + t0[1]*T1[3] + t0[2]*T2[3] + t0[3]*T3[3]
-            ],[
-                t1[0]*T0[0] + t1[1]*T1[0] + t1[2]*T2[0] + t1[3]*T3[0],
-                t1[0]*T0[1] + t1[1]*T1[1] + t1[2]*T2[1] + t1[3]*T3[1],
-                t1[0]*T0[2] + t1[1]*T1[2] + t1[2]*T2[2] + t1[3]*T3[2],
-                t1[0]*T0[3] + t1[1]*T1[3] + t1[2]*T2[3] + t1[3]*T3[3]
-            ],[
-                t2[0]*T0[0] + t2[1]*T1[0] + t2[2]*T2[0] + t2[3]*T3[0],
-                t2[0]*T0[1] + t2[1]*T1[1] + t2[2]*T2[1] + t2[3]*T3[1],
-                t2[0]*T0[2] + t2[1]*T1[2] + t2[2]*T2[2] + t2[3]*T3[2],
-                t2[0]*T0[3] + t2[1]*T1[3] + t2[2]*T2[3] + t2[3]*T3[3]
-            ],[
-                t3[0]*T0[0] + t3[1]*T1[0] + t3[2]*T2[0] + t3[3]*T3[0],
-                t3[0]*T0[1] + t3[1]*T1[1] + t3[2]*T2[1] + t3[3]*T3[1],
-                t3[0]*T0[2] + t3[1]*T1[2] + t3[2]*T2[2] + t3[3]*T3[2],
-                t3[0]*T0[3] + t3[1]*T1[3] + t3[2]*T2[3] + t3[3]*T3[3]
-            ] ]
-
-    for mesh in node.meshes:
-        for v in mesh.vertices:
-            v = transform(v, transformation)
-            bb_min[0] = min(bb_min[0], v[0])
-            bb_min[1] = min(bb_min[1], v[1])
-            bb_min[2] = min(bb_min[2], v[2])
-            bb_max[0] = max(bb_max[0], v[0])
-            bb_max[1] = max(bb_max[1], v[1])
-            bb_max[2] = max(bb_max[2], v[2])
-
-
-    for child in node.children:
-        bb_min, bb_max = get_bounding_box_for_node(child, bb_min, bb_max, transformation)
+def get_mesh_bounding_boxes(scene):
+    """ Computes the axis-aligned bounding box of every mesh of a scene,
+    in the space of the mesh. Requires numpy.
 
+    :param scene: a scene loaded by pyassimp.load() (or pyassimp.cache.load())
+    :return: (bb_min, bb_max), two (meshes, 3) arrays in the order of
+    scene.meshes. Meshes without vertices have an inf/-inf box.
+    """
+    if not numpy:
+        raise AssimpError('get_mesh_bounding_boxes requires numpy')
+
+    bb_min = numpy.full((len(scene.meshes), 3), numpy.inf)
+    bb_max = numpy.full((len(scene.meshes), 3), -numpy.inf)
+    for i, mesh in enumerate(scene.meshes):
+        vertices = numpy.asarray(mesh.vertices).reshape((-1, 3))
+        if len(vertices):
+            bb_min[i] = vertices.min(axis=0)
+            bb_max[i] = vertices.max(axis=0)
     return bb_min, bb_max
 
+def get_node_bounding_boxes(scene, transformation = None):
+    """ Computes the world space axis-aligned bounding box of every node of
+    a scene, enclosing the meshes of the node and of all its descendants,
+    for hierarchical culling. Requires numpy.
+
+    The boxes are obtained by transforming the corners of the mesh boxes
+    of get_mesh_bounding_boxes(): they may be larger than the exact
+    bounds of the transformed vertices, never smaller.
+
+    :param scene: a scene loaded by pyassimp.load() (or pyassimp.cache.load())
+    :param transformation: matrix of the parent of the root node, identity by default
+    :return: (bb_min, bb_max), two (nodes, 3) arrays in the order of
+    scene.node_index.nodes. Nodes without any mesh below them have an
+    inf/-inf box.
+    """
+    if not numpy:
+        raise AssimpError('get_node_bounding_boxes requires numpy')
+
+    node_index = _node_index(scene)
+    nodes = node_index.nodes
+    world = get_world_transformations(scene, transformation)
+    mesh_min, mesh_max = get_mesh_bounding_boxes(scene)
+
+    # the 8 corners of each mesh box, (meshes, 8, 3)
+    select = numpy.array([[(c >> axis) & 1 for axis in range(3)] for c in range(8)], dtype=bool)
+    corners = numpy.where(select, mesh_max[:, None, :], mesh_min[:, None, :])
+
+    # every (node, mesh) instance of the scene
+    mesh_position = dict((id(mesh), i) for i, mesh in enumerate(scene.meshes))
+    instances = [(i, mesh_position[id(mesh)]) for i, node in enumerate(nodes) for mesh in node.meshes]
+    instances = numpy.array(instances, dtype=numpy.intp).reshape((-1, 2))
+    instances = instances[numpy.isfinite(mesh_min[instances[:, 1], 0])]
+    node_of, mesh_of = instances[:, 0], instances[:, 1]
+
+    matrices = world[node_of]
+    points = numpy.matmul(corners[mesh_of], matrices[:, :3, :3].transpose(0, 2, 1)) + matrices[:, None, :3, 3]
+
+    bb_min = numpy.full((len(nodes), 3), numpy.inf)
+    bb_max = numpy.full((len(nodes), 3), -numpy.inf)
+    numpy.minimum.at(bb_min, node_of, points.min(axis=1))
+    numpy.maximum.at(bb_max, node_of, points.max(axis=1))
+
+    # merge the boxes of the children into their parent, deepest nodes first
+    position = dict((id(node), i) for i, node in enumerate(nodes))
+    for node in reversed(nodes[1:]):
+        i, parent = position[id(node)], position[id(node_index.parent(node))]
+        numpy.minimum(bb_min[parent], bb_min[i], out=bb_min[parent])
+        numpy.maximum(bb_max[parent], bb_max[i], out=bb_max[parent])
+    return bb_min, bb_max
+
+def _decode_with_pil(data, formathint):
+    try:
+        from PIL import Image
+    except ImportError:
+        raise AssimpError('decoding compressed textures requires Pillow (or a decode function)')
+    import io
+    return numpy.asarray(Image.open(io.BytesIO(data)).convert('RGBA'))
+
+def decode_textures(textures, decode = None, workers = None):
+    """ Decodes embedded textures to (height, width, 4) uint8 RGBA arrays,
+    ready to be uploaded. Requires numpy.
+
+    Uncompressed textures are reordered from BGRA to RGBA. Compressed ones
+    (png, jpg...) are decoded by 'decode', with Pillow by default.
+
+    :param textures: embedded textures, e.g. scene.textures
+    :param decode: function (data, achformathint) -> RGBA array, used for the compressed textures
+    :param workers: if greater than 1, the compressed textures are decoded in that many threads
+    (image decoders release the GIL while decoding)
+    :return: the list of the decoded textures, in the order of 'textures'
+    """
+    if not numpy:
+        raise AssimpError('decode_textures requires numpy')
+    decode = decode or _decode_with_pil
+
+    def decode_texture(texture):
+        if isinstance(texture.data, numpy.ndarray):
+            return texture.data[..., [2, 1, 0, 3]]
+        return decode(texture.data, texture.achformathint)
+
+    if not workers or workers <= 1:
+        return [decode_texture(texture) for texture in textures]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(decode_texture, textures))
+
 def try_load_functions(library_path, dll):
     '''
     Try to bind to aiImportFile and aiReleaseImport
@@ -199,11 +348,106 @@ def try_load_functions(library_path, dll):
     export2blob.restype = ctypes.POINTER(ExportDataBlob)
     return (library_path, load, load_mem, export, export2blob, release, dll)
 
+def _load_library(library_path):
+    """ dlopen a library, and bind the functions pyassimp needs. Returns
+    the tuple of try_load_functions(), or None. """
+    logger.debug('Try ' + library_path)
+    try:
+        dll = ctypes.cdll.LoadLibrary(library_path)
+    except Exception as e:
+        logger.warning(str(e))
+        # OK, this except is evil. But different OSs will throw different
+        # errors. So just ignore any errors.
+        return None
+    # see if the functions we need are in the dll
+    return try_load_functions(library_path, dll)
+
+def _list_candidates(folders):
+    """ Files of the search folders which may be the assimp library,
+    newest first. """
+    candidates = []
+    for curfolder in folders:
+        if os.path.isdir(curfolder):
+            for filename in os.listdir(curfolder):
+                # our minimum requirement for candidates is that
+                # they should contain 'assimp' somewhere in
+                # their name
+                if filename.lower().find('assimp')==-1 :
+                    continue
+                if not any(et in filename.lower() for et in ext_whitelist):
+                    continue
+                library_path = os.path.join(curfolder, filename)
+                try:
+                    candidates.append((os.lstat(library_path).st_mtime, library_path))
+                except OSError:
+                    continue
+    # stable: the first of the candidates of the same age wins
+    candidates.sort(key=operator.itemgetter(0), reverse=True)
+    return [library_path for mtime, library_path in candidates]
+
+def _mtime(path, stat = os.stat):
+    try:
+        st = stat(path)
+    except OSError:
+        return None
+    try:
+        return st.st_mtime_ns
+    except AttributeError: # Python 2
+        return int(st.st_mtime * 1e9)
+
+def _discovery_state(folders, candidates):
+    """ What the choice of the library depends on: the content of the
+    search folders (their mtimes change when files are added, removed or
+    renamed), and the age of the candidates. """
+    return {'folders': [[f, _mtime(f)] for f in folders],
+            'candidates': [[c, _mtime(c, os.lstat)] for c in candidates]}
+
+def _discovery_cache():
+    return os.path.join(user_cache_dir(), 'library.json')
+
+def _cached_library(folders):
+    """ The library chosen by the last discovery, if the search folders
+    did not change since then. """
+    try:
+        with open(_discovery_cache()) as f:
+            cached = json.load(f)
+        state = _discovery_state(folders, [c for c, mtime in cached['candidates']])
+        if (cached['folders'], cached['candidates']) != (state['folders'], state['candidates']):
+            return None
+        return cached['library']
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+def _save_discovery(folders, candidates, library_path):
+    state = _discovery_state(folders, candidates)
+    state['library'] = library_path
+    filename = _discovery_cache()
+    try:
+        if not os.path.isdir(os.path.dirname(filename)):
+            os.makedirs(os.path.dirname(filename))
+        temp = '%s.%d' % (filename, os.getpid())
+        with open(temp, 'w') as f:
+            json.dump(state, f)
+        # Python 2 has no os.replace: os.rename fails on Windows when the
+        # cache file exists, it is then left as it is
+        getattr(os, 'replace', os.rename)(temp, filename)
+    except (IOError, OSError):
+        # read-only cache directory: discover the library every time
+        pass
+
 def search_library():
     '''
     Loads the assimp library.
     Throws exception AssimpError if no library_path is found
 
+    The library is the one named by the PYASSIMP_LIBRARY environment
+    variable if it is set. Otherwise, it is the newest file with 'assimp'
+    in its name and a library extension, among the files of the folder of
+    pyassimp and of 'additional_dirs', which provides the functions
+    pyassimp needs. The choice is remembered in the user cache directory
+    (see user_cache_dir()) until the content of the folders changes, and
+    only the chosen library is loaded.
+
     Returns: tuple, (load from filename function,
                      load from memory function,
                      export to filename function,
@@ -211,61 +455,56 @@ def search_library():
                      release function,
                      dll)
     '''
-    #this path
-    folder = os.path.dirname(__file__)
-
     # silence 'DLL not found' message boxes on win
     try:
         ctypes.windll.kernel32.SetErrorMode(0x8007)
     except AttributeError:
         pass
 
-    candidates = []
-    # test every file
-    for curfolder in [folder]+additional_dirs:
-        if os.path.isdir(curfolder):
-            for filename in os.listdir(curfolder):
-                # our minimum requirement for candidates is that
-                # they should contain 'assimp' somewhere in
-                # their name                                  
-                if filename.lower().find('assimp')==-1 : 
-                    continue
-                is_out=1
-                for et in ext_whitelist:
-                  if et in filename.lower():
-                    is_out=0
-                    break
-                if is_out:
-                  continue
-                
-                library_path = os.path.join(curfolder, filename)
-                logger.debug('Try ' + library_path)
-                try:
-                    dll = ctypes.cdll.LoadLibrary(library_path)
-                except Exception as e:
-                    logger.warning(str(e))
-                    # OK, this except is evil. But different OSs will throw different
-                    # errors. So just ignore any errors.
-                    continue
-                # see if the functions we need are in the dll
-                loaded = try_load_functions(library_path, dll)
-                if loaded: candidates.append(loaded)
-
-    if not candidates:
+    override = os.environ.get('PYASSIMP_LIBRARY')
+    if override:
+        loaded = _load_library(override)
+        if not loaded:
+            raise AssimpError("PYASSIMP_LIBRARY: %s is not an assimp library" % override)
+        return loaded[1:]
+
+    #this path, and the others
+    folders = [os.path.abspath(f) for f in [os.path.dirname(__file__)]+additional_dirs]
+
+    cached = _cached_library(folders)
+    if cached:
+        loaded = _load_library(cached)
+        if loaded:
+            logger.debug('Using assimp library located at ' + cached)
+            return loaded[1:]
+
+    # try the newest candidates first, until one has the functions we need
+    candidates = _list_candidates(folders)
+    for library_path in candidates:
+        loaded = _load_library(library_path)
+        if loaded:
+            break
+    else:
         # no library found
         raise AssimpError("assimp library not found")
-    else:
-        # get the newest library_path
-        candidates = map(lambda x: (os.lstat(x[0])[-2], x), candidates)
-        res = max(candidates, key=operator.itemgetter(0))[1]
-        logger.debug('Using assimp library located at ' + res[0])
 
-        # XXX: if there are 1000 dll/so files containing 'assimp'
-        # in their name, do we have all of them in our address
-        # space now until gc kicks in?
+    logger.debug('Using assimp library located at ' + library_path)
+    _save_discovery(folders, candidates, library_path)
 
-        # XXX: take version postfix of the .so on linux?
-        return res[1:]
+    # XXX: take version postfix of the .so on linux?
+    return loaded[1:]
+
+def user_cache_dir():
+    """
+    Returns the directory where pyassimp keeps its caches: a 'pyassimp'
+    folder in %LOCALAPPDATA% on Windows, in $XDG_CACHE_HOME or ~/.cache
+    elsewhere. The directory is not created.
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'pyassimp')
 
 def hasattr_silent(object, name):
     """
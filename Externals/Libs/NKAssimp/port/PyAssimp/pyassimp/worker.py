@@ -0,0 +1,270 @@
+#-*- coding: UTF-8 -*-
+
+"""
+Warm import workers.
+
+pyassimp.worker.WorkerPool keeps worker processes which load the assimp
+library once, when they start, and then import the files they receive
+through a pipe, one after the other: the cost of each file is the
+import itself, not the start of a process and the loading of the
+library. Each import either returns a summary of the scene (see
+summarize()) or exports it to a file, like 'assimp export' would.
+
+Workers are replaced after a number of imports, or when their memory
+use reaches a watermark, so that the leaks and the fragmentation of
+long runs do not accumulate. A worker which crashes or hangs only fails
+the file it was importing.
+"""
+
+import os
+import sys
+import time
+import logging
+import collections
+import multiprocessing
+from multiprocessing.connection import wait
+
+from . import core
+from . import postprocess
+
+logger = logging.getLogger("pyassimp")
+
+class WorkerResult(object):
+    """
+    Outcome of the import of one file by a WorkerPool.
+
+    filename: the imported file.
+    value:    the summary of the scene (see summarize()), or the size in
+              bytes of the exported file. None on failure.
+    error:    None on success, otherwise a description of the failure.
+    elapsed:  import time in the worker, in seconds.
+    rss:      memory use of the worker after the import, in bytes, or
+              None where the platform does not report it.
+    """
+    def __init__(self, filename, value = None, error = None, elapsed = 0., rss = None):
+        self.filename = filename
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+        self.rss = rss
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "WorkerResult(%r, %s)" % (self.filename, "ok" if self.ok else self.error)
+
+def _rss():
+    """
+    Resident set size of this process, in bytes: the current one on
+    Linux, the peak one on the other unixes, None on Windows.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def _count_faces(mesh):
+    faces = mesh.faces
+    if isinstance(faces, tuple): # (offsets, indices) of mixed polygons
+        return len(faces[0]) - 1
+    return len(faces)
+
+def summarize(scene):
+    """
+    Summary of a scene: the number of each kind of object it holds, and
+    the total number of vertices and faces of its meshes.
+    """
+    nodes = 0
+    stack = [scene.rootnode]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        stack.extend(node.children)
+    return {'meshes': len(scene.meshes),
+            'vertices': sum(len(mesh.vertices) for mesh in scene.meshes),
+            'faces': sum(_count_faces(mesh) for mesh in scene.meshes),
+            'materials': len(scene.materials),
+            'textures': len(scene.textures),
+            'animations': len(scene.animations),
+            'cameras': len(scene.cameras),
+            'lights': len(scene.lights),
+            'nodes': nodes}
+
+def _import(filename, processing, file_type = None, output = None):
+    with core.load(filename, processing=processing, copy=False, lazy=True) as scene:
+        if file_type is None:
+            return summarize(scene)
+        core.export(scene, output, file_type=file_type, processing=0)
+        return os.path.getsize(output)
+
+def _serve(conn, max_jobs, max_memory):
+    """
+    Main loop of the worker processes: imports the jobs received on
+    'conn' until it receives None, or until the worker has to be
+    replaced. Each answer is (value, error, elapsed, rss, retiring).
+    """
+    jobs = 0
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        start = time.time()
+        try:
+            value, error = _import(*job), None
+        except Exception as e:
+            value, error = None, "%s: %s" % (type(e).__name__, e)
+        elapsed = time.time() - start
+
+        jobs += 1
+        rss = _rss()
+        retiring = ((max_jobs is not None and jobs >= max_jobs) or
+                    (max_memory is not None and rss is not None and rss >= max_memory))
+        conn.send((value, error, elapsed, rss, retiring))
+        if retiring:
+            return
+
+class WorkerPool(object):
+    '''
+    Pool of warm import worker processes.
+
+    Arguments
+    ---------
+    workers:    number of worker processes, defaults to the number of CPUs.
+    max_jobs:   a worker is replaced after importing that many files.
+                None to never replace them.
+    max_memory: a worker is replaced once its resident memory reaches
+                that many bytes after an import. The memory use is not
+                known on Windows, where only max_jobs applies.
+    timeout:    a worker importing a file for more than that many seconds
+                is killed, and the import fails. None for no limit.
+
+    The workers are started on demand and stopped by close(). Pools can
+    be used as context managers to close them automatically.
+    '''
+    def __init__(self, workers = None, max_jobs = 1000, max_memory = None, timeout = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs = max_jobs
+        self.max_memory = max_memory
+        self.timeout = timeout
+        self.started = 0  # worker processes started so far
+        self._idle = []
+
+    def _start(self):
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_serve,
+                                          args=(child_conn, self.max_jobs, self.max_memory))
+        process.daemon = True
+        process.start()
+        child_conn.close()
+        self.started += 1
+        return process, conn
+
+    def _stop(self, worker, kill = False):
+        process, conn = worker
+        if kill:
+            process.kill()
+        elif process.is_alive():
+            try:
+                conn.send(None)
+            except (OSError, EOFError):
+                pass
+        conn.close()
+        process.join()
+
+    def imap(self, jobs):
+        '''
+        Import several files. Generator yielding a WorkerResult for each
+        job, in completion order.
+
+        Arguments
+        ---------
+        jobs: iterable of (filename, processing) pairs to summarize the
+              scenes of, or of (filename, processing, file_type, output)
+              tuples to export the scenes to the 'output' files with the
+              'file_type' exporter ("assbin", "collada"...). See
+              pyassimp.load() for 'processing'.
+        '''
+        pending = collections.deque(tuple(job) for job in jobs)
+        running = {}  # connection -> (worker, job, deadline)
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    job = pending.popleft()
+                    worker = self._idle.pop() if self._idle else self._start()
+                    deadline = time.time() + self.timeout if self.timeout is not None else None
+                    try:
+                        worker[1].send(job)
+                    except (OSError, EOFError):
+                        # the worker died while it was idle
+                        self._stop(worker, kill=True)
+                        pending.appendleft(job)
+                        continue
+                    running[worker[1]] = (worker, job, deadline)
+
+                timeout = None
+                if self.timeout is not None:
+                    timeout = max(0., min(d for _, _, d in running.values()) - time.time())
+                ready = wait(list(running), timeout)
+
+                for conn in ready:
+                    worker, job, _ = running.pop(conn)
+                    try:
+                        value, error, elapsed, rss, retiring = conn.recv()
+                    except (OSError, EOFError):
+                        logger.warning('Worker crashed while importing ' + job[0])
+                        self._stop(worker, kill=True)
+                        yield WorkerResult(job[0], error="the worker process crashed")
+                        continue
+                    if retiring:
+                        self._stop(worker)
+                    else:
+                        self._idle.append(worker)
+                    yield WorkerResult(job[0], value, error, elapsed, rss)
+
+                now = time.time()
+                for conn, (worker, job, deadline) in list(running.items()):
+                    if conn not in ready and deadline is not None and deadline <= now:
+                        del running[conn]
+                        self._stop(worker, kill=True)
+                        yield WorkerResult(job[0], error="timeout after %gs" % self.timeout,
+                                           elapsed=self.timeout)
+        finally:
+            # a job was abandoned: its worker is still busy with it
+            for worker, _, _ in running.values():
+                self._stop(worker, kill=True)
+
+    def close(self):
+        """ Stops the idle workers. """
+        while self._idle:
+            self._stop(self._idle.pop())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def summarize_many(paths,
+                   processing = postprocess.aiProcess_Triangulate,
+                   workers    = None):
+    '''
+    Summarizes several models on a temporary WorkerPool. Returns the
+    WorkerResults in the order of 'paths'.
+    '''
+    paths = list(paths)
+    with WorkerPool(workers) as pool:
+        results = dict((r.filename, r) for r in pool.imap((p, processing) for p in paths))
+    return [results[p] for p in paths]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+#-*- coding: UTF-8 -*-
+
+"""
+This module measures how long PyAssimp takes to load models, and how
+much of that time is spent converting the assimp data structures to
+Python (as opposed to the import itself, done by the assimp library).
+
+Usage: benchmark.py [-n REPEAT] [--lazy] [<3d model> ...]
+
+Without model, the Nkentseu sample assets of Resources/Models are used.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Make the development (ie. GIT repo) version of PyAssimp available for import.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pyassimp
+from pyassimp import errors, postprocess
+
+# Resources/Models of the Nkentseu repository.
+models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '..', '..', '..', '..', '..', '..', 'Resources', 'Models')
+
+default_models = [os.path.join(models_dir, 'nanosuit', 'nanosuit.obj'),
+                  os.path.join(models_dir, 'backpack', 'backpack.obj'),
+                  os.path.join(models_dir, 'cyborg', 'cyborg.obj'),
+                  os.path.join(models_dir, 'car.glb'),
+                  os.path.join(models_dir, 'Futuristic_Car_2.1_fbx.fbx'),
+                  os.path.join(models_dir, 'rubber_duck', 'scene.gltf')]
+
+
+def best_time(func, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def import_only(filename, processing):
+    """ Runs the assimp import, without any conversion to Python. """
+    model = pyassimp.core._assimp_lib.load(filename.encode(sys.getfilesystemencoding()), processing)
+    if not model:
+        raise errors.AssimpError('Could not import file!')
+    pyassimp.core._assimp_lib.release(model)
+
+
+def load(filename, processing, lazy):
+    with pyassimp.load(filename, processing=processing, lazy=lazy) as scene:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('models', nargs='*', default=default_models)
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                        help='number of loads per model, the best time is kept')
+    parser.add_argument('--lazy', action='store_true',
+                        help='load the scenes with lazy=True')
+    args = parser.parse_args()
+
+    processing = postprocess.aiProcess_Triangulate
+
+    print("%-40s %10s %10s %10s" % ("MODEL", "IMPORT", "LOAD", "PYTHON"))
+    for filename in args.models:
+        if not os.path.exists(filename):
+            print("%-40s (not found, skipped)" % os.path.basename(filename))
+            continue
+        try:
+            t_import = best_time(lambda: import_only(filename, processing), args.repeat)
+            t_load = best_time(lambda: load(filename, processing, args.lazy), args.repeat)
+        except errors.AssimpError as error:
+            print("%-40s %s" % (os.path.basename(filename), error))
+            continue
+        print("%-40s %9.1fms %9.1fms %9.1fms" % (os.path.basename(filename),
+                                                 t_import * 1000,
+                                                 t_load * 1000,
+                                                 (t_load - t_import) * 1000))
+
+
+if __name__ == '__main__':
+    main()
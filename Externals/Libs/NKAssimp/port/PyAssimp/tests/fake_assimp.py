@@ -0,0 +1,51 @@
+#-*- coding: UTF-8 -*-
+
+"""
+Imports pyassimp without an assimp library.
+
+pyassimp loads the assimp library as soon as it is imported: the tests
+of its pure Python parts (cache keys, batch results...) import it with
+import_pyassimp() instead, which hands it a FakeLibrary.
+"""
+
+import os
+import sys
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FakeLibrary(object):
+    """ Stands for the ctypes handle of the assimp library. """
+    def __init__(self, version = (5, 2, 0)):
+        self._name = os.path.join(ROOT, 'libassimp-fake.so')
+        self.set_version(version)
+
+    def set_version(self, version):
+        major, minor, revision = version
+        self.aiGetVersionMajor = lambda: major
+        self.aiGetVersionMinor = lambda: minor
+        self.aiGetVersionRevision = lambda: revision
+
+# the real pyassimp.helper.search_library, once import_pyassimp() ran
+search_library = None
+
+def _unavailable(*args):
+    raise AssertionError('the fake assimp library can not import files')
+
+def import_pyassimp():
+    """ Imports pyassimp with a FakeLibrary, returns the package. """
+    if 'pyassimp.core' in sys.modules:
+        return sys.modules['pyassimp']
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    spec = importlib.util.find_spec('pyassimp')
+    package = importlib.util.module_from_spec(spec)
+    sys.modules['pyassimp'] = package
+
+    from pyassimp import helper
+    global search_library
+    search_library = helper.search_library
+    helper.search_library = lambda: (_unavailable,) * 5 + (FakeLibrary(),)
+    spec.loader.exec_module(package)
+    return package
@@ -0,0 +1,86 @@
+#-*- coding: UTF-8 -*-
+
+import gc
+import unittest
+
+import numpy
+
+from fake_assimp import import_pyassimp
+
+import_pyassimp()
+from pyassimp import batch
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+def _node(name, children):
+    return {'name': name, 'transformation': numpy.eye(4).ravel().tolist(),
+            'meshes': [0], 'children': children}
+
+@unittest.skipIf(shared_memory is None, 'requires multiprocessing.shared_memory')
+class BatchResultTest(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(self.release_blocks)
+
+    def release_blocks(self):
+        gc.collect()
+        blocks = batch._unmapped_later[:]
+        del batch._unmapped_later[:]
+        for block in blocks:
+            block.close()
+
+    def make_result(self):
+        """ A result as built from the output of a worker: one mesh,
+        its arrays in a new shared memory block. """
+        vertices = numpy.arange(9, dtype=numpy.float32).reshape((3, 3))
+        faces = numpy.array([[0, 1, 2]], dtype=numpy.int32)
+        layout = [(0, 'vertices', 0, vertices.dtype.str, vertices.shape),
+                  (0, 'faces', 48, faces.dtype.str, faces.shape)]
+        shm = shared_memory.SharedMemory(create=True, size=64)
+        shm.buf[0:36] = vertices.view(numpy.uint8).ravel()
+        shm.buf[48:60] = faces.view(numpy.uint8).ravel()
+        name = shm.name
+        shm.close()
+
+        desc = {'meshes': [{'name': 'mesh', 'materialindex': 0, 'primitivetypes': 4,
+                            'numuvcomponents': [0] * 8, 'arrays': ['vertices']}],
+                'materials': [0], 'material_properties': [[]], 'cameras': [], 'lights': [],
+                'rootnode': _node('root', [_node('child', [])])}
+        return batch._make_result('model.obj', ((desc, name, layout, 0.), None)), name
+
+    def test_close(self):
+        result, name = self.make_result()
+        self.assertEqual(result.size, 64)
+        self.assertEqual(result.scene.meshes[0].faces.tolist(), [[0, 1, 2]])
+        with result:
+            pass
+        self.assertIsNone(result.scene)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+        result.close()
+
+    def test_close_with_outstanding_views(self):
+        result, name = self.make_result()
+        vertices = result.scene.meshes[0].vertices
+        result.close()
+
+        # still mapped: reading the view must not crash
+        self.assertEqual(vertices.sum(), 36.)
+        self.assertEqual(len(batch._unmapped_later), 1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+        # unmapped by the next close once the views are gone
+        del vertices
+        gc.collect()
+        other, _ = self.make_result()
+        other.scene = None
+        gc.collect()
+        other.close()
+        self.assertEqual(batch._unmapped_later, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#-*- coding: UTF-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from fake_assimp import import_pyassimp
+
+import_pyassimp()
+from pyassimp import cache, core
+from pyassimp.errors import AssimpError
+
+class CacheKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        cache._library_identity = None
+        self.addCleanup(setattr, cache, '_library_identity', None)
+
+    def model(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_content(self):
+        a = self.model('a.obj', b'v 0 0 0\n')
+        b = self.model('b.obj', b'v 0 0 0\n')
+        c = self.model('c.obj', b'v 0 0 1\n')
+        self.assertEqual(cache.cache_key(a, 8), cache.cache_key(b, 8))
+        self.assertNotEqual(cache.cache_key(a, 8), cache.cache_key(c, 8))
+
+    def test_processing(self):
+        a = self.model('a.obj', b'v 0 0 0\n')
+        self.assertNotEqual(cache.cache_key(a, 8), cache.cache_key(a, 9))
+
+    def test_cache_version(self):
+        a = self.model('a.obj', b'v 0 0 0\n')
+        key = cache.cache_key(a, 8)
+        version = cache.CACHE_VERSION
+        self.addCleanup(setattr, cache, 'CACHE_VERSION', version)
+        cache.CACHE_VERSION = version + 1
+        self.assertNotEqual(cache.cache_key(a, 8), key)
+
+    def test_library(self):
+        a = self.model('a.obj', b'v 0 0 0\n')
+        self.assertEqual(cache.cache_key(a, 8), cache.cache_key(a, 8, cache.library_identity()))
+        self.assertNotEqual(cache.cache_key(a, 8, 'one build'), cache.cache_key(a, 8, 'another build'))
+
+    def test_library_identity(self):
+        dll = core._assimp_lib.dll
+        identity = cache.library_identity()
+        self.assertIn(dll._name, identity)
+        self.assertTrue(identity.endswith(':5.2.0'))
+
+        self.addCleanup(dll.set_version, (5, 2, 0))
+        dll.set_version((5, 3, 1))
+        cache._library_identity = None
+        self.assertTrue(cache.library_identity().endswith(':5.3.1'))
+
+    def test_missing_file(self):
+        with self.assertRaises(AssimpError):
+            with cache.load(os.path.join(self.dir, 'missing.obj'), cache_dir=self.dir):
+                pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+#-*- coding: UTF-8 -*-
+
+import ctypes
+import struct
+import unittest
+
+import numpy
+
+from fake_assimp import import_pyassimp
+
+import_pyassimp()
+from pyassimp import core, helper, structs
+from pyassimp.errors import AssimpError
+
+DIFFUSE = (1.0, 0.5, 0.25, 1.0)
+
+class SceneBuilder(object):
+    """
+    Builds an aiScene with ctypes, as the assimp library would return it:
+
+      root (translated by x + 1, mesh 0)
+       `- child (translated by y + 2, meshes 1 and 2), bound to a camera
+
+    Mesh 0 has two triangles, mesh 1 mixes a point, a line and a triangle,
+    mesh 2 has the same content as mesh 0. The two materials are identical.
+    The scene embeds an uncompressed 2x1 texture and a compressed one.
+    """
+    def __init__(self):
+        self.keep = [] # the buffers the scene points to
+
+    def pointer_array(self, items, type):
+        res = (ctypes.POINTER(type) * len(items))(*[ctypes.pointer(i) for i in items])
+        self.keep.extend(items)
+        self.keep.append(res)
+        return ctypes.cast(res, ctypes.POINTER(ctypes.POINTER(type)))
+
+    def array(self, type, values):
+        res = (type * len(values))(*values)
+        self.keep.append(res)
+        return ctypes.cast(res, ctypes.POINTER(type))
+
+    @staticmethod
+    def string(text):
+        res = structs.String()
+        res.length = len(text)
+        res.data = text.encode('utf-8')
+        return res
+
+    @staticmethod
+    def translation(x, y, z):
+        m = structs.Matrix4x4()
+        m.a1 = m.b2 = m.c3 = m.d4 = 1.
+        m.a4, m.b4, m.c4 = x, y, z
+        return m
+
+    def mesh(self, vertices, faces, material):
+        mesh = structs.Mesh()
+        mesh.mNumVertices = len(vertices)
+        mesh.mVertices = self.array(structs.Vector3D, [structs.Vector3D(*v) for v in vertices])
+        mesh.mNormals = self.array(structs.Vector3D, [structs.Vector3D(0., 0., 1.)] * len(vertices))
+        mesh.mColors[0] = self.array(structs.Color4D, [structs.Color4D(*DIFFUSE)] * len(vertices))
+        mesh.mTextureCoords[0] = self.array(structs.Vector3D, [structs.Vector3D(v[0], v[1], 0.) for v in vertices])
+        mesh.mNumUVComponents[0] = 2
+        mesh.mNumFaces = len(faces)
+        mesh.mFaces = self.array(structs.Face, [structs.Face(len(f), self.array(ctypes.c_uint, f))
+                                                for f in faces])
+        mesh.mMaterialIndex = material
+        return mesh
+
+    def material(self):
+        data = struct.pack('4f', *DIFFUSE)
+        diffuse = structs.MaterialProperty(mKey=self.string('$clr.diffuse'), mDataLength=len(data),
+                                           mType=1, mData=self.array(ctypes.c_char, data))
+        data = struct.pack('f', 8.)
+        shininess = structs.MaterialProperty(mKey=self.string('$mat.shininess'), mDataLength=len(data),
+                                             mType=1, mData=self.array(ctypes.c_char, data))
+        return structs.Material(mProperties=self.pointer_array([diffuse, shininess], structs.MaterialProperty),
+                                mNumProperties=2)
+
+    def node(self, name, transformation, meshes):
+        return structs.Node(mName=self.string(name), mTransformation=transformation,
+                            mNumMeshes=len(meshes), mMeshes=self.array(ctypes.c_uint, meshes))
+
+    def build(self):
+        square = [(0., 0., 0.), (1., 0., 0.), (1., 1., 0.), (0., 1., 0.)]
+        self.vertices = square
+        meshes = [self.mesh(square, [[0, 1, 2], [2, 3, 0]], 0),
+                  self.mesh(square + [(2., 2., 2.), (3., 3., 3.)], [[0], [1, 2], [3, 4, 5]], 1),
+                  self.mesh(square, [[0, 1, 2], [2, 3, 0]], 0)]
+
+        root = self.node('root', self.translation(1., 0., 0.), [0])
+        child = self.node('child', self.translation(0., 2., 0.), [1, 2])
+        root.mNumChildren = 1
+        root.mChildren = self.pointer_array([child], structs.Node)
+        child.mParent = ctypes.pointer(root)
+
+        texels = [structs.Texel(b=1, g=2, r=3, a=4), structs.Texel(b=5, g=6, r=7, a=8)]
+        raw = structs.Texture(mWidth=2, mHeight=1, achFormatHint=b'rgba8888',
+                              pcData=self.array(structs.Texel, texels))
+        png = b'\x89PNG'
+        compressed = structs.Texture(mWidth=len(png), mHeight=0, achFormatHint=b'png',
+                                     pcData=ctypes.cast(self.array(ctypes.c_char, png), ctypes.POINTER(structs.Texel)))
+
+        scene = structs.Scene()
+        scene.mRootNode = ctypes.pointer(root)
+        scene.mNumMeshes = len(meshes)
+        scene.mMeshes = self.pointer_array(meshes, structs.Mesh)
+        scene.mNumMaterials = 2
+        scene.mMaterials = self.pointer_array([self.material(), self.material()], structs.Material)
+        scene.mNumTextures = 2
+        scene.mTextures = self.pointer_array([raw, compressed], structs.Texture)
+        scene.mNumCameras = 1
+        scene.mCameras = self.pointer_array([structs.Camera(mName=self.string('child'))], structs.Camera)
+        self.keep.extend([root, child])
+        self.meshes = meshes
+        return scene
+
+class LoadTestMixin(object):
+    """ The tests shared by the loading modes, see the subclasses. """
+    options = {}
+
+    def setUp(self):
+        self.builder = SceneBuilder()
+        self.scene = self.builder.build()
+        self.released = []
+        core._assimp_lib.load = lambda filename, processing: ctypes.pointer(self.scene)
+        core._assimp_lib.release = self.released.append
+
+    def tearDown(self):
+        del core._assimp_lib.load
+        del core._assimp_lib.release
+
+    def load(self):
+        return core.load('scene.obj', **self.options)
+
+    def test_faces(self):
+        with self.load() as scene:
+            faces = scene.meshes[0].faces
+            self.assertEqual(faces.dtype, numpy.int32)
+            self.assertEqual(faces.tolist(), [[0, 1, 2], [2, 3, 0]])
+
+            offsets, indices = scene.meshes[1].faces
+            self.assertEqual(offsets.tolist(), [0, 1, 3, 6])
+            self.assertEqual(indices.tolist(), [0, 1, 2, 3, 4, 5])
+
+    def test_vertices(self):
+        with self.load() as scene:
+            vertices = scene.meshes[0].vertices
+            self.assertEqual(vertices.tolist(), [list(v) for v in self.builder.vertices])
+            self.assertEqual(scene.meshes[0].normals.shape, (4, 3))
+
+            self.builder.meshes[0].mVertices[0].x = 42.
+            self.assertEqual(vertices[0, 0], 0. if self.options.get('copy', True) else 42.)
+
+    def test_colors_and_texture_coordinates(self):
+        with self.load() as scene:
+            mesh = scene.meshes[0]
+            if self.options.get('copy', True):
+                self.assertEqual(mesh.colors.shape, (1, 4, 4))
+                self.assertEqual(mesh.texturecoords.shape, (1, 4, 3))
+            else:
+                self.assertEqual([c.shape for c in mesh.colors], [(4, 4)])
+                self.assertEqual([t.shape for t in mesh.texturecoords], [(4, 3)])
+            self.assertEqual(mesh.colors[0][1].tolist(), list(DIFFUSE))
+
+    def test_materials(self):
+        with self.load() as scene:
+            first, second = scene.materials
+            self.assertIs(first.properties, second.properties)
+            self.assertIs(scene.meshes[0].material, first)
+            self.assertIs(scene.meshes[1].material, second)
+            properties = first.properties
+
+        # shared with the identical materials of other scenes
+        with self.load() as scene:
+            self.assertIs(scene.materials[0].properties, properties)
+
+        self.assertEqual(properties['diffuse'], DIFFUSE)
+        self.assertEqual(properties['shininess'], 8.)
+        self.assertEqual(hash(properties), hash(core.PropertyGetter(dict.items(properties))))
+        with self.assertRaises(TypeError):
+            properties['diffuse'] = (0., 0., 0., 1.)
+        with self.assertRaises(AttributeError):
+            properties['diffuse'].append(1.)
+
+    def test_nodes(self):
+        with self.load() as scene:
+            root = scene.rootnode
+            child, = root.children
+            self.assertEqual((root.name, child.name), ('root', 'child'))
+            self.assertIs(child.parent, root)
+            self.assertEqual([m.faces.shape for m in root.meshes], [(2, 3)])
+            self.assertIs(child.meshes[1], scene.meshes[2])
+
+            self.assertIs(scene.node_index['child'], child)
+            self.assertIs(scene.node_index.parent(child), root)
+            self.assertEqual(scene.node_index.depth(child), 1)
+
+            camera, = scene.cameras
+            self.assertEqual(numpy.asarray(camera.transformation).tolist(),
+                             numpy.asarray(child.transformation).tolist())
+
+            world = helper.get_world_transformations(scene)
+            self.assertEqual(world[1][:3, 3].tolist(), [1., 2., 0.])
+
+    def test_textures(self):
+        with self.load() as scene:
+            raw, compressed = scene.textures
+            self.assertEqual(raw.data.shape, (1, 2, 4))
+            self.assertEqual(raw.data.dtype, numpy.uint8)
+            self.assertEqual(raw.data[0, 1].tolist(), [5, 6, 7, 8])
+            self.assertEqual(bytes(compressed.data), b'\x89PNG')
+            self.assertEqual(compressed.achformathint, b'png')
+            self.assertIsInstance(compressed.data, bytes if self.options.get('copy', True) else memoryview)
+
+    def test_release(self):
+        with self.load() as scene:
+            pass
+        self.assertEqual(len(self.released), 1)
+
+class EagerLoadTest(LoadTestMixin, unittest.TestCase):
+
+    def test_conversion_plan(self):
+        with self.load():
+            pass
+        plan, members = core._get_plan(structs.Mesh)
+        self.assertIs(core._plans[structs.Mesh][0], plan)
+        self.assertNotIn('faces', members) # gathered by _finalize_mesh
+        self.assertEqual(members['vertices'][2:], (core.MEMBER_ARRAY, 'mNumVertices'))
+
+class ZeroCopyLoadTest(LoadTestMixin, unittest.TestCase):
+    options = {'copy': False}
+
+class LazyLoadTest(LoadTestMixin, unittest.TestCase):
+    options = {'lazy': True}
+
+    def test_lazy_structs(self):
+        with self.load() as scene:
+            self.assertIsInstance(scene, core.LazyStruct)
+            mesh = scene.meshes[0]
+            self.assertIsInstance(mesh, core.LazyStruct)
+            self.assertNotIn('faces', mesh.__dict__)
+            mesh.vertices
+            self.assertIn('vertices', mesh.__dict__)
+
+        # converted before the release: still available
+        self.assertEqual(mesh.vertices.shape, (4, 3))
+        with self.assertRaises(AssimpError):
+            mesh.faces
+        with self.assertRaises(AssimpError):
+            scene.rootnode
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#-*- coding: UTF-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import fake_assimp
+
+fake_assimp.import_pyassimp()
+from pyassimp import helper
+from pyassimp.errors import AssimpError
+
+class FakeDll(object):
+    """ A library with the functions pyassimp binds. """
+    def __init__(self, name):
+        self._name = name
+        for function in ('aiImportFile', 'aiReleaseImport', 'aiImportFileFromMemory',
+                         'aiExportScene', 'aiExportSceneToBlob'):
+            setattr(self, function, mock.Mock())
+
+class SearchLibraryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.libs = os.path.join(self.tmp, 'lib')
+        os.mkdir(self.libs)
+        self.opened = []
+
+        environ = {'XDG_CACHE_HOME': os.path.join(self.tmp, 'cache'),
+                   'LOCALAPPDATA': os.path.join(self.tmp, 'cache')}
+        for patch in (mock.patch.dict(os.environ, environ),
+                      mock.patch.object(helper, 'additional_dirs', [self.libs]),
+                      mock.patch.object(helper, 'ext_whitelist', ['.so']),
+                      mock.patch.object(helper.ctypes.cdll, 'LoadLibrary', self.load_library)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        os.environ.pop('PYASSIMP_LIBRARY', None)
+
+    def load_library(self, path):
+        self.opened.append(os.path.basename(path))
+        if 'broken' in path:
+            raise OSError('invalid ELF header')
+        return FakeDll(path)
+
+    def add_library(self, name, mtime):
+        path = os.path.join(self.libs, name)
+        open(path, 'w').close()
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def chosen(self):
+        return os.path.basename(fake_assimp.search_library()[-1]._name)
+
+    def test_newest_only_is_opened(self):
+        self.add_library('libassimp.so.4', 1000)
+        self.add_library('libassimp.so.5', 2000)
+        self.add_library('libassimp-broken.so', 3000)
+        self.add_library('readme.txt', 4000)
+        self.assertEqual(self.chosen(), 'libassimp.so.5')
+        self.assertEqual(self.opened, ['libassimp-broken.so', 'libassimp.so.5'])
+
+    def test_discovery_is_cached(self):
+        self.add_library('libassimp.so.4', 1000)
+        self.add_library('libassimp.so.5', 2000)
+        self.chosen()
+        del self.opened[:]
+        with mock.patch.object(helper.os, 'listdir', side_effect=AssertionError('not cached')):
+            self.assertEqual(self.chosen(), 'libassimp.so.5')
+        self.assertEqual(self.opened, ['libassimp.so.5'])
+
+    def test_cache_is_invalidated(self):
+        self.add_library('libassimp.so.4', 1000)
+        self.chosen()
+        # a new file changes the mtime of the folder
+        self.add_library('libassimp.so.5', 2000)
+        os.utime(self.libs, (5000, 5000))
+        self.assertEqual(self.chosen(), 'libassimp.so.5')
+        # so does the update of a candidate
+        os.utime(os.path.join(self.libs, 'libassimp.so.4'), (3000, 3000))
+        self.assertEqual(self.chosen(), 'libassimp.so.4')
+
+    def test_override(self):
+        self.add_library('libassimp.so.5', 2000)
+        os.environ['PYASSIMP_LIBRARY'] = os.path.join(self.tmp, 'custom.so')
+        self.assertEqual(self.chosen(), 'custom.so')
+        self.assertEqual(self.opened, ['custom.so'])
+
+        os.environ['PYASSIMP_LIBRARY'] = os.path.join(self.tmp, 'broken.so')
+        with self.assertRaises(AssimpError):
+            fake_assimp.search_library()
+
+    def test_not_found(self):
+        self.add_library('libassimp-broken.so', 1000)
+        with self.assertRaises(AssimpError):
+            fake_assimp.search_library()
+
+if __name__ == '__main__':
+    unittest.main()
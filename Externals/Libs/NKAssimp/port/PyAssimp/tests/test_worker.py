@@ -0,0 +1,83 @@
+#-*- coding: UTF-8 -*-
+
+import os
+import time
+import unittest
+import multiprocessing
+from types import SimpleNamespace
+
+import numpy
+
+from fake_assimp import import_pyassimp
+
+import_pyassimp()
+from pyassimp import worker
+
+def _node(children):
+    return SimpleNamespace(children=children)
+
+def _fake_import(filename, processing, file_type = None, output = None):
+    """ Stands for worker._import in the forked workers. """
+    if filename == 'crash':
+        os.abort()
+    if filename == 'hang':
+        time.sleep(60)
+    return filename.upper()
+
+class SummarizeTest(unittest.TestCase):
+
+    def test_summarize(self):
+        mesh = SimpleNamespace(vertices=numpy.zeros((4, 3)), faces=numpy.zeros((2, 3)))
+        scene = SimpleNamespace(meshes=[mesh, mesh], materials=[0], textures=[],
+                                animations=[], cameras=[], lights=[0],
+                                rootnode=_node([_node([]), _node([_node([])])]))
+        self.assertEqual(worker.summarize(scene),
+                         {'meshes': 2, 'vertices': 8, 'faces': 4, 'materials': 1,
+                          'textures': 0, 'animations': 0, 'cameras': 0, 'lights': 1,
+                          'nodes': 4})
+
+    def test_summarize_mixed_polygons(self):
+        # a point, a line and a triangle, as (offsets, indices)
+        mixed = SimpleNamespace(vertices=numpy.zeros((6, 3)),
+                                faces=(numpy.array([0, 1, 3, 6]), numpy.arange(6)))
+        triangle = SimpleNamespace(vertices=numpy.zeros((3, 3)), faces=numpy.zeros((1, 3)))
+        scene = SimpleNamespace(meshes=[mixed, triangle], materials=[], textures=[],
+                                animations=[], cameras=[], lights=[], rootnode=_node([]))
+        summary = worker.summarize(scene)
+        self.assertEqual((summary['vertices'], summary['faces']), (9, 4))
+
+# the workers must inherit the fake library, and the fake imports
+@unittest.skipIf(multiprocessing.get_start_method() != 'fork', 'requires forked workers')
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.real_import = worker._import
+        worker._import = _fake_import
+
+    def tearDown(self):
+        worker._import = self.real_import
+
+    def test_recycle_after_max_jobs(self):
+        with worker.WorkerPool(1, max_jobs=3) as pool:
+            results = list(pool.imap(('file%d' % i, 0) for i in range(9)))
+        self.assertEqual(sorted(r.value for r in results), ['FILE%d' % i for i in range(9)])
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(pool.started, 3)
+
+    def test_crash_and_timeout(self):
+        with worker.WorkerPool(2, timeout=1) as pool:
+            results = dict((r.filename, r) for r in
+                           pool.imap([('crash', 0), ('hang', 0), ('a', 0), ('b', 0)]))
+        self.assertEqual(results['crash'].error, 'the worker process crashed')
+        self.assertEqual(results['hang'].error, 'timeout after 1s')
+        self.assertEqual((results['a'].value, results['b'].value), ('A', 'B'))
+
+    def test_import_failure(self):
+        worker._import = self.real_import
+        with worker.WorkerPool(1) as pool:
+            result, = pool.imap([('model.obj', 0)])
+        self.assertIn('can not import files', result.error)
+        self.assertIsNone(result.value)
+
+if __name__ == '__main__':
+    unittest.main()
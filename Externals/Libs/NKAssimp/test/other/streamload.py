@@ -3,66 +3,186 @@
 """Read all test files for a particular file format using a single
 importer instance. Read them again in reversed order. This is used
 to verify that a loader does proper cleanup and can be called
-repeatedly."""
+repeatedly.
+
+The files of each directory are loaded by one 'assimp testbatchload'
+process, in batches of at most --batch=<N> files, and the batches run in
+parallel on -j<N> (--jobs=<N>) processes, the number of CPUs by default.
+A batch which crashes, or which runs for more than --timeout=<s> seconds,
+is split in halves which are run again, down to the files responsible.
+When the crash needs several files to happen, they are reduced to a
+minimal list: removing any of them makes the crash disappear.
+
+Usage: streamload.py [<assimp binary>] [-j<N>] [--batch=<N>] [--timeout=<s>]
+
+The exit code is 0 if no batch crashed, 1 otherwise."""
 
 import sys
 import os
+import time
 import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 
-# hack-load utils.py and settings.py from ../regression
-sys.path.append(os.path.join('..','regression'))
+# hack-load settings.py from ../regression
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'regression'))
 
-import utils
 import settings
 
+assimp_bin_path = 'assimp'
+
+# default number of files per batch and time limit of a batch, in seconds
+batch_size = 32
+batch_timeout = 300.
 
-def process_dir(thisdir):
-    """Process /thisdir/ recursively"""
-    res = []
-    shellparams = {'stdin':subprocess.PIPE,'stdout':sys.stdout,'shell':True}
 
-    command = [utils.assimp_bin_path,"testbatchload"]
-    for f in os.listdir(thisdir):
-        if os.path.splitext(f)[-1] in settings.exclude_extensions:
+def collect_batches(thisdir, size):
+    """Return the files of /thisdir/, recursively, as lists of at most
+    /size/ files of the same directory"""
+    res = []
+    files = []
+    for f in sorted(os.listdir(thisdir)):
+        if os.path.splitext(f)[-1] in settings.exclude_extensions or f in settings.files_to_ignore:
             continue
         fullpath = os.path.join(thisdir, f)
         if os.path.isdir(fullpath):
-            if f != ".svn":
-                res += process_dir(fullpath) 
+            if f[:1] != ".":
+                res += collect_batches(fullpath, size)
             continue
+        files.append(fullpath)
 
-        # import twice, importing the same file again introduces extra risk
-        # to crash due to garbage data lying around in the importer.
-        command.append(fullpath)
-        command.append(fullpath)
-
-    if len(command)>2:
-        # testbatchload returns always 0 if more than one file in the list worked.
-        # however, if it should segfault, the OS will return something not 0.
-        command += reversed(command[2:])
-        if subprocess.call(command, **shellparams):
-            res.append(thisdir)
-
-
+    res += [files[i:i + size] for i in range(0, len(files), size)]
     return res
 
 
-def main():
+def run_batch(files, timeout):
+    """Load /files/ with a single importer instance. Return (error or None,
+    wall time in seconds)"""
+    # import twice, importing the same file again introduces extra risk
+    # to crash due to garbage data lying around in the importer.
+    command = [assimp_bin_path, "testbatchload"]
+    for f in files:
+        command += [f, f]
+    command += reversed(command[2:])
+
+    start = time.time()
+    try:
+        # testbatchload returns always 0 if more than one file in the list worked.
+        # however, if it should segfault, the OS will return something not 0.
+        r = subprocess.call(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "timeout after {0:.0f}s".format(timeout), time.time() - start
+    if r < 0:
+        return "killed by signal {0}".format(-r), time.time() - start
+    if r:
+        return "exit code {0}".format(r), time.time() - start
+    return None, time.time() - start
+
+
+class CrashHunter:
+
+    """Run batches on a pool of threads, each waiting for its own
+    testbatchload process, and reduce the batches which crash"""
+
+    def __init__(self, num_workers, timeout):
+        self.executor = ThreadPoolExecutor(num_workers)
+        self.timeout = timeout
+        self.runs = 0
+
+    def run(self, batches):
+        """Run several batches in parallel, return their (error, time)"""
+        self.runs += len(batches)
+        return list(self.executor.map(lambda files: run_batch(files, self.timeout), batches))
+
+    def bisect(self, files, error):
+        """Reduce a batch which failed with /error/. Return a list of
+        (files, error) reproducers, each as small as possible"""
+        if len(files) == 1:
+            return [(files, error)]
+
+        half = len(files) // 2
+        halves = [files[:half], files[half:]]
+        res = []
+        for part, (part_error, _) in zip(halves, self.run(halves)):
+            if part_error:
+                res += self.bisect(part, part_error)
+        if res:
+            return res
+
+        # the crash needs files of both halves: drop the files which are
+        # not needed, one at a time
+        needed = list(files)
+        for f in files:
+            if len(needed) == 1:
+                break
+            candidate = [n for n in needed if n != f]
+            candidate_error, _ = self.run([candidate])[0]
+            if candidate_error:
+                needed, error = candidate, candidate_error
+        return [(needed, error)]
+
+    def timings(self, files):
+        """Time the loading of each file alone"""
+        return [duration for error, duration in self.run([[f] for f in files])]
+
+    def close(self):
+        self.executor.shutdown()
+
+
+def main(num_workers=None, size=batch_size, timeout=batch_timeout):
     """Run the test on all registered test repositories"""
-    utils.find_assimp_or_die()
-    
-    res = []
+    batches = []
     for tp in settings.model_directories:
-        res += process_dir(tp)
-
-    [print(f) for f in res]
-    return 0
+        if os.path.isdir(tp):
+            batches += collect_batches(tp, size)
+
+    hunter = CrashHunter(num_workers or multiprocessing.cpu_count(), timeout)
+    start = time.time()
+    try:
+        outcomes = hunter.run(batches)
+        print("Ran {0} batches of {1} files in {2:.1f}s".format(len(batches),
+            sum(map(len, batches)), time.time() - start))
+
+        reproducers = []
+        for files, (error, duration) in zip(batches, outcomes):
+            if error:
+                print("[FAILURE] {0} files of {1} ({2}), reducing".format(len(files),
+                    os.path.dirname(files[0]), error))
+                reproducers += [(found, found_error, hunter.timings(found))
+                    for found, found_error in hunter.bisect(files, error)]
+    finally:
+        hunter.close()
+
+    print("\n" + ("=" * 60))
+    print("{0} reproducers found with {1} testbatchload runs in {2:.1f}s".format(
+        len(reproducers), hunter.runs, time.time() - start))
+    for files, error, durations in reproducers:
+        print("-" * 60 + "\n  " + error)
+        for f, duration in zip(files, durations):
+            print("  {0:7.2f}s  {1}".format(duration, f))
+    return 1 if reproducers else 0
 
 
 if __name__ == '__main__':
-    res = main()
-    input('All done, waiting for keystroke ')
-
-    sys.exit(res)
+    num_workers = None
+    size = batch_size
+    timeout = batch_timeout
+    for m in sys.argv[1:]:
+        if m[:7] == "--jobs=":
+            num_workers = int(m[7:])
+        elif m[:2] == "-j":
+            num_workers = int(m[2:])
+        elif m[:8] == "--batch=":
+            size = int(m[8:])
+        elif m[:10] == "--timeout=":
+            timeout = float(m[10:])
+        elif m in ("-h", "--help"):
+            print(__doc__)
+            sys.exit(0)
+        else:
+            assimp_bin_path = m
+
+    sys.exit(main(num_workers, size, timeout))
 
 # vim: ai ts=4 sts=4 et sw=4
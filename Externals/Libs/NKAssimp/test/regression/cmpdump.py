@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+# ---------------------------------------------------------------------------
+# Open Asset Import Library (ASSIMP)
+# ---------------------------------------------------------------------------
+#
+# Copyright (c) 2006-2020, ASSIMP Development Team
+#
+# All rights reserved.
+#
+# Redistribution and use of this software in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# * Redistributions of source code must retain the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer in the documentation and/or other
+#   materials provided with the distribution.
+#
+# * Neither the name of the ASSIMP team, nor the names of its
+#   contributors may be used to endorse or promote products
+#   derived from this software without specific prior
+#   written permission of the ASSIMP Development Team.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ---------------------------------------------------------------------------
+
+"""
+Compare two binary dumps (``assimp dump <file> <out> -b``) in memory,
+like ``assimp cmpdump`` does.
+
+Floating-point values match if they differ by less than
+FLOAT_EPSILON, everything else must be equal. The comparison stops at
+the first difference, which is reported with its path in the scene,
+such as ``mesh 3 / normals / index 1024 / y``. Both shortened (``-s``)
+and full dumps are supported, compressed (``-z``) or not.
+
+Usage: cmpdump.py <actual dump> <expected dump>
+
+The exit code is 0 if the dumps match, 1 otherwise.
+"""
+
+import sys
+import struct
+import zlib
+
+# -------------------------------------------------------------------------------
+HEADER_LENGTH = 512
+
+# absolute tolerance of float and double values, as in CompareDump.cpp
+FLOAT_EPSILON = 0.1
+
+CHUNK_CAMERA, CHUNK_LIGHT, CHUNK_TEXTURE, CHUNK_MESH, CHUNK_NODEANIM, \
+CHUNK_SCENE, CHUNK_BONE, CHUNK_ANIMATION, CHUNK_NODE, CHUNK_MATERIAL, \
+CHUNK_MATERIALPROPERTY = range(0x1234, 0x123f)
+
+chunk_names = {
+    CHUNK_CAMERA: "camera", CHUNK_LIGHT: "light", CHUNK_TEXTURE: "texture",
+    CHUNK_MESH: "mesh", CHUNK_NODEANIM: "channel", CHUNK_SCENE: "scene",
+    CHUNK_BONE: "bone", CHUNK_ANIMATION: "animation", CHUNK_NODE: "node",
+    CHUNK_MATERIAL: "material", CHUNK_MATERIALPROPERTY: "property",
+}
+
+# mesh component flags
+HAS_POSITIONS, HAS_NORMALS, HAS_TANGENTS_AND_BITANGENTS = 0x1, 0x2, 0x4
+MAX_NUMBER_OF_COLOR_SETS = MAX_NUMBER_OF_TEXTURECOORDS = 8
+
+LIGHT_DIRECTIONAL, LIGHT_SPOT = 1, 3
+
+# aiPropertyTypeInfo
+PTI_FLOAT, PTI_DOUBLE, PTI_STRING, PTI_INTEGER, PTI_BUFFER = 1, 2, 3, 4, 5
+
+# aiMetadataType
+META_BOOL, META_INT32, META_UINT64, META_FLOAT, META_DOUBLE, \
+META_AISTRING, META_AIVECTOR3D = range(7)
+
+# (struct format, field names) of the records of the dump
+VECTOR3 = ("<3f", ("x", "y", "z"))
+COLOR3 = ("<3f", ("r", "g", "b"))
+COLOR4 = ("<4f", ("r", "g", "b", "a"))
+MATRIX4 = ("<16f", tuple("a1 a2 a3 a4 b1 b2 b3 b4 c1 c2 c3 c4 d1 d2 d3 d4".split()))
+WEIGHT = ("<If", ("vertexid", "weight"))
+VECTOR_KEY = ("<d3f", ("time", "x", "y", "z"))
+QUAT_KEY = ("<d4f", ("time", "w", "x", "y", "z"))
+
+metadata_records = {
+    META_BOOL: ("<?", ("value",)), META_INT32: ("<i", ("value",)),
+    META_UINT64: ("<Q", ("value",)), META_FLOAT: ("<f", ("value",)),
+    META_DOUBLE: ("<d", ("value",)), META_AIVECTOR3D: VECTOR3,
+}
+
+# -------------------------------------------------------------------------------
+class DumpMismatch(Exception):
+
+    """ First difference between two dumps: 'path' locates it in the
+    scene, 'message' tells what differs """
+
+    def __init__(self, path, message):
+        Exception.__init__(self, path, message)
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return self.path + ": " + self.message
+
+# -------------------------------------------------------------------------------
+def scene_data(dump):
+    """ Return (shortened, memoryview of the scene chunk) for the content
+    of a binary dump, decompressing it if needed """
+    data = memoryview(dump)
+    if len(data) < HEADER_LENGTH:
+        raise DumpMismatch("header", "the dump is truncated ({0} bytes)".format(len(data)))
+
+    shortened, compressed = struct.unpack_from("<HH", data, 60)
+    if compressed:
+        try:
+            data = memoryview(zlib.decompress(data[HEADER_LENGTH + 4:]))
+        except zlib.error as e:
+            raise DumpMismatch("header", "cannot decompress the dump: " + str(e))
+    else:
+        data = data[HEADER_LENGTH:]
+    return bool(shortened), data
+
+# -------------------------------------------------------------------------------
+def same_value(a, b):
+    """ Compare two values read from the dumps, with a tolerance for
+    floats (NaNs match anything, as in CompareDump.cpp) """
+    if isinstance(a, float):
+        return not abs(a - b) > FLOAT_EPSILON
+    return a == b
+
+# -------------------------------------------------------------------------------
+class Comparison:
+
+    """ Walk two dumps side by side. Each read_*() reads the same record
+    from both dumps and raises DumpMismatch if they differ """
+
+    def __init__(self, actual, expected):
+        self.shortened, self.actual = scene_data(actual)
+        expected_shortened, self.expected = scene_data(expected)
+        self.path = []
+        if self.shortened != expected_shortened:
+            self.fail("header / shortened", "expected {0}, got {1}".format(
+                expected_shortened, self.shortened))
+        # read positions in the actual and the expected scene data
+        self.pos = [0, 0]
+
+    def fail(self, name, message):
+        raise DumpMismatch(" / ".join(self.path + [name]), message)
+
+    def read(self, fmt, name):
+        """ Read one struct 'fmt' from both dumps, return the (actual,
+        expected) tuples of values """
+        size = struct.calcsize(fmt)
+        values = []
+        for i, data in enumerate((self.actual, self.expected)):
+            if self.pos[i] + size > len(data):
+                self.fail(name, "unexpected end of the {0} dump".format(
+                    ("actual", "expected")[i]))
+            values.append(struct.unpack_from(fmt, data, self.pos[i]))
+            self.pos[i] += size
+        return values
+
+    def read_value(self, fmt, name):
+        actual, expected = self.read(fmt, name)
+        if not same_value(actual[0], expected[0]):
+            self.fail(name, "expected {0!r}, got {1!r}".format(expected[0], actual[0]))
+        return expected[0]
+
+    def read_uint(self, name):
+        return self.read_value("<I", name)
+
+    def read_string(self, name):
+        length = self.read_uint(name + " / length")
+        actual, expected = self.read("<{0}s".format(length), name)
+        if actual[0] != expected[0]:
+            self.fail(name, "expected {0!r}, got {1!r}".format(expected[0], actual[0]))
+        return expected[0].decode("utf-8", "replace")
+
+    def read_record(self, record, name):
+        fmt, fields = record
+        actual, expected = self.read(fmt, name)
+        for field, a, e in zip(fields, actual, expected):
+            if not same_value(a, e):
+                self.fail(name + " / " + field, "expected {0!r}, got {1!r}".format(e, a))
+
+    def read_array(self, record, count, name):
+        """ Read 'count' records from both dumps. Identical byte ranges are
+        skipped at once, the records are only decoded if they differ """
+        fmt, fields = record
+        size = struct.calcsize(fmt) * count
+        actual = self.actual[self.pos[0]:self.pos[0] + size]
+        expected = self.expected[self.pos[1]:self.pos[1] + size]
+        if len(actual) == len(expected) == size and actual == expected:
+            self.pos[0] += size
+            self.pos[1] += size
+            return
+        for index in range(count):
+            self.read_record(record, "{0} / index {1}".format(name, index))
+
+    def read_bounds(self, record, count, name):
+        """ Read the (min, max) of an array in a shortened dump, the
+        whole array otherwise """
+        if self.shortened:
+            self.read_record(record, name + " / min")
+            self.read_record(record, name + " / max")
+        else:
+            self.read_array(record, count, name)
+
+    def read_bytes(self, size, name):
+        actual, expected = self.read("<{0}s".format(size), name)
+        if actual[0] != expected[0]:
+            offset = next(i for i, (a, e) in enumerate(zip(actual[0], expected[0])) if a != e)
+            self.fail("{0} / byte {1}".format(name, offset), "expected {0}, got {1}".format(
+                expected[0][offset], actual[0][offset]))
+
+    def chunk(self, magic, name, read_content):
+        """ Read a chunk of type 'magic' from both dumps: identical chunks
+        are skipped at once, the content of other chunks is compared by
+        read_content(). Both dumps are then positioned after the chunk. """
+        (actual_magic, actual_length), (expected_magic, expected_length) = \
+            self.read("<II", name)
+        if expected_magic != magic:
+            self.fail(name, "the expected dump is invalid: chunk 0x{0:x} instead of 0x{1:x}".format(
+                expected_magic, magic))
+        if actual_magic != magic:
+            self.fail(name, "expected a {0} chunk, got chunk 0x{1:x}".format(
+                chunk_names[magic], actual_magic))
+
+        start = list(self.pos)
+        end = [start[0] + actual_length, start[1] + expected_length]
+        if actual_length == expected_length and \
+                self.actual[start[0]:end[0]] == self.expected[start[1]:end[1]]:
+            self.pos = end
+            return
+
+        self.path.append(name)
+        read_content()
+        if self.pos[1] != end[1]:
+            self.fail("length", "the content of the chunk is {0} bytes long, not {1}".format(
+                self.pos[1] - start[1], expected_length))
+        if self.pos[0] != end[0]:
+            self.fail("length", "expected {0} bytes, got {1}".format(
+                expected_length, actual_length))
+        self.path.pop()
+
+    def chunks(self, magic, count):
+        """ Compare 'count' consecutive chunks of type 'magic' """
+        reader = getattr(self, "read_" + chunk_names[magic])
+        for index in range(count):
+            self.chunk(magic, "{0} {1}".format(chunk_names[magic], index), reader)
+
+    # ---------------------------------------------------------------------------
+    def read_scene(self):
+        self.read_uint("flags")
+        counts = [self.read_uint(name) for name in ("nummeshes", "nummaterials",
+            "numanimations", "numtextures", "numlights", "numcameras")]
+        self.chunk(CHUNK_NODE, "rootnode", self.read_node)
+        for magic, count in zip((CHUNK_MESH, CHUNK_MATERIAL, CHUNK_ANIMATION,
+                CHUNK_TEXTURE, CHUNK_LIGHT, CHUNK_CAMERA), counts):
+            self.chunks(magic, count)
+
+    def read_node(self):
+        self.read_string("name")
+        self.read_record(MATRIX4, "transformation")
+        num_children = self.read_uint("numchildren")
+        num_meshes = self.read_uint("nummeshes")
+        num_metadata = self.read_uint("nummetadata")
+        self.read_array(("<I", ("mesh",)), num_meshes, "meshes")
+        for index in range(num_children):
+            self.chunk(CHUNK_NODE, "child {0}".format(index), self.read_node)
+        for index in range(num_metadata):
+            self.read_metadata("metadata {0}".format(index))
+
+    def read_metadata(self, name):
+        name = "metadata " + self.read_string(name + " / key")
+        kind = self.read_value("<H", name + " / type")
+        if kind == META_AISTRING:
+            self.read_string(name)
+        elif kind in metadata_records:
+            self.read_record(metadata_records[kind], name)
+
+    def read_mesh(self):
+        self.read_uint("primitivetypes")
+        num_vertices = self.read_uint("numvertices")
+        num_faces = self.read_uint("numfaces")
+        num_bones = self.read_uint("numbones")
+        self.read_uint("materialindex")
+        flags = self.read_uint("components")
+
+        if flags & HAS_POSITIONS:
+            self.read_bounds(VECTOR3, num_vertices, "vertices")
+        if flags & HAS_NORMALS:
+            self.read_bounds(VECTOR3, num_vertices, "normals")
+        if flags & HAS_TANGENTS_AND_BITANGENTS:
+            self.read_bounds(VECTOR3, num_vertices, "tangents")
+            self.read_bounds(VECTOR3, num_vertices, "bitangents")
+        for n in range(MAX_NUMBER_OF_COLOR_SETS):
+            if not flags & (0x10000 << n):
+                break
+            self.read_bounds(COLOR4, num_vertices, "colors {0}".format(n))
+        for n in range(MAX_NUMBER_OF_TEXTURECOORDS):
+            if not flags & (0x100 << n):
+                break
+            self.read_uint("numuvcomponents {0}".format(n))
+            self.read_bounds(VECTOR3, num_vertices, "texturecoords {0}".format(n))
+
+        if self.shortened:
+            # one hash per block of 512 faces
+            for block in range((num_faces + 511) // 512):
+                self.read_uint("faces {0}-{1}".format(block * 512,
+                    min(num_faces, block * 512 + 512) - 1))
+        else:
+            index_format = "<H" if num_vertices < (1 << 16) else "<I"
+            for index in range(num_faces):
+                count = self.read_value("<H", "faces / index {0} / numindices".format(index))
+                self.read_array((index_format, ("index",)), count, "faces / index {0}".format(index))
+
+        self.chunks(CHUNK_BONE, num_bones)
+
+    def read_bone(self):
+        self.read_string("name")
+        num_weights = self.read_uint("numweights")
+        self.read_record(MATRIX4, "offsetmatrix")
+        self.read_bounds(WEIGHT, num_weights, "weights")
+
+    def read_material(self):
+        self.chunks(CHUNK_MATERIALPROPERTY, self.read_uint("numproperties"))
+
+    def read_property(self):
+        key = self.read_string("key")
+        self.path[-1] = "property " + key
+        self.read_uint("semantic")
+        self.read_uint("index")
+        length = self.read_uint("datalength")
+        kind = self.read_uint("type")
+        if kind == PTI_FLOAT:
+            self.read_array(("<f", ("value",)), length // 4, "data")
+            self.read_bytes(length % 4, "data")
+        elif kind == PTI_DOUBLE:
+            self.read_array(("<d", ("value",)), length // 8, "data")
+            self.read_bytes(length % 8, "data")
+        elif kind == PTI_STRING:
+            self.read_string("data")
+        elif kind == PTI_INTEGER:
+            self.read_array(("<I", ("value",)), length // 4, "data")
+            self.read_bytes(length % 4, "data")
+        else:
+            self.read_bytes(length, "data")
+
+    def read_animation(self):
+        self.read_string("name")
+        self.read_value("<d", "duration")
+        self.read_value("<d", "tickspersecond")
+        self.chunks(CHUNK_NODEANIM, self.read_uint("numchannels"))
+
+    def read_channel(self):
+        self.read_string("nodename")
+        num_keys = [self.read_uint(name) for name in
+            ("numpositionkeys", "numrotationkeys", "numscalingkeys")]
+        self.read_uint("prestate")
+        self.read_uint("poststate")
+        for record, count, name in zip((VECTOR_KEY, QUAT_KEY, VECTOR_KEY), num_keys,
+                ("positionkeys", "rotationkeys", "scalingkeys")):
+            if count:
+                self.read_bounds(record, count, name)
+
+    def read_texture(self):
+        width = self.read_uint("width")
+        height = self.read_uint("height")
+        self.read_bytes(8, "achformathint")
+        if not self.shortened:
+            self.read_bytes(width * height * 4 if height else width, "data")
+
+    def read_light(self):
+        self.read_string("name")
+        kind = self.read_uint("type")
+        for name in ("position", "direction", "up"):
+            self.read_record(VECTOR3, name)
+        if kind != LIGHT_DIRECTIONAL:
+            for name in ("attenuationconstant", "attenuationlinear", "attenuationquadratic"):
+                self.read_value("<f", name)
+        for name in ("colordiffuse", "colorspecular", "colorambient"):
+            self.read_record(COLOR3, name)
+        if kind == LIGHT_SPOT:
+            self.read_value("<f", "angleinnercone")
+            self.read_value("<f", "angleoutercone")
+
+    def read_camera(self):
+        self.read_string("name")
+        for name in ("position", "lookat", "up"):
+            self.read_record(VECTOR3, name)
+        for name in ("horizontalfov", "clipplanenear", "clipplanefar", "aspect"):
+            self.read_value("<f", name)
+
+# -------------------------------------------------------------------------------
+def compare_dumps(actual, expected):
+    """ Compare the content of two binary dumps (bytes or any object
+    supporting the buffer protocol).
+
+    Return None if they match, the DumpMismatch describing the first
+    difference otherwise. """
+    try:
+        comparison = Comparison(actual, expected)
+        comparison.chunk(CHUNK_SCENE, "scene", comparison.read_scene)
+    except DumpMismatch as e:
+        return e
+    return None
+
+# -------------------------------------------------------------------------------
+def compare_files(actual, expected):
+    """ Compare two binary dump files, see compare_dumps() """
+    with open(actual, "rb") as a, open(expected, "rb") as e:
+        return compare_dumps(a.read(), e.read())
+
+# -------------------------------------------------------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(2)
+
+    mismatch = compare_files(sys.argv[1], sys.argv[2])
+    if mismatch:
+        print("Files are different at " + str(mismatch))
+        sys.exit(1)
+    print("Success")
+    sys.exit(0)
+
+# vim: ai ts=4 sts=4 et sw=4
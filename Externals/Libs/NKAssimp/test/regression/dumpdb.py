@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+# ---------------------------------------------------------------------------
+# Open Asset Import Library (ASSIMP)
+# ---------------------------------------------------------------------------
+#
+# Copyright (c) 2006-2020, ASSIMP Development Team
+#
+# All rights reserved.
+#
+# Redistribution and use of this software in source and binary forms,
+# with or without modification, are permitted provided that the following
+# conditions are met:
+#
+# * Redistributions of source code must retain the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer.
+#
+# * Redistributions in binary form must reproduce the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer in the documentation and/or other
+#   materials provided with the distribution.
+#
+# * Neither the name of the ASSIMP team, nor the names of its
+#   contributors may be used to endorse or promote products
+#   derived from this software without specific prior
+#   written permission of the ASSIMP Development Team.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ---------------------------------------------------------------------------
+
+
+"""
+Random-access reader of the regression database.
+
+The database is either <settings.database_name>.zip, as written by gen_db.py,
+or the ./<settings.database_name> directory written by 'gen_db.py -n', which
+is used if there is no zip file. The dumps of the zip file are inflated on
+demand; the dumps of the directory are memory-mapped, without any copy.
+
+Each worker of run.py opens the database once. The dumps it reads are kept
+in a least-recently-used cache of settings.database_cache_size bytes, and
+prefetch() starts reading a dump on a background thread, so that it is
+ready when the 'assimp dump' running meanwhile ends.
+"""
+
+import os
+import mmap
+import zipfile
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+import settings
+
+# -------------------------------------------------------------------------------
+class ZipStore:
+
+    """ Dumps stored in a zip archive """
+
+    def __init__(self, path):
+        self.zipin = zipfile.ZipFile(path, "r")
+        self.lock = threading.Lock()
+
+    def names(self):
+        return set(self.zipin.namelist())
+
+    def read(self, name):
+        # the members share the file object of the archive
+        with self.lock:
+            return self.zipin.read(name)
+
+    def close(self):
+        self.zipin.close()
+
+# -------------------------------------------------------------------------------
+class DirectoryStore:
+
+    """ Dumps stored as the files of a directory. They are memory-mapped:
+    the returned objects support the buffer protocol like bytes do """
+
+    def __init__(self, path):
+        self.path = path
+
+    def names(self):
+        return set(os.listdir(self.path))
+
+    def read(self, name):
+        with open(os.path.join(self.path, name), "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                # empty dumps (expected failures) can not be mapped
+                return b""
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        pass
+
+# -------------------------------------------------------------------------------
+class Database:
+
+    """ Dumps of a store, with an LRU cache and background prefetching """
+
+    def __init__(self, store, cache_size=None):
+        self.store = store
+        self.cache_size = settings.database_cache_size if cache_size is None else cache_size
+        self.cache = collections.OrderedDict()
+        self.cached_bytes = 0
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.prefetcher = None
+        self.hits = self.misses = 0
+
+    def names(self):
+        return self.store.names()
+
+    def read(self, name):
+        """ Return the content of the dump 'name', as bytes or another
+        object supporting the buffer protocol """
+        with self.lock:
+            data = self.cache.get(name)
+            if data is not None:
+                self.cache.move_to_end(name)
+                self.hits += 1
+                return data
+            future = self.pending.pop(name, None)
+            self.misses += 1
+
+        data = future.result() if future is not None else self.store.read(name)
+        self.remember(name, data)
+        return data
+
+    def prefetch(self, name):
+        """ Start reading the dump 'name' on a background thread, unless it
+        is cached or already being read """
+        with self.lock:
+            if name in self.cache or name in self.pending:
+                return
+            if self.prefetcher is None:
+                self.prefetcher = ThreadPoolExecutor(max_workers=1)
+            self.pending[name] = self.prefetcher.submit(self.store.read, name)
+
+    def remember(self, name, data):
+        """ Add a dump to the cache, evicting the least recently used ones
+        beyond cache_size bytes. Dumps bigger than the cache are not kept """
+        size = len(data)
+        if size > self.cache_size:
+            return
+        with self.lock:
+            if name in self.cache:
+                return
+            self.cache[name] = data
+            self.cached_bytes += size
+            while self.cached_bytes > self.cache_size:
+                _, evicted = self.cache.popitem(last=False)
+                self.cached_bytes -= len(evicted)
+
+    def close(self):
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown(wait=True)
+            self.prefetcher = None
+        self.pending.clear()
+        self.cache.clear()
+        self.cached_bytes = 0
+        self.store.close()
+
+# -------------------------------------------------------------------------------
+def open_database(name=None, cache_size=None):
+    """ Open the database <name>.zip, or the directory <name> if there is no
+    zip file. 'name' defaults to settings.database_name. Return None if
+    neither exists """
+    name = name or settings.database_name
+    if os.path.isfile(name + ".zip"):
+        return Database(ZipStore(name + ".zip"), cache_size)
+    if os.path.isdir(name):
+        return Database(DirectoryStore(name), cache_size)
+    return None
+
+# vim: ai ts=4 sts=4 et sw=4
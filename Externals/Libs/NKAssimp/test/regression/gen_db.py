@@ -53,13 +53,20 @@ are forwarded to the script.
 
 import sys
 import os
+import shutil
+import hashlib
+import tempfile
+import warnings
+import functools
+import collections
 import subprocess
+import multiprocessing
 import zipfile
 
 import settings
 import utils
 
-usage = """gen_db [assimp_binary] [-i=...] [-e=...] [-p] [-n]
+usage = """gen_db [assimp_binary] [-i=...] [-e=...] [-p] [-n] [-u] [-j<N>]
 
 The assimp_cmd (or assimp) binary to use is specified by the first
 command line argument and defaults to ``assimp``.
@@ -81,60 +88,142 @@ configs for an IDE, make sure to build the assimp_cmd project.
          Dont' change anything.
 
 -n,--nozip: Don't pack to ZIP archive. Keep all dumps in individual files.
+
+-u,--update: Incremental update: only dump the files which were modified
+         or added since their last dump, or dumped by another assimp
+         binary. Otherwise all the files of the included extensions are
+         dumped again.
+
+-j,--jobs: Number of dumps to run in parallel. Defaults to the number
+         of CPUs.
+         Example: -j8
+                  --jobs=8
 """
 
 # -------------------------------------------------------------------------------
-def process_dir(d, outfile, file_filter):
-    """ Generate small dump records for all files in 'd' """
+def assimp_identity(assimp_bin_path):
+    """ Identify the assimp build used to generate the dumps: hash of the
+    binary and of the assimp libraries next to it """
+    path = shutil.which(assimp_bin_path) or assimp_bin_path
+    folder = os.path.dirname(os.path.abspath(path))
+    files = [path] + sorted(os.path.join(folder, f) for f in os.listdir(folder)
+        if "assimp" in f.lower() and os.path.splitext(f)[1].lower() in (".so", ".dll", ".dylib")
+        or ".so." in f and "assimp" in f.lower())
+
+    digest = hashlib.sha256()
+    for f in files:
+        if os.path.isfile(f):
+            digest.update((os.path.basename(f) + ":" + utils.content_hash(f)).encode("utf-8"))
+    return digest.hexdigest()
+
+# -------------------------------------------------------------------------------
+def process_dir(d, file_filter, index, existing, identity, update, jobs, obsolete):
+    """ Record all files in 'd' in 'index' and append a (file, pp, key) job
+    to 'jobs' for each dump to generate. The keys of the dumps which are
+    replaced are added to 'obsolete'. Returns the number of dumps
+    recorded. """
     print("Processing directory " + d)
 
     num = 0
-    for f in os.listdir(d):
+    for f in sorted(os.listdir(d)):
         fullp = os.path.join(d, f)
         if os.path.isdir(fullp) and not f == ".svn":
-            num += process_dir(fullp, outfile, file_filter)
+            num += process_dir(fullp, file_filter, index, existing, identity, update, jobs, obsolete)
             continue
 
         if file_filter(f):
+            entry = index["files"].get(utils.normalize_path(fullp))
+            same_assimp = entry is not None and entry.get("assimp") == identity
             for pp in settings.pp_configs_to_test:
                 num += 1
-                print("DUMP " + fullp + "\n post-processing: " + pp)
-                outf = os.path.join(os.getcwd(), settings.database_name,
-                    utils.hashing(fullp, pp))
-
-                cmd = [ assimp_bin_path, "dump", fullp, outf, "-b", "-s", "-l" ] + pp.split()
-                outfile.write("assimp dump "+"-"*80+"\n")
-                outfile.flush()
-                if subprocess.call(cmd, stdout=outfile, stderr=outfile, shell=False):
-                    print("Failure processing " + fullp)
-
-                    # spit out an empty file to indicate that this failure is expected
-                    with open(outf,'wb') as f:
-                        pass
+                key = utils.db_key(fullp, pp)
+                previous = utils.add_to_index(index, fullp, pp, key)
+                obsolete.add(previous)
+                obsolete.add(utils.hashing(fullp, pp))
+                if update and same_assimp and previous == key and key in existing:
+                    continue
+                jobs.append((fullp, pp, key))
+            index["files"][utils.normalize_path(fullp)]["assimp"] = identity
     return num
-                    
 
 # -------------------------------------------------------------------------------
-def make_zip():
-    """Zip the contents of ./<settings.database_name>
-    to <settings.database_name>.zip using DEFLATE
-    compression to minimize the file size. """
+def dump(assimp_bin_path, outdir, job):
+    """ Dump one file (in a worker process). Returns (job, return code, output) """
+    fullp, pp, key = job
+    outf = os.path.join(outdir, key)
+    cmd = [ assimp_bin_path, "dump", fullp, outf, "-b", "-s", "-l" ] + pp.split()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False)
+    output = proc.communicate()[0]
+    if proc.returncode:
+        # spit out an empty file to indicate that this failure is expected
+        with open(outf,'wb') as f:
+            pass
+    return job, proc.returncode, output
 
-    num = 0
-    zipout = zipfile.ZipFile(settings.database_name + ".zip", "w", zipfile.ZIP_DEFLATED)
-    for f in os.listdir(settings.database_name):
-        p = os.path.join(settings.database_name, f)
-        zipout.write(p, f)
-        if settings.remove_old:
-            os.remove(p)
-
-        num += 1
+# -------------------------------------------------------------------------------
+def run_dumps(jobs, outdir, outfile, num_workers):
+    """ Run the dumps of 'jobs' on num_workers processes, writing them
+    to 'outdir'. The log is written in the order of 'jobs'. """
+    run = functools.partial(dump, assimp_bin_path, outdir)
+    if num_workers > 1 and len(jobs) > 1:
+        pool = multiprocessing.Pool(num_workers)
+        done = pool.imap(run, jobs)
+    else:
+        pool = None
+        done = (run(job) for job in jobs)
 
-    if settings.remove_old:
-        os.rmdir(settings.database_name)
+    try:
+        for (fullp, pp, key), r, output in done:
+            print("DUMP " + fullp + "\n post-processing: " + pp)
+            outfile.write("assimp dump "+"-"*80+"\n")
+            outfile.write(output.decode("utf-8", "replace"))
+            outfile.flush()
+            if r:
+                print("Failure processing " + fullp)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
-    bad = zipout.testzip()
-    assert bad is None
+# -------------------------------------------------------------------------------
+def update_zip(outdir, jobs, index, obsolete):
+    """Add the new dumps of ./<outdir> to <settings.database_name>.zip
+    in place: they are appended with the index to the archive and only
+    the central directory is rewritten. The archive is compacted when
+    more than a third of it is made of replaced or obsolete dumps."""
+    path = settings.database_name + ".zip"
+    with warnings.catch_warnings():
+        # dumps generated again are appended under the same name, the
+        # last member with a name is the one read from the archive.
+        warnings.simplefilter("ignore", UserWarning)
+        with zipfile.ZipFile(path, "a", zipfile.ZIP_DEFLATED) as zipout:
+            for fullp, pp, key in jobs:
+                zipout.write(os.path.join(outdir, key), key)
+            zipout.writestr(settings.database_index, utils.dump_index(index))
+
+    with zipfile.ZipFile(path, "r") as zipin:
+        infos = zipin.infolist()
+    live = {}
+    for info in infos:
+        if info.filename not in obsolete:
+            live[info.filename] = info
+    live_size = sum(info.compress_size for info in live.values())
+    dead_size = sum(info.compress_size for info in infos) - live_size
+
+    if dead_size > live_size / 2:
+        print("Compacting " + path)
+        compacted = path + ".tmp"
+        with zipfile.ZipFile(path, "r") as zipin:
+            with zipfile.ZipFile(compacted, "w", zipfile.ZIP_DEFLATED) as zipout:
+                for name in sorted(live):
+                    zipout.writestr(live[name], zipin.read(live[name]))
+        os.remove(path)
+        os.rename(compacted, path)
+
+    with zipfile.ZipFile(path, "r") as zipin:
+        bad = zipin.testzip()
+        assert bad is None
+        num = len(set(zipin.namelist()) - obsolete)
 
     print("="*60)
     print("Database contains {0} entries".format(num))
@@ -154,21 +243,71 @@ def extract_zip():
         
 
 # -------------------------------------------------------------------------------
-def gen_db(ext_list,outfile):
-    """Generate the crash dump database in
-    ./<settings.database_name>"""
-    try:
-        os.mkdir(settings.database_name)
-    except OSError:
-        pass
-
+def gen_db(ext_list, outfile, nozip=False, update=False, num_workers=None):
+    """Generate the crash dump database: <settings.database_name>.zip,
+    or ./<settings.database_name> if nozip is set"""
+    if nozip:
+        extract_zip()
+        try:
+            os.mkdir(settings.database_name)
+        except OSError:
+            pass
+        existing = set(os.listdir(settings.database_name))
+        index_data = None
+        if settings.database_index in existing:
+            with open(os.path.join(settings.database_name, settings.database_index), "rt") as f:
+                index_data = f.read()
+    else:
+        try:
+            with zipfile.ZipFile(settings.database_name + ".zip", "r") as zipin:
+                existing = set(zipin.namelist())
+                index_data = zipin.read(settings.database_index) if settings.database_index in existing else None
+        except IOError:
+            existing, index_data = set(), None
+    index = utils.load_index(index_data) if index_data else utils.empty_index()
+
+    identity = assimp_identity(assimp_bin_path)
+    jobs, obsolete = [], set()
     num = 0
     for tp in settings.model_directories:
-        num += process_dir(tp, outfile,
-            lambda x: os.path.splitext(x)[1].lower() in ext_list and not x in settings.files_to_ignore)
+        num += process_dir(tp,
+            lambda x: os.path.splitext(x)[1].lower() in ext_list and not x in settings.files_to_ignore,
+            index, existing, identity, update, jobs, obsolete)
+
+    # forget the files which were removed or moved away
+    for path in [p for p in index["files"] if not os.path.isfile(p)]:
+        obsolete.update(index["files"].pop(path)["dumps"].values())
+
+    # dumps still used by another file are not obsolete
+    for entry in index["files"].values():
+        obsolete.difference_update(entry["dumps"].values())
+    obsolete.discard(None)
+
+    # files with the same content share their dumps: dump each key once
+    unique = collections.OrderedDict()
+    for job in jobs:
+        unique.setdefault(job[2], job)
+    jobs = list(unique.values())
+
+    outdir = settings.database_name if nozip else tempfile.mkdtemp(dir=".")
+    try:
+        run_dumps(jobs, outdir, outfile, num_workers or multiprocessing.cpu_count())
+
+        if nozip:
+            for key in obsolete:
+                p = os.path.join(settings.database_name, key)
+                if os.path.isfile(p):
+                    os.remove(p)
+            with open(os.path.join(settings.database_name, settings.database_index), "wt") as f:
+                f.write(utils.dump_index(index))
+        else:
+            update_zip(outdir, jobs, index, obsolete)
+    finally:
+        if not nozip:
+            shutil.rmtree(outdir)
 
     print("="*60)
-    print("Updated {0} entries".format(num))
+    print("Updated {0} of {1} entries".format(len(jobs), num))
         
 
 # -------------------------------------------------------------------------------
@@ -182,7 +321,7 @@ if __name__ == "__main__":
         sys.exit(0)
 
     assimp_bin_path = sys.argv[1]    
-    ext_list, preview, nozip = None, False, False
+    ext_list, preview, nozip, update, num_workers = None, False, False, False, None
     for m in sys.argv[2:]:
         if m[:10]=="--exclude=":
             settings.exclude_extensions += map(clean, m[10:].split(","))
@@ -196,6 +335,12 @@ if __name__ == "__main__":
             preview = True
         elif m=="-n" or m == "--nozip":
             nozip = True
+        elif m=="-u" or m == "--update":
+            update = True
+        elif m[:7]=="--jobs=":
+            num_workers = int(m[7:])
+        elif m[:2]=="-j":
+            num_workers = int(m[2:])
         else:
             print("Unrecognized parameter: " + m)
             sys.exit(-1)
@@ -213,12 +358,7 @@ if __name__ == "__main__":
     if preview:       
         sys.exit(1)
 
-    extract_zip()    
-    gen_db(ext_list,outfile)
-    make_zip()
-
-    print("="*60)
-    input("Press any key to continue")
+    gen_db(ext_list, outfile, nozip, update, num_workers)
     sys.exit(0)
     
 # vim: ai ts=4 sts=4 et sw=4    
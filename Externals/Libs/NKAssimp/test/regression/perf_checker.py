@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+# ---------------------------------------------------------------------------
+# Open Asset Import Library (ASSIMP)
+# ---------------------------------------------------------------------------
+#
+# Copyright (c) 2006-2020, ASSIMP Development Team
+#
+# All rights reserved.
+#
+# Redistribution and use of this software in source and binary forms, 
+# with or without modification, are permitted provided that the following 
+# conditions are met:
+# 
+# * Redistributions of source code must retain the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer.
+# 
+# * Redistributions in binary form must reproduce the above
+#   copyright notice, this list of conditions and the
+#   following disclaimer in the documentation and/or other
+#   materials provided with the distribution.
+# 
+# * Neither the name of the ASSIMP team, nor the names of its
+#   contributors may be used to endorse or promote products
+#   derived from this software without specific prior
+#   written permission of the ASSIMP Development Team.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS 
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT 
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR
+# A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT 
+# OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT 
+# LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE,
+# DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY 
+# THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT 
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE 
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+# ---------------------------------------------------------------------------
+
+"""
+Performance gate of the regression suite, the counterpart of
+result_checker.py for the speed and the memory use of the importers.
+
+run.py appends the wall time, the peak memory use (RSS) and the output size
+of every 'assimp dump' it runs to
+  ../results/run_regression_suite_perf.jsonl
+Compare the latest runs recorded there with the baseline stored in
+  ./perf_baseline.json
+and determine PASSED or FAILED. The samples of a test are pooled over its
+last settings.perf_history runs, on both sides: the runs recorded since the
+baseline, and the runs the baseline was made of. A test regresses if its
+median wall time or peak RSS grew by more than settings.perf_threshold and
+the pooled samples are significantly larger than those of the baseline
+(one-sided Mann-Whitney U test at the settings.perf_significance level).
+Significance needs several samples on both sides: 5 runs, or a run timing
+each import 5 times (run.py -r5), are enough at the 0.05 level. The check
+fails if there are too few samples to detect a regression, or if the run
+and the baseline used a different number of worker processes (-j<N>):
+concurrent imports slow each other down. Only the runs with the number of
+workers of the latest run are pooled.
+
+Usage: perf_checker.py [--update-baseline]
+
+  --update-baseline  store the latest run as the new baseline instead.
+"""
+
+import sys
+import os
+import json
+import math
+
+import settings
+
+PERF_FILE = os.path.join('..', 'results', 'run_regression_suite_perf.jsonl')
+BASELINE_FILE = os.path.join('perf_baseline.json')
+
+BANNER = """
+*****************************************************************
+Regression suite performance checker
+(test/regression/perf_checker.py)
+*****************************************************************
+"""
+
+# measures compared with the baseline: (record field, label, unit, scale)
+METRICS = [
+    ("wall", "wall time", "ms", 1000.),
+    ("rss", "peak RSS", "MB", 1. / (1 << 20)),
+]
+
+def passed(message):
+    print('\n\n**PASSED: {0}.\n'.format(message))
+    return 0
+
+def failed(message):
+    print('\n\n**FAILED: {0}. \nFor more information see test/regression/README.\n'
+        .format(message))
+    return -1
+
+def read_runs(filename):
+    """ Records of the performance log, as a list of runs in the order they
+    were recorded, each one a dict of records by test key """
+    try:
+        with open(filename, 'rt') as log:
+            records = [json.loads(line) for line in log if line.strip()]
+    except IOError:
+        print('Failed to read {0}.'.format(filename))
+        return None
+    runs = []
+    for record in records:
+        if not runs or runs[-1][0] != record['run']:
+            runs.append((record['run'], {}))
+        runs[-1][1][record['key']] = record
+    return [run for run_id, run in runs]
+
+def pool_runs(runs, baseline=None):
+    """ Records of the tests of the latest run, with the samples of their
+    last settings.perf_history runs made with the same number of workers.
+    The runs of the baseline, and the runs before them, are left out. """
+    pooled = {}
+    for key, latest in runs[-1].items():
+        stop = set((baseline or {}).get(key, {}).get('runs', ()))
+        record = dict(latest, wall=[], rss=[], runs=[])
+        for run in reversed(runs):
+            r = run.get(key)
+            if r is None or r.get('jobs') != latest.get('jobs'):
+                continue
+            if r['run'] in stop or len(record['runs']) == settings.perf_history:
+                break
+            record['wall'] += r['wall']
+            record['rss'] += r['rss']
+            record['runs'].append(r['run'])
+        pooled[key] = record
+    return pooled
+
+def read_baseline(filename):
+    try:
+        with open(filename, 'rt') as baseline:
+            return json.load(baseline)
+    except IOError:
+        print('Failed to read {0}.'.format(filename))
+        return None
+
+def write_baseline(filename, run):
+    baseline = dict((key, {'wall': r['wall'], 'rss': r['rss'], 'size': r['size'],
+        'returncode': r['returncode'], 'jobs': r.get('jobs'), 'runs': r['runs']})
+        for key, r in run.items())
+    with open(filename, 'wt') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+def median(values):
+    values = sorted(values)
+    half = len(values) // 2
+    return values[half] if len(values) % 2 else (values[half - 1] + values[half]) / 2.
+
+def min_p_value(m, n):
+    """ Smallest p-value the exact U test can reach with m and n samples """
+    return 1. / math.factorial(m + n) * math.factorial(m) * math.factorial(n)
+
+def u_distribution(m, n):
+    """ Number of arrangements of m and n samples for each value of U """
+    # counts[i][j] is the distribution for i and j samples
+    counts = [[[1]] * (n + 1)] + [[[1]] + [None] * n for i in range(m)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            dist = [0] * (i * j + 1)
+            for u, c in enumerate(counts[i - 1][j]):
+                dist[u + j] += c
+            for u, c in enumerate(counts[i][j - 1]):
+                dist[u] += c
+            counts[i][j] = dist
+    return counts[m][n]
+
+def mann_whitney_p(x, y):
+    """ p-value of the one-sided Mann-Whitney U test of the hypothesis that
+    the samples x tend to be larger than the samples y. Exact for small
+    samples without ties, normal approximation otherwise. """
+    m, n = len(x), len(y)
+    values = sorted(x + y)
+    ranks = {}
+    start = 0
+    while start < len(values):
+        end = start
+        while end < len(values) and values[end] == values[start]:
+            end += 1
+        ranks[values[start]] = (start + end + 1) / 2.
+        start = end
+    u = sum(ranks[v] for v in x) - m * (m + 1) / 2.
+
+    ties = [values.count(v) for v in ranks if values.count(v) > 1]
+    if not ties and m + n <= 40:
+        dist = u_distribution(m, n)
+        return float(sum(dist[int(u):])) / sum(dist)
+
+    size = m + n
+    variance = m * n / 12. * ((size + 1) - sum(t ** 3 - t for t in ties) / float(size * (size - 1)))
+    if variance <= 0:
+        return 1.
+    z = (u - m * n / 2. - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def check_case(current, baseline):
+    """ Compare the measures of a test with its baseline. Returns a list of
+    (regressed, description) for the metrics which grew beyond the
+    threshold: regressed is False if the growth is not significant. """
+    growths = []
+    for metric, label, unit, scale in METRICS:
+        samples, reference = current.get(metric), baseline.get(metric)
+        if not samples or not reference:
+            continue
+        if metric == 'wall' and median(reference) < settings.perf_min_time:
+            continue
+        ratio = median(samples) / median(reference) if median(reference) else float('inf')
+        if ratio <= 1 + settings.perf_threshold:
+            continue
+        p = mann_whitney_p(samples, reference)
+        growths.append((p < settings.perf_significance,
+            '{0}: {1:.1f}{3} -> {2:.1f}{3} (x{4:.2f}, p={5:.3f}, {6} vs {7} samples)'.format(
+                label, median(reference) * scale, median(samples) * scale, unit,
+                ratio, p, len(samples), len(reference))))
+    return growths
+
+def run():
+    print(BANNER)
+    print('Reading input files.')
+
+    runs = read_runs(PERF_FILE)
+    if runs is None:
+        return failed('Could not locate input files')
+    if not runs:
+        return failed('The performance log is empty')
+
+    if '--update-baseline' in sys.argv[1:]:
+        current = pool_runs(runs)
+        write_baseline(BASELINE_FILE, current)
+        return passed('Stored the {0} tests of the latest runs as the baseline'.format(len(current)))
+
+    baseline = read_baseline(BASELINE_FILE)
+    if baseline is None:
+        return failed('Could not locate the baseline, create it with --update-baseline')
+    current = pool_runs(runs, baseline)
+    if not any(r['runs'] for r in current.values()):
+        return failed('No run was recorded since the baseline')
+
+    # timings of runs with different numbers of workers are not comparable
+    jobs = set(r.get('jobs') for r in current.values())
+    baseline_jobs = set(r.get('jobs') for r in baseline.values())
+    if len(jobs) != 1 or jobs != baseline_jobs:
+        return failed('The latest run used -j{0} and the baseline -j{1}, their timings can not be compared.  \n'
+            .format('/'.join(map(str, jobs)), '/'.join(map(str, baseline_jobs))) +
+            'Run both with the same -j<N>, or update the baseline with --update-baseline')
+
+    # failed imports are only run once per run
+    samples = [len(r['wall']) for r in current.values() if not r['returncode']]
+    references = [len(r['wall']) for r in baseline.values() if not r['returncode']]
+    if samples and references and \
+            min_p_value(min(samples), min(references)) >= settings.perf_significance:
+        return failed('Not enough samples for a regression to be significant ({0} vs {1}).  \n'
+            .format(min(samples), min(references)) +
+            'Record more runs (the last {0} are pooled), or time each import several times with run.py -r<N>'
+            .format(settings.perf_history))
+
+    regressions = []
+    not_significant = []
+    untested = []
+    resized = []
+    for key in sorted(current):
+        if key not in baseline:
+            untested.append(key)
+            continue
+        if current[key]['size'] != baseline[key]['size']:
+            resized.append('{0}: {1} -> {2} bytes'.format(key, baseline[key]['size'], current[key]['size']))
+        for regressed, description in check_case(current[key], baseline[key]):
+            (regressions if regressed else not_significant).append(key + '\n\t' + description)
+
+    print('Tests not in the baseline:\n' + '\n'.join(untested))
+    print('Output size changes:\n' + '\n'.join(resized))
+    print('Slower or bigger, but not significantly:\n' + '\n'.join(not_significant))
+    print('Performance regressions:\n' + '\n'.join(regressions))
+    if not regressions:
+        return passed('No significant performance regression against the baseline')
+    return failed('Encountered performance regressions beyond {0:.0%} of the baseline.  \n'
+        .format(settings.perf_threshold) +
+        'Please review the changes you made, and update the baseline with \n' +
+        '--update-baseline if the regressions are expected')
+
+if __name__ == "__main__":
+    sys.exit(run())
+
+# vim: ai ts=4 sts=4 et sw=4
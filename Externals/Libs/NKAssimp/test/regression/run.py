@@ -49,6 +49,29 @@ command line argument and defaults to ``assimp``.
 To build, set ``ASSIMP_BUILD_ASSIMP_TOOLS=ON`` in CMake. If generating
 configs for an IDE, make sure to build the assimp_cmd project.
 
+Each (model file, post-processing preset) pair is an independent job, run
+by a pool of worker processes. ``-j<N>`` (``--jobs=<N>``) sets the number
+of workers, which defaults to the number of CPUs. The jobs which took the
+longest in the previous run are started first, and the report and the
+failure list are written in a deterministic order whatever the number of
+workers.
+
+The wall time, the peak memory use (where the platform reports it) and the
+output size of each ``assimp dump`` are appended to the performance log
+(see perf_checker.py). ``-r<N>`` (``--repeat=<N>``) runs each import N
+times to collect several samples, which defaults to settings.perf_repeat.
+
+``--shard=<i>/<N>`` only runs the i-th of N shards of the jobs (1 <= i <=
+N). Jobs are assigned to shards by their database key, which depends on
+the content of the model files only, so that the shards are the same on
+every machine.
+
+Each completed job is recorded in a journal in the results directory.
+``--resume`` continues an interrupted run: the jobs of the journal are
+reported again without being run. ``--merge <journal> ...`` combines the
+journals of the shards of a run into the failure lists, the report and
+the performance log of the whole run, as if it was not sharded.
+
 On Windows, use ``py run.py <path to assimp>`` to make sure the command
 line parameter is forwarded to the script.
 """
@@ -56,17 +79,21 @@ line parameter is forwarded to the script.
 import sys
 import os
 import subprocess
-import zipfile
 import collections
 import multiprocessing
+import json
+import time
 
 import settings
 import utils
+import cmpdump
+import dumpdb
 
 # -------------------------------------------------------------------------------
 EXPECTED_FAILURE_NOT_MET, DATABASE_LENGTH_MISMATCH, \
 DATABASE_VALUE_MISMATCH, IMPORT_FAILURE, \
-FILE_NOT_READABLE, COMPARE_SUCCESS, EXPECTED_FAILURE = range(7)
+FILE_NOT_READABLE, COMPARE_SUCCESS, EXPECTED_FAILURE, \
+REFERENCE_OUTDATED = range(8)
 
 messages = collections.defaultdict(lambda: "<unknown", {
         EXPECTED_FAILURE_NOT_MET:
@@ -78,7 +105,7 @@ messages = collections.defaultdict(lambda: "<unknown", {
 \tExpected: {0} Actual: {1}""",
 
         DATABASE_VALUE_MISMATCH:
-"""Database mismatch: """,
+"""Database mismatch: {0}""",
 
         IMPORT_FAILURE:
 """Unexpected failure during import\n\
@@ -93,22 +120,34 @@ messages = collections.defaultdict(lambda: "<unknown", {
 
         EXPECTED_FAILURE:
 """Expected failure was met.""",
+
+        REFERENCE_OUTDATED:
+"""Reference dump is outdated: the file was modified since it was generated\n\
+\t{0} pp: {1}""",
 })
 
 outfilename_output = "run_regression_suite_output.txt"
 outfilename_failur = "run_regression_suite_failures.csv"
+outfilename_outdated = "run_regression_suite_outdated.csv"
+outfilename_durations = "run_regression_suite_durations.json"
+outfilename_perf = "run_regression_suite_perf.jsonl"
+outfilename_journal = "run_regression_suite_journal{0}.jsonl"
 Environment        = {}
 
+# State of a worker process, see init_worker()
+worker = {}
+
 # -------------------------------------------------------------------------------
 class results:
 
     """ Handle formatting of results"""
 
-    def __init__(self, zipin):
-        """Init, given a ZIPed database """
+    def __init__(self, db):
+        """Init, given the database (see dumpdb.py) """
         self.failures = []
         self.success = []
-        self.zipin = zipin
+        self.outdated = []
+        self.db = db
 
 
     def fail(self, failfile, filename_expect, pp, msg, *args):
@@ -135,14 +174,25 @@ class results:
         self.success.append(f)
 
 
+    def outdate(self, f, pp):
+        """
+        Report that the reference dump of file f for pp config pp is
+        outdated: f was modified, it is not tested until gen_db.py
+        updates its dump.
+
+        """
+        print("[OUTDATED] " + messages[REFERENCE_OUTDATED].format(f, pp))
+        self.outdated.append((f, pp))
+
+
     def report_results(self):
         """Write results to ../results/run_regression_suite_failures.txt"""
 
         count_success = len(self.success)
         count_fail = len(self.failures)
-        percent_good = float(count_success) / (count_success + count_fail)
-        print("\n" + ('='*60) + "\n" + "SUCCESS: {0}\nFAILURE: {1}\nPercentage good: {2}".format(
-            count_success, count_fail, percent_good) +
+        percent_good = float(count_success) / max(1, count_success + count_fail)
+        print("\n" + ('='*60) + "\n" + "SUCCESS: {0}\nFAILURE: {1}\nOUTDATED: {2}\nPercentage good: {3}".format(
+            count_success, count_fail, len(self.outdated), percent_good) +
               "\n" + ('='*60) + "\n")
 
         with open(os.path.join('..', 'results',outfilename_failur), "wt") as f:
@@ -150,9 +200,18 @@ class results:
             f.writelines(map(
                 lambda x: x[0] + ' ' + x[2] + ";" + x[1] + "\n", self.failures))
 
+        with open(os.path.join('..', 'results',outfilename_outdated), "wt") as f:
+            f.write("ORIGINAL FILE;PP CONFIG\n")
+            f.writelines(map(
+                lambda x: x[0] + ";" + x[1] + "\n", self.outdated))
+
         if self.failures:
            print("\nSee " + settings.results + "\\" + outfilename_failur
                  + " for more details\n\n")
+        if self.outdated:
+           print("\n{0} reference dumps are outdated, see ".format(len(self.outdated))
+                 + settings.results + "\\" + outfilename_outdated
+                 + ". Use gen_db.py to update them.\n\n")
 
     def hasFailures( self ):
         """ Return True, if any failures there. """
@@ -172,8 +231,9 @@ def getEnvVar( var ):
     return ""
     
 # -------------------------------------------------------------------------------
-def prepare_output_dir(fullpath, myhash, app):
-    outfile = os.path.join(settings.results, "tmp", os.path.split(fullpath)[1] + "_" + myhash)
+def prepare_output_dir(fullpath, myhash, app, tmpdir=None):
+    outfile = os.path.join(tmpdir or os.path.join(settings.results, "tmp"),
+        utils.dump_dir_name(fullpath, myhash))
     try:
         os.mkdir(outfile)
     except OSError:
@@ -183,91 +243,435 @@ def prepare_output_dir(fullpath, myhash, app):
     return outfile
 
 # -------------------------------------------------------------------------------
-def process_dir(d, outfile_results, zipin, result ):
-    shellparams = {'stdout':outfile_results, 'stderr':outfile_results, 'shell':False}
+def discard_output_dir(outfile):
+    """ Remove the output dir of a test which passed: dumps are only kept
+    for the failures """
+    outdir = os.path.dirname(outfile)
+    for name in os.listdir(outdir):
+        os.remove(os.path.join(outdir, name))
+    os.rmdir(outdir)
 
+# -------------------------------------------------------------------------------
+def collect_jobs(d, known, index, jobs, result, shard=None):
+    """ Append a (file, pp preset, database key) job to 'jobs' for each file
+    in 'd' and each preset of settings.pp_configs_to_test which has an up
+    to date dump among the 'known' database entries. Outdated dumps are
+    reported to 'result'. With shard = (i, N), only the jobs and outdated
+    dumps of the i-th shard out of N are considered. """
     print("Processing directory " + d)
-    all = ""
     for f in sorted(os.listdir(d)):
         fullpath = os.path.join(d, f)
         if os.path.isdir(fullpath) and not f[:1] == '.':
-            process_dir(fullpath, outfile_results, zipin, result)
+            collect_jobs(fullpath, known, index, jobs, result, shard)
             continue
-                
+
         if f in settings.files_to_ignore or os.path.splitext(f)[1] in settings.exclude_extensions:
             print("Ignoring " + f)
             return
 
         for pppreset in settings.pp_configs_to_test:
-            filehash = utils.hashing(fullpath, pppreset)
-            failure = False
-
-            try:
-                input_expected = zipin.open(filehash, "r").read()
-                # empty dump files indicate 'expected import failure'
-                if not len(input_expected):
-                   failure = True
-            except KeyError:
+            filehash, outdated = utils.find_reference(fullpath, pppreset, known, index)
+            if filehash is None:
                 # TODO(acgessler): Keep track of this and report as error in the end.
-                print("Didn't find "+fullpath+" (Hash is "+filehash+") in database. Outdated "+\
+                print("Didn't find "+fullpath+" (Hash is "+utils.db_key(fullpath, pppreset)+") in database. Outdated "+\
                     "regression database? Use gen_db.zip to re-generate.")
                 continue
-
-            print("-"*60 + "\n  " + os.path.realpath(fullpath) + " pp: " + pppreset)
-
-            outfile_actual = prepare_output_dir(fullpath, filehash, "ACTUAL")
-            outfile_expect = prepare_output_dir(fullpath, filehash, "EXPECT")
-            outfile_results.write("assimp dump    "+"-"*80+"\n")
-            outfile_results.flush()
-            assimp_bin_path = getEnvVar("assimp_path")
-            command = [assimp_bin_path,
-                "dump",
-                fullpath, outfile_actual, "-b", "-s", "-l" ] +\
-                pppreset.split()
-            print( "command = " + str( command ) )
-            r = subprocess.call(command, **shellparams)
-            outfile_results.flush()
-
-            if r and not failure:
-                result.fail(fullpath, outfile_expect, pppreset, IMPORT_FAILURE, r)
-                outfile_results.write("Failed to import\n")
-                continue
-            elif failure and not r:
-                result.fail(fullpath, outfile_expect, pppreset, EXPECTED_FAILURE_NOT_MET)
-                outfile_results.write("Expected import to fail\n")
+            if shard and utils.shard_of(filehash, shard[1]) != shard[0]:
                 continue
-            elif failure and r:
-                result.ok(fullpath, pppreset, EXPECTED_FAILURE)
-                outfile_results.write("Failed as expected, skipping.\n")
+            if outdated:
+                result.outdate(fullpath, pppreset)
                 continue
+            jobs.append((fullpath, pppreset, filehash))
 
-            with open(outfile_expect, "wb") as s:
-                s.write(input_expected)
+# -------------------------------------------------------------------------------
+def init_worker(counter, assimp_bin_path, repeat):
+    """ Initialize a worker process: open the database and create the
+    results/tmp/worker<N> subtree the worker writes its dumps to """
+    with counter.get_lock():
+        counter.value += 1
+        number = counter.value
+
+    Environment["assimp_path"] = assimp_bin_path
+    worker["repeat"] = repeat
+    worker["db"] = dumpdb.open_database()
+    worker["tmp"] = os.path.join(settings.results, "tmp", "worker{0}".format(number))
+    worker["log"] = os.path.join(worker["tmp"], "log.txt")
+    if not os.path.isdir(worker["tmp"]):
+        os.makedirs(worker["tmp"])
 
-            try:
-                with open(outfile_actual, "rb") as s:
-                    input_actual = s.read()
-            except IOError:
-                continue
+# -------------------------------------------------------------------------------
+def run_job(job):
+    """ Run the test of one (file, pp preset) pair in a worker process.
+
+    Returns (job, expected dump path, outcomes, log, duration, perf) where
+    outcomes are ("fail" or "ok", message, format args) tuples to report, in
+    order, and perf the measures of the imports (see measure_dump()).
+    """
+    fullpath, pppreset, filehash = job
+    start = time.time()
+    outcomes = []
+    perf = {}
+    with open(worker["log"], "w+t") as outfile_results:
+        outfile_expect = check_file(fullpath, pppreset, filehash, outfile_results, outcomes, perf)
+        outfile_results.seek(0)
+        log = outfile_results.read()
+    return job, outfile_expect, outcomes, log, time.time() - start, perf
 
-            outfile_results.write("Expected data length: {0}\n".format(len(input_expected)))
-            outfile_results.write("Actual data length: {0}\n".format(len(input_actual)))
-            failed = False
-            if len(input_expected) != len(input_actual):
-                result.fail(fullpath, outfile_expect, pppreset, DATABASE_LENGTH_MISMATCH,
-                        len(input_expected), len(input_actual))
-                # Still compare the dumps to see what the difference is
-                failed = True
-
-            outfile_results.write("assimp cmpdump "+"-"*80+"\n")
-            outfile_results.flush()
-            command = [ assimp_bin_path, 'cmpdump', outfile_actual, outfile_expect ]
-            if subprocess.call(command, **shellparams) != 0:
-                if not failed:
-                    result.fail(fullpath, outfile_expect, pppreset, DATABASE_VALUE_MISMATCH)
-                continue
+# -------------------------------------------------------------------------------
+def run_instrumented(command, **params):
+    """ Run a command, like subprocess.call(). Returns (return code, wall
+    time in seconds, peak resident set size of the process in bytes). The
+    peak RSS is None on platforms without os.wait4 (Windows). """
+    start = time.time()
+    if not hasattr(os, "wait4"):
+        r = subprocess.call(command, **params)
+        return r, time.time() - start, None
+
+    process = subprocess.Popen(command, **params)
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.time() - start
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return process.returncode, wall, rss
 
-            result.ok(fullpath, pppreset, COMPARE_SUCCESS, len(input_expected))
+# -------------------------------------------------------------------------------
+def measure_dump(command, outfile, shellparams, perf):
+    """ Run 'command', the assimp dump writing 'outfile', worker["repeat"]
+    times (once if it fails). The samples of wall time and peak RSS, the
+    output size and the return code are stored in 'perf'. Returns the
+    return code of the first run. """
+    perf["wall"] = []
+    perf["rss"] = []
+    for i in range(worker["repeat"]):
+        r, wall, rss = run_instrumented(command, **shellparams)
+        perf["wall"].append(wall)
+        if rss is not None:
+            perf["rss"].append(rss)
+        if i == 0:
+            first = r
+        if r:
+            break
+    perf["returncode"] = first
+    perf["size"] = os.path.getsize(outfile) if os.path.isfile(outfile) else 0
+    return first
+
+# -------------------------------------------------------------------------------
+def check_file(fullpath, pppreset, filehash, outfile_results, outcomes, perf):
+    shellparams = {'stdout':outfile_results, 'stderr':outfile_results, 'shell':False}
+
+    # read the expected dump while assimp runs
+    worker["db"].prefetch(filehash)
+
+    outfile_actual = prepare_output_dir(fullpath, filehash, "ACTUAL", worker["tmp"])
+    outfile_expect = prepare_output_dir(fullpath, filehash, "EXPECT", worker["tmp"])
+    outfile_results.write("assimp dump    "+"-"*80+"\n")
+    outfile_results.flush()
+    assimp_bin_path = getEnvVar("assimp_path")
+    command = [assimp_bin_path,
+        "dump",
+        fullpath, outfile_actual, "-b", "-s", "-l" ] +\
+        pppreset.split()
+    outfile_results.write("command = " + str(command) + "\n")
+    outfile_results.flush()
+    r = measure_dump(command, outfile_actual, shellparams, perf)
+    outfile_results.flush()
+
+    input_expected = worker["db"].read(filehash)
+    # empty dump files indicate 'expected import failure'
+    failure = not len(input_expected)
+
+    if r and not failure:
+        outcomes.append(("fail", IMPORT_FAILURE, (r,)))
+        outfile_results.write("Failed to import\n")
+        return outfile_expect
+    elif failure and not r:
+        outcomes.append(("fail", EXPECTED_FAILURE_NOT_MET, ()))
+        outfile_results.write("Expected import to fail\n")
+        return outfile_expect
+    elif failure and r:
+        outcomes.append(("ok", EXPECTED_FAILURE, ()))
+        outfile_results.write("Failed as expected, skipping.\n")
+        discard_output_dir(outfile_actual)
+        return outfile_expect
+
+    try:
+        with open(outfile_actual, "rb") as s:
+            input_actual = s.read()
+    except IOError:
+        with open(outfile_expect, "wb") as s:
+            s.write(input_expected)
+        return outfile_expect
+
+    outfile_results.write("Expected data length: {0}\n".format(len(input_expected)))
+    outfile_results.write("Actual data length: {0}\n".format(len(input_actual)))
+    failed = False
+    if len(input_expected) != len(input_actual):
+        outcomes.append(("fail", DATABASE_LENGTH_MISMATCH,
+                (len(input_expected), len(input_actual))))
+        # Still compare the dumps to see what the difference is
+        failed = True
+
+    outfile_results.write("compare dumps  "+"-"*80+"\n")
+    mismatch = cmpdump.compare_dumps(input_actual, input_expected)
+    if mismatch is not None:
+        outfile_results.write("Files are different at " + str(mismatch) + "\n")
+        if not failed:
+            outcomes.append(("fail", DATABASE_VALUE_MISMATCH, (str(mismatch),)))
+        failed = True
+
+    if failed:
+        # keep both dumps for inspection
+        with open(outfile_expect, "wb") as s:
+            s.write(input_expected)
+        return outfile_expect
+
+    outfile_results.write("Success\n")
+    discard_output_dir(outfile_actual)
+    outcomes.append(("ok", COMPARE_SUCCESS, (len(input_expected),)))
+    return outfile_expect
+
+# -------------------------------------------------------------------------------
+def load_durations():
+    """ Durations of the jobs of the previous run, by 'file:pp preset' """
+    try:
+        with open(os.path.join(settings.results, outfilename_durations), "rt") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+# -------------------------------------------------------------------------------
+def save_durations(durations):
+    with open(os.path.join(settings.results, outfilename_durations), "wt") as f:
+        json.dump(durations, f, indent=1, sort_keys=True)
+
+# -------------------------------------------------------------------------------
+def save_perf(records):
+    """ Append the measures of a run to the performance log, one JSON
+    record per line and per job """
+    with open(os.path.join(settings.results, outfilename_perf), "at") as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+# -------------------------------------------------------------------------------
+def job_key(job):
+    return job[0].replace('\\', '/') + ":" + job[1]
+
+# -------------------------------------------------------------------------------
+def journal_name(shard):
+    if not shard:
+        return os.path.join(settings.results, outfilename_journal.format(""))
+    return os.path.join(settings.results, outfilename_journal.format("_{0}of{1}".format(*shard)))
+
+# -------------------------------------------------------------------------------
+def load_journal(filename):
+    """ Read a journal written by process_jobs(). Returns (outcomes of the
+    completed jobs by job, outdated (file, pp preset) pairs). The last
+    line is ignored if the run was interrupted while writing it. """
+    done = {}
+    outdated = []
+    try:
+        with open(filename, "rt") as f:
+            lines = f.readlines()
+    except IOError:
+        return done, outdated
+
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if "outdated" in record:
+            outdated.append(tuple(record["outdated"]))
+            continue
+        job = tuple(record["job"])
+        done[job] = (job, record["expect"], record["outcomes"], record["log"],
+            record["duration"], record["perf"])
+    return done, outdated
+
+# -------------------------------------------------------------------------------
+def write_journal(journal, outcome):
+    """ Record the outcome of a completed job in the journal """
+    job, outfile_expect, outcomes, log, duration, perf = outcome
+    journal.write(json.dumps({"job": job, "expect": outfile_expect, "outcomes": outcomes,
+        "log": log, "duration": duration, "perf": perf}) + "\n")
+    journal.flush()
+
+# -------------------------------------------------------------------------------
+def finish_job(outcome, tmp):
+    """ Move the dumps of a completed job from the dir of its worker to
+    'tmp'. Returns the outcome with the paths of the moved dumps. """
+    job, outfile_expect, outcomes, log, duration, perf = outcome
+    dumps = os.path.dirname(outfile_expect)
+    outfile_expect = os.path.join(tmp, os.path.basename(dumps), os.path.basename(outfile_expect))
+    if os.path.isdir(dumps):
+        # dumps left by an interrupted run
+        if os.path.isdir(os.path.dirname(outfile_expect)):
+            del_folder_with_contents(os.path.dirname(outfile_expect))
+            os.rmdir(os.path.dirname(outfile_expect))
+        os.rename(dumps, os.path.dirname(outfile_expect))
+    log = log.replace(os.path.dirname(dumps), tmp)
+    return job, outfile_expect, outcomes, log, duration, perf
+
+# -------------------------------------------------------------------------------
+def report_job(outcome, outfile_results, result):
+    """ Report the outcome of a job to 'result' and to the output file """
+    (fullpath, pppreset, filehash), outfile_expect, outcomes, log, duration, perf = outcome
+    print("-"*60 + "\n  " + os.path.realpath(fullpath) + " pp: " + pppreset)
+    outfile_results.write("-"*60 + "\n  " + fullpath + " pp: " + pppreset + "\n")
+    outfile_results.write(log)
+    for kind, msg, args in outcomes:
+        if kind == "fail":
+            result.fail(fullpath, outfile_expect, pppreset, msg, *args)
+        else:
+            result.ok(fullpath, pppreset, msg, *args)
+
+# -------------------------------------------------------------------------------
+def perf_records(outcomes):
+    """ Records of the performance log for the outcomes of a run. The
+    number of workers of each job ("jobs") is part of its measures. """
+    run_id = time.strftime("%Y-%m-%dT%H:%M:%S")
+    records = []
+    for (fullpath, pppreset, filehash), _, _, _, _, perf in outcomes:
+        perf = dict(perf, run=run_id, key=job_key((fullpath, pppreset)),
+            file=utils.normalize_path(fullpath), pp=pppreset)
+        records.append(perf)
+    return records
+
+# -------------------------------------------------------------------------------
+def process_jobs(jobs, outfile_results, result, num_workers, repeat, journal, done):
+    """ Run all jobs on a pool of num_workers processes, longest first
+    according to the previous run. Jobs with no known duration are
+    assumed to be long. The jobs already in 'done', the outcomes of a
+    previous run, are not run again. Each completed job is written to the
+    'journal', and its dumps are moved to results/tmp. Results are
+    reported in the order of 'jobs'. """
+    tmp = os.path.join(settings.results, "tmp")
+    durations = load_durations()
+    schedule = sorted((job for job in jobs if job not in done),
+        key=lambda job: -durations.get(job_key(job), float("inf")))
+    if len(schedule) < len(jobs):
+        print("Resuming: {0} of {1} jobs are already done".format(len(jobs) - len(schedule), len(jobs)))
+
+    counter = multiprocessing.Value('i', 0)
+    initargs = (counter, getEnvVar("assimp_path"), repeat)
+    if num_workers > 1:
+        pool = multiprocessing.Pool(num_workers, init_worker, initargs)
+        completed = pool.imap_unordered(run_job, schedule)
+    else:
+        pool = None
+        init_worker(*initargs)
+        completed = (run_job(job) for job in schedule)
+
+    try:
+        for outcome in completed:
+            outcome = finish_job(outcome, tmp)
+            job = outcome[0]
+            # recorded in the journal, for the merge of sharded runs
+            outcome[5]["jobs"] = num_workers
+            done[job] = outcome
+            write_journal(journal, outcome)
+            durations[job_key(job)] = outcome[4]
+            print("[{0}/{1}] {2} pp: {3} ({4:.1f}s)".format(len(done), len(jobs),
+                os.path.realpath(job[0]), job[1], outcome[4]))
+    except BaseException:
+        # interrupted, the journal has the jobs done so far
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+            pool = None
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        save_durations(durations)
+
+    outcomes = [done[job] for job in jobs]
+    for outcome in outcomes:
+        report_job(outcome, outfile_results, result)
+    save_perf(perf_records(outcomes))
+
+    for name in os.listdir(tmp):
+        if name.startswith("worker"):
+            del_folder_with_contents(os.path.join(tmp, name))
+            os.rmdir(os.path.join(tmp, name))
+
+# -------------------------------------------------------------------------------
+class job_order:
+
+    """ Stands for 'results' in collect_jobs() when only the order of the
+    outdated dumps is needed """
+
+    def __init__(self):
+        self.outdated = []
+
+    def outdate(self, f, pp):
+        self.outdated.append((f, pp))
+
+# -------------------------------------------------------------------------------
+def merge_journals(filenames):
+    """ Report the jobs of the journals of several shards as a single run,
+    in the order of an unsharded run: the order of collect_jobs(). """
+    done = {}
+    outdated = set()
+    for filename in filenames:
+        if not os.path.isfile(filename):
+            print("Journal " + filename + " was not found")
+            return 1
+        shard_done, shard_outdated = load_journal(filename)
+        done.update(shard_done)
+        outdated.update(shard_outdated)
+
+    walk = job_order()
+    jobs = list_jobs(walk)
+    if jobs is None:
+        return 1
+    # jobs and outdated dumps unknown to the walk (the models or the
+    # database changed since the shards ran) are reported last
+    order = dict((job, i) for i, job in enumerate(jobs))
+    outcomes = [done[job] for job in sorted(done, key=lambda job: (job not in order, order.get(job), job))]
+    order = dict((job, i) for i, job in enumerate(walk.outdated))
+    outdated = sorted(outdated, key=lambda job: (job not in order, order.get(job), job))
+
+    res = results(None)
+    for fullpath, pppreset in outdated:
+        res.outdate(fullpath, pppreset)
+    with open(os.path.join(settings.results, outfilename_output), "wt") as outfile:
+        for outcome in outcomes:
+            report_job(outcome, outfile, res)
+    save_perf(perf_records(outcomes))
+
+    res.report_results()
+    if res.hasFailures():
+        return 1
+
+    return 0
+
+# -------------------------------------------------------------------------------
+def list_jobs(result, shard=None):
+    """ The jobs of settings.model_directories, see collect_jobs(), or None
+    if the database was not found. """
+    db = dumpdb.open_database()
+    if db is None:
+        print("Regression database ", settings.database_name,
+              ".zip was not found")
+        return None
+
+    known = db.names()
+    if settings.database_index in known:
+        index = utils.load_index(bytes(db.read(settings.database_index)))
+    else:
+        index = utils.empty_index()
+    db.close()
+
+    jobs = []
+    for tp in settings.model_directories:
+        collect_jobs(tp, known, index, jobs, result, shard)
+    return jobs
 
 # -------------------------------------------------------------------------------
 def del_folder_with_contents(folder):
@@ -279,27 +683,31 @@ def del_folder_with_contents(folder):
 
 
 # -------------------------------------------------------------------------------
-def run_test():
+def run_test(num_workers=None, repeat=None, shard=None, resume=False):
     tmp_target_path = os.path.join(settings.results, "tmp")
     try:
         print( "try to make " + tmp_target_path )
         os.mkdir(tmp_target_path)
     except OSError as oerr:
-        # clear contents if tmp folder exists already
-       del_folder_with_contents(tmp_target_path)
-
-    try:
-        zipin = zipfile.ZipFile(settings.database_name + ".zip",
-            "r", zipfile.ZIP_STORED)
-    except IOError:
-        print("Regression database ", settings.database_name,
-              ".zip was not found")
+        # clear contents if tmp folder exists already, unless resuming:
+        # they are the dumps of the jobs already done
+        if not resume:
+            del_folder_with_contents(tmp_target_path)
+
+    res = results(None)
+    jobs = list_jobs(res, shard)
+    if jobs is None:
         return
 
-    res = results(zipin)
-    with open(os.path.join(settings.results, outfilename_output), "wt") as outfile:
-        for tp in settings.model_directories:
-            process_dir(tp, outfile, zipin, res)
+    done = {}
+    if resume:
+        done, _ = load_journal(journal_name(shard))
+    with open(journal_name(shard), "at" if resume else "wt") as journal:
+        for f, pp in res.outdated:
+            journal.write(json.dumps({"outdated": [f, pp]}) + "\n")
+        with open(os.path.join(settings.results, outfilename_output), "wt") as outfile:
+            process_jobs(jobs, outfile, res, num_workers or multiprocessing.cpu_count(),
+                repeat or settings.perf_repeat, journal, done)
 
     res.report_results()
     if res.hasFailures():
@@ -309,12 +717,33 @@ def run_test():
 
 # -------------------------------------------------------------------------------
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        assimp_bin_path = sys.argv[1]
-    else:
-        assimp_bin_path = 'assimp'
+    assimp_bin_path = 'assimp'
+    num_workers = None
+    repeat = None
+    shard = None
+    resume = False
+    if "--merge" in sys.argv[1:]:
+        sys.exit( merge_journals([m for m in sys.argv[1:] if m != "--merge"]) )
+    for m in sys.argv[1:]:
+        if m[:8] == "--shard=":
+            shard = tuple(int(n) for n in m[8:].split("/"))
+            if len(shard) != 2 or not 1 <= shard[0] <= shard[1]:
+                print("Invalid shard " + m[8:] + ", expected <i>/<N> with 1 <= i <= N")
+                sys.exit(2)
+        elif m == "--resume":
+            resume = True
+        elif m[:7] == "--jobs=":
+            num_workers = int(m[7:])
+        elif m[:2] == "-j":
+            num_workers = int(m[2:])
+        elif m[:9] == "--repeat=":
+            repeat = int(m[9:])
+        elif m[:2] == "-r":
+            repeat = int(m[2:])
+        else:
+            assimp_bin_path = m
     setEnvVar("assimp_path", assimp_bin_path)
     print('Using assimp binary: ' + assimp_bin_path)
-    sys.exit( run_test() )
+    sys.exit( run_test(num_workers, repeat, shard, resume) )
 
 # vim: ai ts=4 sts=4 et sw=4
@@ -102,6 +102,20 @@ pp_configs_to_test = [
 # -------------------------------------------------------------------------------
 database_name = "db"
 
+# -------------------------------------------------------------------------------
+# Name of the index of the database, stored with the dumps. The dumps are
+# keyed by the content of the input files (see utils.db_key), the index
+# maps the paths of the input files to their keys.
+# -------------------------------------------------------------------------------
+database_index = "index.json"
+
+# -------------------------------------------------------------------------------
+# Size in bytes of the cache of dumps each worker of run.py keeps in memory
+# (see dumpdb.py). Files with the same content share their dumps, which are
+# then read once.
+# -------------------------------------------------------------------------------
+database_cache_size = 64 << 20
+
 # -------------------------------------------------------------------------------
 # List of directories to be processed. Paths are processed recursively.
 # -------------------------------------------------------------------------------
@@ -111,15 +125,23 @@ model_directories = [
 ]
 
 # -------------------------------------------------------------------------------
-# Remove the original database files after the ZIP has been built?
-# -------------------------------------------------------------------------------
-remove_old = True
-
-# -------------------------------------------------------------------------------
-# Bytes to skip at the beginning of a dump. This skips the file header, which
-# is currently the same 500 bytes header for both assbin, assxml and minidumps.
-# -------------------------------------------------------------------------------
-dump_header_skip = 500
+# Performance tracking (see perf_checker.py). run.py times each import once,
+# or perf_repeat times (-r<N> on the command line), and appends the samples
+# to the performance log. perf_checker.py pools the samples of the last
+# perf_history runs of each test: the runs recorded since the baseline on one
+# side, the runs stored as the baseline on the other. It fails if the median
+# wall time or peak memory use of a test grew by more than perf_threshold
+# (0.25 = +25%) compared to the baseline, and the growth is significant at
+# the perf_significance level (one-sided Mann-Whitney U test on the samples).
+# Tests faster than perf_min_time seconds in the baseline are too noisy to be
+# timed, only their memory use is checked. With fewer than 4 samples on each
+# side, no growth can be significant at the 0.05 level.
+# -------------------------------------------------------------------------------
+perf_repeat = 1
+perf_history = 5
+perf_threshold = 0.25
+perf_significance = 0.05
+perf_min_time = 0.05
 
 # -------------------------------------------------------------------------------
 # Directory to write all results and logs to. The dumps pertaining to failed
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+"""
+Tests of cmpdump.py on small binary dumps crafted in the assbin layout.
+
+Usage: python3 -m unittest test_cmpdump
+"""
+
+import struct
+import unittest
+import zlib
+
+import cmpdump
+from cmpdump import CHUNK_SCENE, CHUNK_NODE, CHUNK_MESH, HAS_POSITIONS
+
+IDENTITY = (1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+
+def chunk(magic, content):
+    return struct.pack("<II", magic, len(content)) + content
+
+def string(s):
+    return struct.pack("<I", len(s)) + s.encode("utf-8")
+
+def node(name, meshes):
+    return chunk(CHUNK_NODE, string(name) + struct.pack("<16f", *IDENTITY) +
+        struct.pack("<III", 0, len(meshes), 0) + struct.pack("<{0}I".format(len(meshes)), *meshes))
+
+def mesh(vertices, faces):
+    content = struct.pack("<6I", 4, len(vertices), len(faces), 0, 0, HAS_POSITIONS)
+    for vertex in vertices:
+        content += struct.pack("<3f", *vertex)
+    for face in faces:
+        content += struct.pack("<H{0}H".format(len(face)), len(face), *face)
+    return chunk(CHUNK_MESH, content)
+
+def dump(vertices, faces, name="root", compressed=False):
+    """ Full dump of a scene made of a root node and one mesh """
+    scene = chunk(CHUNK_SCENE, struct.pack("<7I", 0, 1, 0, 0, 0, 0, 0) +
+        node(name, [0]) + mesh(vertices, faces))
+    header = bytearray(cmpdump.HEADER_LENGTH)
+    struct.pack_into("<HH", header, 60, 0, compressed)
+    if compressed:
+        return bytes(header) + struct.pack("<I", len(scene)) + zlib.compress(scene)
+    return bytes(header) + scene
+
+VERTICES = [(0, 0, 0), (1, 0, 0), (0, 1, 0)]
+FACES = [(0, 1, 2)]
+
+class CompareDumpsTest(unittest.TestCase):
+
+    def assertMismatch(self, actual, expected, path):
+        mismatch = cmpdump.compare_dumps(actual, expected)
+        self.assertIsNotNone(mismatch)
+        self.assertEqual(mismatch.path, path)
+
+    def test_identical(self):
+        self.assertIsNone(cmpdump.compare_dumps(dump(VERTICES, FACES), dump(VERTICES, FACES)))
+
+    def test_compressed(self):
+        self.assertIsNone(cmpdump.compare_dumps(dump(VERTICES, FACES, compressed=True),
+            dump(VERTICES, FACES)))
+
+    def test_float_tolerance(self):
+        close = [(0, 0, 0), (1, 0.05, 0), (0, 1, 0)]
+        self.assertIsNone(cmpdump.compare_dumps(dump(close, FACES), dump(VERTICES, FACES)))
+
+    def test_vertex(self):
+        moved = [(0, 0, 0), (1, 1, 0), (0, 1, 0)]
+        self.assertMismatch(dump(moved, FACES), dump(VERTICES, FACES),
+            "scene / mesh 0 / vertices / index 1 / y")
+
+    def test_face(self):
+        self.assertMismatch(dump(VERTICES, [(0, 2, 1)]), dump(VERTICES, FACES),
+            "scene / mesh 0 / faces / index 0 / index 1 / index")
+
+    def test_count(self):
+        self.assertMismatch(dump(VERTICES, FACES + FACES), dump(VERTICES, FACES),
+            "scene / mesh 0 / numfaces")
+
+    def test_node_name(self):
+        self.assertMismatch(dump(VERTICES, FACES, name="node"), dump(VERTICES, FACES),
+            "scene / rootnode / name")
+
+    def test_truncated(self):
+        self.assertMismatch(dump(VERTICES, FACES)[:100], dump(VERTICES, FACES), "header")
+        self.assertMismatch(dump(VERTICES, FACES)[:-4], dump(VERTICES, FACES),
+            "scene / mesh 0 / faces / index 0 / index 1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+"""
+Tests of the database reader of dumpdb.py.
+
+Usage: python3 -m unittest test_dumpdb
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import dumpdb
+
+DUMPS = {"a": b"a" * 100, "b": b"b" * 100, "c": b"c" * 100, "failure": b""}
+
+class DatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.name = os.path.join(self.dir, "db")
+
+    def write_zip(self):
+        with zipfile.ZipFile(self.name + ".zip", "w", zipfile.ZIP_DEFLATED) as z:
+            for name, data in DUMPS.items():
+                z.writestr(name, data)
+
+    def write_directory(self):
+        os.mkdir(self.name)
+        for name, data in DUMPS.items():
+            with open(os.path.join(self.name, name), "wb") as f:
+                f.write(data)
+
+    def open(self, cache_size=250):
+        db = dumpdb.open_database(self.name, cache_size)
+        self.addCleanup(db.close)
+        return db
+
+    def check_content(self, db):
+        self.assertEqual(db.names(), set(DUMPS))
+        for name, data in DUMPS.items():
+            self.assertEqual(bytes(db.read(name)), data)
+
+    def test_missing(self):
+        self.assertIsNone(dumpdb.open_database(self.name))
+
+    def test_zip(self):
+        self.write_zip()
+        db = self.open()
+        self.assertIsInstance(db.store, dumpdb.ZipStore)
+        self.check_content(db)
+
+    def test_directory(self):
+        self.write_directory()
+        db = self.open()
+        self.assertIsInstance(db.store, dumpdb.DirectoryStore)
+        self.check_content(db)
+
+    def test_zip_first(self):
+        self.write_zip()
+        self.write_directory()
+        self.assertIsInstance(self.open().store, dumpdb.ZipStore)
+
+    def test_lru(self):
+        self.write_zip()
+        db = self.open()
+        db.read("a")
+        db.read("b")
+        db.read("a")
+        # 'b' is the least recently used when 'c' does not fit
+        db.read("c")
+        self.assertEqual(list(db.cache), ["a", "c"])
+        self.assertEqual(db.cached_bytes, 200)
+        self.assertEqual((db.hits, db.misses), (1, 3))
+
+    def test_too_big(self):
+        self.write_zip()
+        db = self.open(cache_size=50)
+        self.assertEqual(db.read("a"), DUMPS["a"])
+        self.assertEqual(len(db.cache), 0)
+
+    def test_prefetch(self):
+        self.write_zip()
+        db = self.open()
+        db.prefetch("b")
+        db.prefetch("b")
+        self.assertEqual(list(db.pending), ["b"])
+        self.assertEqual(db.read("b"), DUMPS["b"])
+        self.assertEqual(db.pending, {})
+        self.assertIn("b", db.cache)
+
+if __name__ == "__main__":
+    unittest.main()
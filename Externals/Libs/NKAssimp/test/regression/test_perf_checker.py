@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- Coding: UTF-8 -*-
+
+"""
+Tests of the statistics of perf_checker.py.
+
+Usage: python3 -m unittest test_perf_checker
+"""
+
+import itertools
+import unittest
+
+import perf_checker
+
+def permutation_p(x, y):
+    """ p-value of the one-sided U test by enumerating all the ways to
+    split the samples, which also holds with ties """
+    values = x + y
+    def u(sample, other):
+        return sum(1. if a > b else 0.5 if a == b else 0. for a in sample for b in other)
+    observed = u(x, y)
+    splits = list(itertools.combinations(range(len(values)), len(x)))
+    larger = 0
+    for split in splits:
+        sample = [values[i] for i in split]
+        other = [values[i] for i in range(len(values)) if i not in split]
+        larger += u(sample, other) >= observed
+    return float(larger) / len(splits)
+
+class MannWhitneyTest(unittest.TestCase):
+
+    def test_u_distribution(self):
+        self.assertEqual(perf_checker.u_distribution(2, 2), [1, 1, 2, 1, 1])
+        self.assertEqual(sum(perf_checker.u_distribution(5, 5)), 252)
+
+    def test_min_p_value(self):
+        self.assertAlmostEqual(perf_checker.min_p_value(5, 5), 1. / 252)
+        self.assertAlmostEqual(perf_checker.min_p_value(3, 3), 0.05)
+        self.assertAlmostEqual(perf_checker.min_p_value(1, 5), 1. / 6)
+
+    def test_exact(self):
+        low, high = [1., 2., 3., 4., 5.], [6., 7., 8., 9., 10.]
+        self.assertAlmostEqual(perf_checker.mann_whitney_p(high, low), 1. / 252)
+        self.assertAlmostEqual(perf_checker.mann_whitney_p(low, high), 1.)
+
+        x, y = [1.5, 3.5, 6., 7.], [1., 2., 3., 4., 5.]
+        self.assertAlmostEqual(perf_checker.mann_whitney_p(x, y), permutation_p(x, y))
+
+    def test_normal_approximation(self):
+        # more than 40 samples: compared with the exact distribution
+        x = [i + 0.5 for i in range(3, 25)]
+        y = [float(i) for i in range(0, 22)]
+        dist = perf_checker.u_distribution(len(x), len(y))
+        u = sum(1 for a in x for b in y if a > b)
+        exact = float(sum(dist[u:])) / sum(dist)
+        self.assertAlmostEqual(perf_checker.mann_whitney_p(x, y), exact, delta=0.01)
+
+    def test_ties(self):
+        # U = 20, tie-corrected variance 25/12 * (11 - 84/90), with
+        # continuity correction: z = 1.528
+        x, y = [2., 3., 3., 4., 5.], [1., 2., 2., 3., 3.]
+        self.assertAlmostEqual(perf_checker.mann_whitney_p(x, y), 0.0632, places=3)
+        self.assertAlmostEqual(perf_checker.mann_whitney_p([1.] * 5, [1.] * 5), 1.)
+
+class CheckCaseTest(unittest.TestCase):
+
+    def baseline(self, samples):
+        return {"wall": [1. + 0.01 * i for i in range(samples)], "rss": [100.] * samples}
+
+    def test_regression(self):
+        current = {"wall": [2. + 0.01 * i for i in range(5)], "rss": [100.] * 5}
+        [(regressed, description)] = perf_checker.check_case(current, self.baseline(5))
+        self.assertTrue(regressed)
+        self.assertIn("wall time", description)
+
+    def test_not_significant(self):
+        current = {"wall": [2.], "rss": [100.]}
+        [(regressed, description)] = perf_checker.check_case(current, self.baseline(5))
+        self.assertFalse(regressed)
+
+    def test_within_threshold(self):
+        current = {"wall": [1.1 + 0.01 * i for i in range(5)], "rss": [110.] * 5}
+        self.assertEqual(perf_checker.check_case(current, self.baseline(5)), [])
+
+class PoolRunsTest(unittest.TestCase):
+
+    def runs(self, count, jobs=1):
+        return [{"a": {"run": "r%d" % i, "key": "a", "wall": [float(i)], "rss": [100.],
+                       "size": 10 + i, "returncode": 0, "jobs": jobs}}
+                for i in range(count)]
+
+    def test_last_runs(self):
+        pooled = perf_checker.pool_runs(self.runs(8))["a"]
+        self.assertEqual(pooled["wall"], [7., 6., 5., 4., 3.])
+        self.assertEqual(pooled["runs"], ["r7", "r6", "r5", "r4", "r3"])
+        self.assertEqual(pooled["size"], 17)
+
+    def test_since_baseline(self):
+        baseline = {"a": {"runs": ["r3", "r2"]}}
+        pooled = perf_checker.pool_runs(self.runs(6), baseline)["a"]
+        self.assertEqual(pooled["wall"], [5., 4.])
+
+    def test_same_workers(self):
+        runs = self.runs(3, jobs=4) + self.runs(2, jobs=1)[1:] + [self.runs(4, jobs=4)[3]]
+        self.assertEqual(perf_checker.pool_runs(runs)["a"]["wall"], [3., 2., 1., 0.])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,6 +42,12 @@
 
 """Shared stuff for the gen_db and run scripts"""
 
+import os
+import json
+import hashlib
+
+import settings
+
 # -------------------------------------------------------------------------------
 def hashing(file,pp):
     """ Map an input file and a postprocessing config to an unique hash.
@@ -58,5 +64,106 @@ def hashing(file,pp):
         res = (ord(t) + (res<<6) + (res<<16) - res) % 2**32
     return '{:x}'.format(res)
 
+# -------------------------------------------------------------------------------
+def normalize_path(file):
+    """ Path of an input file as stored in the database index """
+    return file.replace('\\','/')
+
+# -------------------------------------------------------------------------------
+def dump_dir_name(file, key):
+    """ Name of the directory receiving the dumps of an input file for the
+    database entry 'key': the path of the file, flattened, and the key.
+    Files with the same name and content in different directories share
+    their key, but not their dump directory. """
+    parts = [p for p in normalize_path(file).split('/') if p not in ('', '.', '..')]
+    return "_".join(parts) + "_" + key
+
+# -------------------------------------------------------------------------------
+_content_hashes = {}
+
+def content_hash(file):
+    """ SHA-256 of the content of an input file (memoized while the file
+    is not modified) """
+    stat = os.stat(file)
+    cached = _content_hashes.get(file)
+    if cached and cached[0] == (stat.st_mtime, stat.st_size):
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    _content_hashes[file] = ((stat.st_mtime, stat.st_size), digest.hexdigest())
+    return digest.hexdigest()
+
+# -------------------------------------------------------------------------------
+def db_key(file, pp):
+    """ Map an input file and a postprocessing config to the key of its
+    dump in the database.
+
+    The key only depends on the content of the file, not on its path: a
+    moved or renamed file keeps its dump, a modified file gets a new key.
+    """
+    return hashlib.sha256((content_hash(file) + ":" + pp).encode("utf-8")).hexdigest()
+
+# -------------------------------------------------------------------------------
+def shard_of(key, count):
+    """ Shard (1 to count) of the job of a database key. Only depends on
+    the key, so that all machines agree on the shards of a run. """
+    return int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) % count + 1
+
+# -------------------------------------------------------------------------------
+def load_index(data):
+    """ Parse the database index, which maps the path of each input file to
+    the hash of its content and to the keys of its dumps, by pp config:
+
+    {"files": {path: {"hash": content hash, "dumps": {pp: key}}}}
+    """
+    index = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+    index.setdefault("files", {})
+    return index
+
+# -------------------------------------------------------------------------------
+def empty_index():
+    return {"files": {}}
+
+# -------------------------------------------------------------------------------
+def dump_index(index):
+    return json.dumps(index, indent=1, sort_keys=True)
+
+# -------------------------------------------------------------------------------
+def add_to_index(index, file, pp, key):
+    """ Record that the dump of 'file' for 'pp' is stored as 'key'.
+    Returns the key previously recorded for them, if any. """
+    entry = index["files"].setdefault(normalize_path(file), {"hash": None, "dumps": {}})
+    entry["hash"] = content_hash(file)
+    previous = entry["dumps"].get(pp)
+    entry["dumps"][pp] = key
+    return previous
+
+# -------------------------------------------------------------------------------
+def find_reference(file, pp, entries, index):
+    """ Find the reference dump of 'file' for 'pp' among the database
+    'entries'.
+
+    Returns (key, outdated): key is None if the database has no dump for
+    the file. Otherwise, outdated is True if the file was modified since
+    its dump was generated, in which case key is the outdated dump.
+    Databases generated before content keys (see hashing()) are still
+    looked up by path.
+    """
+    key = db_key(file, pp)
+    if key in entries:
+        return key, False
+
+    legacy = hashing(file, pp)
+    if legacy in entries:
+        return legacy, False
+
+    previous = index["files"].get(normalize_path(file), {}).get("dumps", {}).get(pp)
+    if previous in entries:
+        return previous, True
+    return None, False
+
 
  # vim: ai ts=4 sts=4 et sw=4
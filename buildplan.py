@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+buildplan.py — Planification du build des modules Nkentseu (chemin critique)
+=============================================================================
+Lit le DAG des modules de nkentseu_modules.json (via nkregistry.py) et les
+durées de compilation mesurées de chaque module, puis calcule un
+ordonnancement pour N workers :
+
+  • chaque module ne démarre qu'une fois toutes ses dépendances bâties ;
+  • parmi les modules prêts, le plus prioritaire est celui dont le plus long
+    chemin jusqu'à la fin du build (sa durée comprise) est le plus long
+    (« critical path first ») ;
+  • le rapport donne la durée minimale théorique du build
+    (max(chemin critique, somme des durées / N)), la durée de
+    l'ordonnancement obtenu et les modules du chemin critique, ceux qui
+    sérialisent le build (ex: logger → filesystem).
+
+Usage :
+    python3 buildplan.py [-j N] [--times durees.json] [--output plan.json]
+
+    -j N / --jobs=N    nombre de workers (défaut : nombre de CPU)
+    --times FICHIER    durées de compilation mesurées, en secondes :
+                       {"NKCore": 12.5, "logger": 30.1, ...}
+                       clés : nom de projet Jenga ou clé courte du registre.
+                       Un module sans durée reçoit la moyenne des durées
+                       connues (1 s si aucune n'est connue).
+    --output FICHIER   écrit le plan en JSON pour le build Jenga :
+                       {"workers": N, "makespan": s, "lower_bound": s,
+                        "critical_path": [projets...],
+                        "order": [projets dans l'ordre de démarrage],
+                        "schedule": [{"project", "module", "worker",
+                                      "start", "end"}, ...]}
+                       "order" est un ordre topologique des projets.
+
+Écrit sous le nom PLAN_FILE (nkentseu_buildplan.json) à la racine du
+workspace, le plan est suivi par Nkentseu.jenga : les projets y sont inclus
+dans l'ordre de "order" (voir include_order()). Sans ce fichier, l'ordre
+d'inclusion écrit dans Nkentseu.jenga est conservé.
+"""
+
+import os
+import re
+import sys
+import json
+import heapq
+import multiprocessing
+
+_WORKSPACE_ROOT = os.path.dirname(os.path.abspath(__file__))
+if _WORKSPACE_ROOT not in sys.path:
+    sys.path.insert(0, _WORKSPACE_ROOT)
+
+from nkregistry import _REGISTRY, _ORDER                   # noqa: E402
+
+# Plan suivi par Nkentseu.jenga, à la racine du workspace
+PLAN_FILE = "nkentseu_buildplan.json"
+
+# =============================================================================
+# SECTION 1 : MODULES ET PROJETS
+# =============================================================================
+
+def _modules() -> list:
+    """
+    Clés du registre dans l'ordre topologique, sans les alias : "engine"
+    partage le préfixe d'export de "nkentseu", c'est le même projet.
+    """
+    seen: set = set()
+    modules: list = []
+    for key in _ORDER:
+        prefix = _REGISTRY[key][0]
+        if prefix not in seen:
+            seen.add(prefix)
+            modules.append(key)
+    return modules
+
+
+def _canonical(key: str) -> str:
+    """Clé non-alias du projet de `key`."""
+    prefix = _REGISTRY[key][0]
+    return next(k for k in _ORDER if _REGISTRY[k][0] == prefix)
+
+
+_ANY_PROJECT_RE = re.compile(r'with\s+project\(\s*"([^"]+)"\s*\)')
+_PROJECT_RE = re.compile(
+    r'with\s+project\(\s*"([^"]+)"\s*\)\s*:(?:(?!with\s+project\().)*?useglobalkind\(\s*"([^"]+)"\s*\)',
+    re.S,
+)
+
+
+def project_names(root: str = _WORKSPACE_ROOT) -> dict:
+    """
+    Clé courte → nom du projet Jenga, lu dans les .jenga qui appellent
+    useglobalkind() (ex: "filesystem" → "NKFileSystem"), sinon le projet
+    nommé comme la clé (ex: "nkentseu" → "Nkentseu"). Les autres clés
+    gardent leur nom de clé.
+    """
+    names: dict = {}
+    projects: dict = {}
+    for base in ("Modules", "Engine"):
+        for dirpath, _, filenames in os.walk(os.path.join(root, base)):
+            for filename in filenames:
+                if not filename.endswith(".jenga"):
+                    continue
+                with open(os.path.join(dirpath, filename), encoding="utf-8", errors="replace") as f:
+                    content = f.read()
+                for project, key in _PROJECT_RE.findall(content):
+                    key = key.strip().lower()
+                    if key in _REGISTRY:
+                        names.setdefault(_canonical(key), project)
+                for project in _ANY_PROJECT_RE.findall(content):
+                    projects.setdefault(project.lower(), project)
+    return {key: names.get(key) or projects.get(key) or projects.get("nk" + key, key)
+            for key in _modules()}
+
+
+def load_times(filename: str, names: dict) -> dict:
+    """Durées (s) par clé courte, depuis un JSON indexé par projet ou par clé."""
+    with open(filename, encoding="utf-8") as f:
+        recorded = json.load(f)
+    by_name = {name.lower(): key for key, name in names.items()}
+    times: dict = {}
+    for name, seconds in recorded.items():
+        key = name.strip().lower()
+        if key in _REGISTRY:
+            key = _canonical(key)
+        elif key in by_name:
+            key = by_name[key]
+        else:
+            print(f"[buildplan] durée ignorée, module inconnu : {name}", file=sys.stderr)
+            continue
+        times[key] = float(seconds)
+    return times
+
+# =============================================================================
+# SECTION 2 : CHEMIN CRITIQUE ET ORDONNANCEMENT
+# =============================================================================
+
+def plan(workers: int, times: dict = None) -> dict:
+    """
+    Ordonnancement « chemin critique d'abord » des modules sur `workers`
+    workers. `times` : durée (s) par clé courte, les modules absents
+    reçoivent la moyenne des durées connues.
+
+    Retourne le dictionnaire décrit dans la documentation du fichier, avec
+    des clés courtes à la place des noms de projets.
+    """
+    modules = _modules()
+    times = dict(times or {})
+    default = sum(times.values()) / len(times) if times else 1.0
+    duration = {key: times.get(key, default) for key in modules}
+    deps = {key: {_canonical(d) for d in _REGISTRY[key][1]} - {key} for key in modules}
+    dependents: dict = {key: [] for key in modules}
+    for key in modules:
+        for dep in deps[key]:
+            dependents[dep].append(key)
+
+    # plus long chemin de chaque module jusqu'à la fin du build, sa durée comprise
+    tail: dict = {}
+    for key in reversed(modules):
+        tail[key] = duration[key] + max((tail[d] for d in dependents[key]), default=0.0)
+
+    rank = {key: i for i, key in enumerate(modules)}
+    critical = [max(modules, key=lambda k: (tail[k], -rank[k]))]
+    while dependents[critical[-1]]:
+        critical.append(max(dependents[critical[-1]], key=lambda k: (tail[k], -rank[k])))
+
+    # simulation : les modules prêts partent par priorité décroissante
+    waiting = {key: len(deps[key]) for key in modules}
+    ready = [(-tail[k], rank[k], k) for k in modules if not waiting[k]]
+    heapq.heapify(ready)
+    free = list(range(workers))
+    running: list = []          # (fin, worker, clé)
+    now = 0.0
+    schedule: list = []
+    while ready or running:
+        while ready and free:
+            _, _, key = heapq.heappop(ready)
+            worker = free.pop(0)
+            schedule.append({"module": key, "worker": worker,
+                             "start": now, "end": now + duration[key]})
+            heapq.heappush(running, (now + duration[key], worker, key))
+        now, worker, key = heapq.heappop(running)
+        finished = [(worker, key)]
+        while running and running[0][0] == now:
+            finished.append(heapq.heappop(running)[1:])
+        for worker, key in finished:
+            free.append(worker)
+            for dependent in dependents[key]:
+                waiting[dependent] -= 1
+                if not waiting[dependent]:
+                    heapq.heappush(ready, (-tail[dependent], rank[dependent], dependent))
+        free.sort()
+
+    return {
+        "workers": workers,
+        "makespan": max((s["end"] for s in schedule), default=0.0),
+        "lower_bound": max(tail[critical[0]], sum(duration.values()) / workers),
+        "critical_path": critical,
+        "order": [s["module"] for s in schedule],
+        "schedule": schedule,
+    }
+
+# =============================================================================
+# SECTION 3 : ORDRE D'INCLUSION DU WORKSPACE
+# =============================================================================
+
+def include_order(paths: list, plan_file: str = None) -> list:
+    """
+    Chemins des .jenga de `paths` dans l'ordre de démarrage du plan
+    `plan_file` (défaut : PLAN_FILE à la racine du workspace), ou `paths`
+    tel quel si le plan n'existe pas.
+
+    Le projet d'un chemin est le nom du fichier sans .jenga (ex:
+    "Modules/System/NKLogger/NKLogger.jenga" → "NKLogger"). Les chemins
+    dont le projet n'est pas dans le plan (externes, applications, sandbox)
+    gardent leur place ; ceux du plan occupent les places restantes dans
+    l'ordre de "order".
+    """
+    if plan_file is None:
+        plan_file = os.path.join(_WORKSPACE_ROOT, PLAN_FILE)
+    if not os.path.isfile(plan_file):
+        return list(paths)
+    with open(plan_file, encoding="utf-8") as f:
+        rank = {project: i for i, project in enumerate(json.load(f)["order"])}
+
+    def project(path: str) -> str:
+        return os.path.splitext(os.path.basename(path))[0]
+
+    planned = iter(sorted((p for p in paths if project(p) in rank), key=lambda p: rank[project(p)]))
+    return [next(planned) if project(p) in rank else p for p in paths]
+
+# =============================================================================
+# SECTION 4 : LIGNE DE COMMANDE
+# =============================================================================
+
+def main(argv: list) -> int:
+    workers = multiprocessing.cpu_count()
+    times_file = None
+    output = None
+    args = iter(argv)
+    for arg in args:
+        if arg[:7] == "--jobs=":
+            workers = int(arg[7:])
+        elif arg == "-j":
+            workers = int(next(args))
+        elif arg[:2] == "-j":
+            workers = int(arg[2:])
+        elif arg == "--times":
+            times_file = next(args)
+        elif arg == "--output":
+            output = next(args)
+        elif arg in ("-h", "--help"):
+            print(__doc__)
+            return 0
+        else:
+            print(f"[buildplan] argument inconnu : {arg}", file=sys.stderr)
+            return 2
+    if workers < 1:
+        print("[buildplan] il faut au moins un worker", file=sys.stderr)
+        return 2
+
+    names = project_names()
+    times = load_times(times_file, names) if times_file else {}
+    missing = [names[k] for k in _modules() if k not in times]
+    result = plan(workers, times)
+
+    print(f"Plan de build pour {workers} workers, {len(result['schedule'])} modules")
+    if missing and times_file:
+        print(f"  sans durée mesurée (moyenne utilisée) : {', '.join(missing)}")
+    print(f"  durée minimale théorique : {result['lower_bound']:.1f}s")
+    print(f"  durée du plan            : {result['makespan']:.1f}s")
+    print("  chemin critique          : " + " → ".join(names[k] for k in result["critical_path"]))
+    print()
+    for s in result["schedule"]:
+        print(f"  [{s['worker']:2d}] {s['start']:8.1f}s → {s['end']:8.1f}s  {names[s['module']]}")
+
+    if output:
+        for s in result["schedule"]:
+            s["project"] = names[s["module"]]
+        result["critical_path"] = [names[k] for k in result["critical_path"]]
+        result["order"] = [names[k] for k in result["order"]]
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nPlan écrit dans {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
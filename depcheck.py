@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+depcheck.py — Confronte le registre (nkentseu_modules.json) aux #include
+=============================================================================
+Lit les #include des sources de chaque module (Modules/<couche>/<NKXxx>/src)
+et les compare aux dépendances déclarées dans le registre. Pour chaque module,
+le rapport donne :
+
+  • redondantes : dépendances déclarées déjà impliquées par une autre
+                  dépendance déclarée (réduction transitive du registre),
+                  ex: "renderer" liste "core" alors que "rhi" l'implique ;
+  • inutilisées : dépendances déclarées qu'aucun #include n'atteint, ni
+                  directement ni via les en-têtes des modules inclus ;
+  • non déclarées : modules inclus directement mais absents de la fermeture
+                  transitive déclarée (include path / define manquant) ;
+  • proposition : la liste minimale de dépendances directes qui couvre les
+                  #include réels.
+
+Usage :
+    python3 depcheck.py [--json rapport.json]
+
+Code de retour : 1 si un module inclut un module non déclaré, 0 sinon.
+"""
+
+import os
+import re
+import sys
+import json
+
+_WORKSPACE_ROOT = os.path.dirname(os.path.abspath(__file__))
+if _WORKSPACE_ROOT not in sys.path:
+    sys.path.insert(0, _WORKSPACE_ROOT)
+
+from nkregistry import _REGISTRY, _BIT, _DEPS_MASK         # noqa: E402
+from buildplan import project_names, _canonical, _modules  # noqa: E402
+
+_INCLUDE_RE = re.compile(r'^\s*#\s*include\s*[<"]([^">]+)[">]', re.M)
+_SOURCE_EXTENSIONS = (".h", ".hpp", ".inl", ".c", ".cc", ".cpp", ".m", ".mm")
+
+# =============================================================================
+# SECTION 1 : GRAPHE DES #include
+# =============================================================================
+
+def source_dirs(names: dict, root: str = _WORKSPACE_ROOT) -> dict:
+    """Clé courte → répertoire src du module (Modules/<couche>/<projet>/src)."""
+    by_project = {name.lower(): key for key, name in names.items()}
+    dirs: dict = {}
+    modules_root = os.path.join(root, "Modules")
+    for layer in sorted(os.listdir(modules_root)):
+        layer_dir = os.path.join(modules_root, layer)
+        if not os.path.isdir(layer_dir):
+            continue
+        for project in sorted(os.listdir(layer_dir)):
+            src = os.path.join(layer_dir, project, "src")
+            key = by_project.get(project.lower())
+            if key and os.path.isdir(src):
+                dirs[key] = src
+    return dirs
+
+
+def included_modules(src: str, by_project: dict) -> dict:
+    """
+    Modules inclus par les sources de `src` : clé courte → premier fichier
+    qui l'inclut. Un #include "NKCore/NkTypes.h" désigne le module du projet
+    NKCore ; les autres (système, tiers, chemins relatifs) sont ignorés.
+    """
+    found: dict = {}
+    for dirpath, _, filenames in os.walk(src):
+        for filename in sorted(filenames):
+            if not filename.endswith(_SOURCE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for include in _INCLUDE_RE.findall(f.read()):
+                    head = include.replace("\\", "/").split("/")[0].lower()
+                    key = by_project.get(head)
+                    if key:
+                        found.setdefault(key, os.path.relpath(path, _WORKSPACE_ROOT))
+    return found
+
+# =============================================================================
+# SECTION 2 : ANALYSE
+# =============================================================================
+
+def _closure(key: str) -> set:
+    """Fermeture transitive déclarée de `key`, sans `key`."""
+    mask = _DEPS_MASK[key]
+    return {_canonical(k) for k, bit in _BIT.items() if mask >> bit & 1} - {key}
+
+
+def _reduce(keys: set) -> list:
+    """`keys` sans celles qu'implique une autre clé de `keys`, dans l'ordre du registre."""
+    return [k for k in _modules() if k in keys and not any(k in _closure(o) for o in keys if o != k)]
+
+
+def analyze(root: str = _WORKSPACE_ROOT) -> dict:
+    """Rapport par clé courte (voir la documentation du fichier)."""
+    names = project_names(root)
+    by_project = {name.lower(): key for key, name in names.items()}
+    dirs = source_dirs(names, root)
+    used = {key: included_modules(src, by_project) for key, src in dirs.items()}
+    for key in used:
+        used[key].pop(key, None)    # un module inclut ses propres en-têtes
+
+    # modules réellement atteints par les #include, de proche en proche
+    reached: dict = {}
+    def reach(key: str) -> set:
+        if key not in reached:
+            reached[key] = set()
+            for dep in used.get(key, ()):
+                reached[key] |= {dep} | reach(dep)
+            reached[key].discard(key)
+        return reached[key]
+
+    report: dict = {}
+    for key in _modules():
+        declared = {_canonical(d) for d in _REGISTRY[key][1]} - {key}
+        entry = {
+            "project": names[key],
+            "declared": [k for k in _modules() if k in declared],
+            "redundant": [k for k in _modules() if k in declared and k not in _reduce(declared)],
+        }
+        if key in dirs:
+            closure = _closure(key)
+            entry["unused"] = [k for k in _modules() if k in declared and k not in reach(key)]
+            entry["undeclared"] = {k: used[key][k] for k in _modules() if k in used[key] and k not in closure}
+            entry["proposed"] = _reduce(set(used[key]))
+        report[key] = entry
+    return report
+
+# =============================================================================
+# SECTION 3 : LIGNE DE COMMANDE
+# =============================================================================
+
+def main(argv: list) -> int:
+    output = None
+    args = iter(argv)
+    for arg in args:
+        if arg == "--json":
+            output = next(args)
+        elif arg in ("-h", "--help"):
+            print(__doc__)
+            return 0
+        else:
+            print(f"[depcheck] argument inconnu : {arg}", file=sys.stderr)
+            return 2
+
+    report = analyze()
+    edges = sum(len(e["declared"]) for e in report.values())
+    redundant = sum(len(e["redundant"]) for e in report.values())
+    unused = sum(len(e.get("unused", ())) for e in report.values())
+    undeclared = sum(len(e.get("undeclared", ())) for e in report.values())
+
+    for key, entry in report.items():
+        print(f"{entry['project']} ({key})")
+        if "proposed" not in entry:
+            print("  pas de sources sous Modules/, seul le registre est analysé")
+        if entry["redundant"]:
+            print("  redondantes   : " + ", ".join(entry["redundant"]))
+        if entry.get("unused"):
+            print("  inutilisées   : " + ", ".join(entry["unused"]))
+        for dep, where in entry.get("undeclared", {}).items():
+            print(f"  NON DÉCLARÉE  : {dep} (inclus par {where})")
+        if "proposed" in entry and entry["proposed"] != entry["declared"]:
+            print("  proposition   : [" + ", ".join(f'"{k}"' for k in entry["proposed"]) + "]")
+
+    print()
+    print(f"{edges} dépendances déclarées : {redundant} redondantes, "
+          f"{unused} inutilisées, {undeclared} inclusions non déclarées")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Rapport écrit dans {output}")
+    return 1 if undeclared else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nkregistry.py — Registre des modules Nkentseu et helpers du build
+=================================================================
+Le registre (clé courte → préfixe d'export, dépendances directes), le kind
+global et les kinds par module sont décrits UNE seule fois, dans
+nkentseu_modules.json. Ce fichier le charge une fois par processus Jenga
+(load_registry(), mis en cache), précalcule la fermeture transitive de
+chaque module et fournit les helpers des .jenga :
+
+    useglobalkind(modulename)   kind + macro d'export + defines des deps
+    useappdeps(*modulekeys)     defines des modules consommés par une app
+    setmodulekind(module, kind) dérogation au kind global
+
+config.py et nkentseuconfig.py ne sont que des points d'entrée qui
+réexportent ces helpers. Ce fichier s'importe sans Jenga (buildplan.py,
+depcheck.py) : seuls useglobalkind(), useappdeps() et setmodulekind() ont
+besoin du runtime Jenga.
+
+Format de nkentseu_modules.json :
+    "global_kind"  : "STATIC_LIB" ou "SHARED_LIB"
+    "module_kinds" : clé courte → kind, pour les modules qui dérogent
+    "layers"       : couche → clé courte →
+                         {"export": "NKENTSEU_XXXXX", "deps": [clés directes]}
+                     ou  {"alias": "autre_clé"} (même projet, ex: "engine")
+                     Les couches ne servent qu'à la lecture du fichier.
+
+Les modules listés (séparés par des virgules) dans la variable
+d'environnement NKENTSEU_SHARED_MODULES sont bâtis en SHARED_LIB sans
+modifier le fichier :
+    NKENTSEU_SHARED_MODULES=renderer,ui jenga build
+"""
+
+import os
+import json
+import functools
+
+try:
+    from Jenga import ProjectKind, kindexport, defines
+except ImportError:
+    pass  # Résolu à l'exécution par le runtime Jenga
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nkentseu_modules.json")
+
+_KINDS = ("STATIC_LIB", "SHARED_LIB")
+
+# =============================================================================
+# SECTION 1 : CHARGEMENT ET FERMETURE TRANSITIVE
+# =============================================================================
+# Calculé une seule fois par fichier de registre, au premier load_registry() :
+#
+#   order        : ordre topologique du registre (dépendances d'abord,
+#                  puis ordre de déclaration)
+#   bit          : clé → rang dans order (bit de la clé dans les masques)
+#   deps_mask    : clé → masque (int) de ses dépendances transitives,
+#                  bit i ↔ order[i], sans la clé elle-même
+#   static_mask  : masque des modules bâtis en STATIC_LIB, recalculé par
+#                  set_kind()
+#   _defines     : masque de modules statiques → leurs defines
+#                  NKENTSEU_XXXXX_STATIC_LIB triés. Les defines d'un module
+#                  ne dépendent que de ses dépendances statiques : une
+#                  entrée sert à tous les (module, kinds) qui y mènent.
+#
+# Une dépendance inconnue, un cycle, un alias ou un kind invalide, ou un
+# module inconnu dans module_kinds / NKENTSEU_SHARED_MODULES, lève une
+# ValueError au chargement, au lieu d'être ignoré en silence.
+# =============================================================================
+
+def _topological_order(registry: dict) -> list:
+    """
+    Ordre topologique de `registry` : chaque clé après ses dépendances,
+    les clés indépendantes dans l'ordre de déclaration.
+
+    Lève ValueError en listant toutes les dépendances inconnues, ou le
+    premier cycle trouvé (ex: "rhi → renderer → rhi").
+    """
+    unknown = [
+        f"{key} → {dep}"
+        for key, (_, deps) in registry.items()
+        for dep in deps
+        if dep not in registry
+    ]
+    if unknown:
+        raise ValueError(
+            "[nkregistry] dépendances inconnues : " + ", ".join(unknown)
+        )
+
+    order: list = []
+    done: set = set()
+    path: list = []          # pile DFS courante, pour nommer un cycle
+
+    def visit(key: str) -> None:
+        if key in done:
+            return
+        if key in path:
+            cycle = path[path.index(key):] + [key]
+            raise ValueError(
+                "[nkregistry] dépendance cyclique : " + " → ".join(cycle)
+            )
+        path.append(key)
+        for dep in registry[key][1]:
+            visit(dep)
+        path.pop()
+        done.add(key)
+        order.append(key)
+
+    for key in registry:
+        visit(key)
+    return order
+
+
+def _check_kind(kind: str, where: str) -> str:
+    if kind not in _KINDS:
+        raise ValueError(
+            f"[nkregistry] {where} : kind inconnu '{kind}' (attendu : {', '.join(_KINDS)})"
+        )
+    return kind
+
+
+class Registry:
+    """
+    Registre chargé depuis un fichier JSON (voir la documentation du
+    fichier), avec ses tables de fermeture transitive. Les kinds sont les
+    noms des membres de ProjectKind ("STATIC_LIB" / "SHARED_LIB").
+    """
+
+    def __init__(self, data: dict, shared_modules: str = ""):
+        modules: dict = {}
+        for layer in data["layers"].values():
+            modules.update(layer)
+
+        # clé → (préfixe_export, [dépendances_directes]), les alias
+        # reprennent l'entrée de leur cible
+        self.modules: dict = {}
+        for key, entry in modules.items():
+            target = modules.get(entry.get("alias", key))
+            if target is None or "alias" in target:
+                raise ValueError(
+                    f"[nkregistry] alias '{key}' → '{entry['alias']}' : cible inconnue"
+                )
+            self.modules[key] = (target["export"], list(target["deps"]))
+
+        self.order: list = _topological_order(self.modules)
+        self.bit: dict = {key: bit for bit, key in enumerate(self.order)}
+        self.deps_mask: dict = {}
+        for key in self.order:      # les dépendances de key sont déjà calculées
+            self.deps_mask[key] = 0
+            for dep in self.modules[key][1]:
+                self.deps_mask[key] |= (1 << self.bit[dep]) | self.deps_mask[dep]
+
+        self.global_kind: str = _check_kind(data.get("global_kind", "STATIC_LIB"), "global_kind")
+        kinds = {
+            key: _check_kind(kind, f"module_kinds['{key}']")
+            for key, kind in data.get("module_kinds", {}).items()
+        }
+        for name in shared_modules.split(","):
+            if name.strip():
+                kinds[name.strip().lower()] = "SHARED_LIB"
+        unknown = sorted(set(kinds) - set(self.modules))
+        if unknown:
+            raise ValueError(
+                "[nkregistry] module_kinds / NKENTSEU_SHARED_MODULES : modules inconnus : "
+                + ", ".join(unknown)
+            )
+
+        self.kinds: dict = {}
+        self.static_mask: int = 0
+        self._defines: dict = {}
+        for key, kind in kinds.items():
+            self.set_kind(key, kind)
+        self._update_static_mask()
+        for key in self.order:      # defines de chaque module, pré-triés
+            self.static_defines(self.deps_mask[key])
+
+    def lookup(self, modulename: str, caller: str) -> str:
+        """Clé normalisée de `modulename`, KeyError si absente du registre."""
+        key = modulename.strip().lower()
+        if key not in self.modules:
+            raise KeyError(
+                f"[nkregistry] {caller} : module inconnu '{modulename}'.\n"
+                f"  Clés disponibles : {sorted(self.modules.keys())}"
+            )
+        return key
+
+    def kind(self, key: str) -> str:
+        """Kind de `key` : sa dérogation, sinon le kind global."""
+        return self.kinds.get(key, self.global_kind)
+
+    def set_kind(self, key: str, kind: str) -> None:
+        """Fait déroger `key` et ses alias (même projet) au kind global."""
+        for alias, (prefix, _) in self.modules.items():
+            if prefix == self.modules[key][0]:
+                self.kinds[alias] = kind
+        self._update_static_mask()
+
+    def _update_static_mask(self) -> None:
+        self.static_mask = 0
+        for key in self.order:
+            if self.kind(key) == "STATIC_LIB":
+                self.static_mask |= 1 << self.bit[key]
+
+    def closure(self, key: str) -> set:
+        """Dépendances transitives de `key`, sans `key`."""
+        mask = self.deps_mask[key]
+        return {k for k, bit in self.bit.items() if mask >> bit & 1}
+
+    def static_defines(self, mask: int) -> list:
+        """
+        Defines NKENTSEU_XXXXX_STATIC_LIB triés des modules statiques de
+        `mask`, mémoïsés par ensemble de modules statiques.
+        """
+        mask &= self.static_mask
+        found = self._defines.get(mask)
+        if found is None:
+            found = self._defines[mask] = sorted({
+                f"{self.modules[key][0]}_STATIC_LIB"
+                for bit, key in enumerate(self.order)
+                if mask >> bit & 1
+            })
+        return found
+
+
+@functools.lru_cache(maxsize=None)
+def load_registry(path: str = REGISTRY_FILE) -> Registry:
+    """
+    Registre de `path`, chargé et précalculé au premier appel puis partagé
+    par tous les .jenga du processus.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return Registry(data, os.environ.get("NKENTSEU_SHARED_MODULES", ""))
+
+
+_registry = load_registry()
+
+# Tables en lecture seule pour les outils (buildplan.py, depcheck.py)
+_REGISTRY: dict = _registry.modules
+_ORDER: list = _registry.order
+_BIT: dict = _registry.bit
+_DEPS_MASK: dict = _registry.deps_mask
+
+# =============================================================================
+# SECTION 2 : KINDS PAR MODULE
+# =============================================================================
+
+def setmodulekind(modulename: str, kind) -> None:
+    """
+    Fait déroger un module au kind global, comme une entrée de
+    "module_kinds". À appeler avant les useglobalkind() / useappdeps()
+    concernés, ex: dans le .jenga du workspace.
+
+        setmodulekind("renderer", ProjectKind.SHARED_LIB)
+    """
+    key = _registry.lookup(modulename, "setmodulekind")
+    _registry.set_kind(key, "STATIC_LIB" if kind == ProjectKind.STATIC_LIB else "SHARED_LIB")
+
+
+# =============================================================================
+# SECTION 3 : useglobalkind
+# =============================================================================
+
+def useglobalkind(modulename: str) -> None:
+    """
+    Configure le kind et les defines d'export/import pour un module Nkentseu.
+
+    Doit être appelé à l'intérieur d'un bloc `with project("XXX"):`, après
+    avoir importé la configuration (`from config import *`).
+
+    Paramètre
+    ----------
+    modulename : str
+        Clé courte du module dans le registre (insensible à la casse).
+        Exemples : "network", "logger", "reflection", "ui", "platform"
+
+    Comportement
+    ------------
+    Le kind du module est sa dérogation ("module_kinds",
+    NKENTSEU_SHARED_MODULES, setmodulekind()), sinon "global_kind".
+
+    STATIC_LIB (défaut) :
+        • kindexport(ProjectKind.STATIC_LIB, "NKENTSEU_XXXXX")
+          → le projet compile en .lib/.a
+          → la macro NKENTSEU_XXXXX_STATIC_LIB est définie DANS le module
+
+    SHARED_LIB :
+        • kindexport(ProjectKind.SHARED_LIB, "NKENTSEU_XXXXX")
+          → le projet compile en .dll/.so
+          → la macro NKENTSEU_XXXXX_EXPORTS est définie pour marquer les symboles
+
+    Dans les deux cas :
+        • defines(["NKENTSEU_DEP_STATIC_LIB", ...])
+          → chaque dépendance transitive bâtie en STATIC_LIB reçoit son
+            _STATIC_LIB ; les dépendances SHARED_LIB n'en reçoivent aucun
+            (les DLL exposent leurs symboles via __declspec(dllimport) /
+            visibility=default)
+
+    Exemple
+    -------
+    # NKNetwork.jenga
+    from config import *
+
+    with project("NKNetwork"):
+        useglobalkind("network")
+        # remplace :
+        #   kindexport(ProjectKind.STATIC_LIB, "NKENTSEU_NETWORK")
+        #   defines(["NKENTSEU_PLATFORM_STATIC_LIB",
+        #            "NKENTSEU_CORE_STATIC_LIB",
+        #            "NKENTSEU_MEMORY_STATIC_LIB",
+        #            "NKENTSEU_CONTAINERS_STATIC_LIB",
+        #            "NKENTSEU_LOGGER_STATIC_LIB",
+        #            "NKENTSEU_THREADING_STATIC_LIB",
+        #            "NKENTSEU_MATH_STATIC_LIB"])
+        language("C++")
+        ...
+    """
+    key = _registry.lookup(modulename, "useglobalkind")
+    export_prefix, _ = _registry.modules[key]
+
+    # ------------------------------------------------------------------
+    # Étape 1 : déclare le kind + macro d'export pour CE module
+    # ------------------------------------------------------------------
+    kindexport(getattr(ProjectKind, _registry.kind(key)), export_prefix)
+
+    # ------------------------------------------------------------------
+    # Étape 2 : émet les defines de dépendances selon leur kind
+    #   STATIC_LIB → NKENTSEU_XXXXX_STATIC_LIB pour chaque dep transitive
+    #                (lus dans la table, déjà triés : build reproductible)
+    #   SHARED_LIB → rien (les imports DLL sont gérés par kindexport)
+    # ------------------------------------------------------------------
+    dep_defines = _registry.static_defines(_registry.deps_mask[key])
+    if dep_defines:
+        defines(list(dep_defines))
+
+
+# =============================================================================
+# SECTION 4 : useappdeps
+# =============================================================================
+
+def useappdeps(*modulekeys: str) -> None:
+    """
+    Injecte les defines NKENTSEU_XXXXX_STATIC_LIB pour une application
+    (consoleapp / windowedapp) qui consomme les modules listés.
+
+    Contrairement à useglobalkind(), cette fonction ne configure PAS le kind
+    du projet (windowedapp / consoleapp sont déclarés dans les filtres
+    platform-spécifiques du .jenga de l'application).
+
+    Paramètres
+    ----------
+    *modulekeys : str
+        Une ou plusieurs clés courtes de modules du registre.
+        Les dépendances transitives sont résolues automatiquement.
+
+    Comportement
+    ------------
+    Émet defines([NKENTSEU_XXXXX_STATIC_LIB, ...]) pour chaque module listé
+    et chacune de ses dépendances transitives bâtis en STATIC_LIB. Les
+    modules SHARED_LIB n'ont aucun define (les DLL gèrent leurs imports
+    seules).
+
+    Exemples
+    --------
+    # Application utilisant le moteur complet
+    with project("MySandbox"):
+        useappdeps("engine")
+        windowedapp()           # mis dans un filtre platform le cas échéant
+        ...
+
+    # Application utilisant uniquement le réseau et le logger
+    with project("MyServer"):
+        useappdeps("network", "logger")
+        consoleapp()
+        ...
+    """
+    mask = 0
+    for name in modulekeys:
+        key = _registry.lookup(name, "useappdeps")
+        mask |= (1 << _registry.bit[key]) | _registry.deps_mask[key]
+
+    dep_defines = _registry.static_defines(mask)
+    if dep_defines:
+        defines(list(dep_defines))   # triés : build reproductible